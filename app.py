@@ -1,4 +1,4 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, stream_with_context
 from flask_pymongo import PyMongo
 from flask_bcrypt import Bcrypt
 from flask_cors import CORS
@@ -11,11 +11,24 @@ import urllib.request
 import urllib.error
 import uuid
 import sys
-import subprocess
 import json
 import re
+import numpy as np
 from bson.objectid import ObjectId
-from google import genai
+from nutrition import (
+    MEAL_KEYS,
+    GeminiBackend,
+    MealPlanStreamParser,
+    ResilientLLM,
+    SharedMealPlanCache,
+    SingleFlight,
+    StubBackend,
+    local_meal_plan,
+    profile_bucket,
+)
+from pose_detection1.checkfit import POSE_RULES
+from pose_detection1.checkfit.control import DEFAULT_PORT as DEFAULT_CONTROL_PORT, CoachManager, control_key
+from pose_detection1.checkfit.packed import FRAME_BYTES, best_frames, pack_results, unpack_frames
 
 # Load environment variables from .env file
 load_dotenv()
@@ -34,14 +47,38 @@ mongo = PyMongo(app)
 # Collections
 users = mongo.db.users
 
+# Meal plans shared between users with the same profile bucket
+meal_plan_cache = SharedMealPlanCache(
+    collection=mongo.db.meal_plan_cache if os.getenv("MEAL_PLAN_CACHE_BACKEND", "mongo") == "mongo" else None,
+    ttl_seconds=int(os.getenv("MEAL_PLAN_CACHE_TTL", 86400)),
+    max_entries=int(os.getenv("MEAL_PLAN_CACHE_MAX", 512)),
+)
+
+# Concurrent identical meal plan requests share one generation
+meal_plan_flights = SingleFlight()
+
 # Configure Gemini AI
+# LLM_BACKEND=stub swaps in a canned offline backend for local load tests
 gemini_api_key = os.getenv("GEMINI_API_KEY")
-if gemini_api_key:
-    client = genai.Client(api_key=gemini_api_key)
+if os.getenv("LLM_BACKEND", "gemini") == "stub":
+    llm_backend = StubBackend(latency=float(os.getenv("LLM_STUB_LATENCY", 0.5)))
+elif gemini_api_key:
+    llm_backend = GeminiBackend(gemini_api_key)
 else:
-    client = None
+    llm_backend = None
     print("Warning: GEMINI_API_KEY not found in environment variables")
 
+llm = ResilientLLM(
+    llm_backend,
+    timeout=float(os.getenv("LLM_TIMEOUT", 20)),
+    max_retries=int(os.getenv("LLM_MAX_RETRIES", 2)),
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", 4)),
+) if llm_backend else None
+
+# MEAL_PLAN_ENGINE=local serves every plan from the local engine; with the
+# default the local engine only steps in when Gemini is missing or failing
+meal_plan_engine = os.getenv("MEAL_PLAN_ENGINE", "gemini")
+
 
 
 @app.route('/add_workout', methods=['POST'])
@@ -526,30 +563,149 @@ def checkfit():
         return redirect(url_for('index'))
     return render_template('checkfit_web.html')
 
+# Use the specialized environment python if it exists, otherwise system python
+CHECKFIT_PYTHON = r"C:\Users\Admin\anaconda3\envs\gymlife_checkfit\python.exe"
+
+# At most one warm desktop coach per host; later visits switch its pose over
+# a local control port instead of launching app1.py again
+checkfit_coach = CoachManager(
+    command=[CHECKFIT_PYTHON if os.path.exists(CHECKFIT_PYTHON) else sys.executable,
+             os.path.join(app.root_path, 'pose_detection1', 'app1.py')],
+    cwd=os.path.join(app.root_path, 'pose_detection1'),
+    authkey=control_key(app.secret_key),
+    # app1.py's POSE_INDEX keys
+    poses=[str(i + 1) for i in range(len(POSE_RULES))],
+    port=int(os.getenv("CHECKFIT_CONTROL_PORT", DEFAULT_CONTROL_PORT)),
+    idle_timeout=int(os.getenv("CHECKFIT_IDLE_TIMEOUT", 600)),
+)
+
+
 @app.route('/checkfit-desktop')
 def checkfit_desktop():
     """Legacy desktop-based pose detection (for local use only)"""
     try:
-        # Path to the pose detection script
-        script_path = os.path.join(app.root_path, 'pose_detection1', 'app1.py')
-        working_dir = os.path.join(app.root_path, 'pose_detection1')
-        
-        # Use the specialized environment python if it exists, otherwise system python
-        env_python = r"C:\Users\Admin\anaconda3\envs\gymlife_checkfit\python.exe"
-        python_exe = env_python if os.path.exists(env_python) else sys.executable
-
-        # Launch the script as a separate process
-        subprocess.Popen([python_exe, script_path], cwd=working_dir)
-        
-        flash('Checkfit started! Look for the "AI Bodybuilding Coach" window.', 'success')
+        outcome = checkfit_coach.open(request.args.get('pose'))
+        if outcome == 'reused':
+            flash('Checkfit is already running! Look for the "AI Bodybuilding Coach" window.', 'success')
+        elif outcome == 'starting':
+            flash('Checkfit is still starting, the "AI Bodybuilding Coach" window will open shortly.', 'info')
+        else:
+            flash('Checkfit started! Look for the "AI Bodybuilding Coach" window.', 'success')
     except Exception as e:
         flash(f'Error starting Checkfit: {str(e)}', 'danger')
-    
+
     # Redirect to the 'next' param (current page), or referrer, or fallback to workout_history
     next_page = request.args.get('next')
     return redirect(next_page or request.referrer or url_for('workout_history'))
 
 
+@app.route('/checkfit-desktop/status')
+def checkfit_desktop_status():
+    """Whether the desktop coach is running, and its pose, FPS and idle time"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
+
+    return jsonify(checkfit_coach.status())
+
+
+@app.route('/checkfit/score', methods=['POST'])
+def checkfit_score():
+    """Score one frame of 33 landmarks with the desktop coach's scorers"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
+
+    data = request.get_json(silent=True) or {}
+    landmarks = data.get('landmarks')
+    try:
+        # accept [x, y, z] lists or MediaPipe JS {x, y, z, visibility} objects
+        lm = np.asarray([[p['x'], p['y'], p['z']] if isinstance(p, dict) else p
+                         for p in landmarks], dtype=float)
+        if lm.shape != (33, 3):
+            raise ValueError("expected 33 landmarks of [x, y, z]")
+        if not np.isfinite(lm).all():
+            raise ValueError("coordinates must be finite numbers")
+        poses = POSE_RULES.score_all(lm)
+    except (TypeError, KeyError, ValueError) as e:
+        return jsonify({'error': f'Invalid landmarks: {str(e)}'}), 400
+
+    return jsonify({
+        'poses': [{'pose': name, 'score': score, 'feedback': feedback}
+                  for name, score, feedback in poses]
+    })
+
+
+CHECKFIT_MAX_FRAMES = int(os.getenv("CHECKFIT_MAX_FRAMES", 20000))
+
+
+@app.route('/checkfit/score_batch', methods=['POST'])
+def checkfit_score_batch():
+    """Score a whole set of frames uploaded as packed float32 (N x 33 x 3)
+
+    Optional ?pose=<name> limits the result to one pose, and ?set=<id>
+    is stored with the record so the chunks of one set can be grouped.
+    Send Accept: application/octet-stream to get uint8 scores then uint8
+    feedback ids (N x P each) instead of JSON.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
+
+    # a chunked upload has no length to check up front, so it is refused
+    if request.content_length is None:
+        return jsonify({'error': 'Content-Length required'}), 411
+    if request.content_length > CHECKFIT_MAX_FRAMES * FRAME_BYTES:
+        return jsonify({'error': f'At most {CHECKFIT_MAX_FRAMES} frames per request'}), 413
+
+    try:
+        frames = unpack_frames(request.get_data(cache=False))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if len(frames) > CHECKFIT_MAX_FRAMES:
+        return jsonify({'error': f'At most {CHECKFIT_MAX_FRAMES} frames per request'}), 413
+
+    names = list(POSE_RULES.names)
+    columns = list(range(len(names)))
+    pose = request.args.get('pose')
+    if pose:
+        if pose not in names:
+            return jsonify({'error': f'Unknown pose: {pose}'}), 400
+        columns = [names.index(pose)]
+    set_id = request.args.get('set')
+    if set_id is not None and not 0 < len(set_id) <= 64:
+        return jsonify({'error': 'set must be 1 to 64 characters'}), 400
+
+    scores, feedback = POSE_RULES.score(frames)
+    scores, feedback = scores[:, columns], feedback[:, columns]
+    names = [names[i] for i in columns]
+    best = best_frames(scores, names)
+
+    try:
+        mongo.db.checkfit_sets.insert_one({
+            "user_id": session['user_id'],
+            "set_id": set_id,
+            "frames": len(frames),
+            "best": best,
+            "created_at": datetime.now(),
+        })
+    except Exception as e:
+        print(f"Error recording CheckFit set: {str(e)}")
+
+    if request.accept_mimetypes.best == 'application/octet-stream':
+        response = app.response_class(pack_results(scores, feedback),
+                                      mimetype='application/octet-stream')
+        response.headers['X-Frames'] = str(len(frames))
+        response.headers['X-Poses'] = json.dumps(names)
+        return response
+
+    return jsonify({
+        'frames': len(frames),
+        'poses': names,
+        'messages': [POSE_RULES.feedback[i] for i in columns],
+        'scores': scores.tolist(),
+        'feedback': feedback.tolist(),
+        'best': best,
+    })
+
+
 @app.route('/diet')
 def diet():
     """Diet page with bulking/cutting options"""
@@ -561,42 +717,8 @@ def diet():
     return render_template('diet.html', user=user)
 
 
-@app.route('/generate_meal_plan', methods=['POST'])
-def generate_meal_plan():
-    """Generate personalized meal plan using Gemini AI"""
-    if 'user_id' not in session:
-        return jsonify({'error': 'Not logged in'}), 401
-    
-    if not client:
-        return jsonify({'error': 'Gemini API not configured'}), 500
-    
-    data = request.get_json()
-    goal = data.get('goal', 'bulking').lower()  # 'bulking' or 'cutting'
-    
-    if goal not in ['bulking', 'cutting']:
-        return jsonify({'error': 'Invalid goal. Must be bulking or cutting'}), 400
-    
-    user = users.find_one({"_id": ObjectId(session['user_id'])})
-    
-    # Get user data
-    bmi = user.get('bmi', 22)
-    weight = user.get('weight', 70)
-    height = user.get('height', 170)
-    age = user.get('age', 25)
-    sex = user.get('sex', 'male')
-    
-    # Check if we already generated a plan today
-    today = datetime.now().strftime("%Y-%m-%d")
-    cached_plan_date = user.get(f'meal_plan_{goal}_date')
-    
-    if cached_plan_date == today:
-        # Return cached plan
-        cached_plan = user.get(f'meal_plan_{goal}')
-        if cached_plan:
-            return jsonify(cached_plan)
-    
-    # Generate new meal plan
-    prompt = f"""Create a detailed {goal} meal plan for a {sex} with:
+def _build_meal_plan_prompt(goal, sex, bmi, weight, height, age) -> str:
+    return f"""Create a detailed {goal} meal plan for a {sex} with:
 - BMI: {bmi}
 - Weight: {weight} kg
 - Height: {height} cm
@@ -634,41 +756,217 @@ Guidelines for {goal}:
 
 Make it realistic, healthy, and achievable. Use common foods available in India.
 """
+
+
+def _request_meal_plan(prompt: str) -> dict:
+    """Ask Gemini for a meal plan and parse the JSON out of its reply"""
+    meal_plan_text = llm.generate(prompt)
+
+    # Extract JSON from response
+    json_match = re.search(r'\{.*\}', meal_plan_text, re.DOTALL)
+    if not json_match:
+        raise ValueError('Could not parse meal plan from AI response')
+    return json.loads(json_match.group())
+
+
+def _gemini_enabled() -> bool:
+    return meal_plan_engine != 'local' and llm is not None
+
+
+def _local_plan(goal, sex, weight, height, age, bucket, today) -> dict:
+    # Seeded by bucket and day so the plan stays stable within a day
+    return local_meal_plan(goal, weight, height, age, sex, seed=f"{bucket}|{today}")
+
+
+def _save_user_meal_plan(user_id, goal, plan, today):
+    users.update_one(
+        {"_id": ObjectId(user_id)},
+        {"$set": {
+            f"meal_plan_{goal}": plan,
+            f"meal_plan_{goal}_date": today
+        }}
+    )
+
+
+@app.route('/generate_meal_plan', methods=['POST'])
+def generate_meal_plan():
+    """Generate personalized meal plan using Gemini AI"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
+    
+    data = request.get_json()
+    goal = data.get('goal', 'bulking').lower()  # 'bulking' or 'cutting'
+    
+    if goal not in ['bulking', 'cutting']:
+        return jsonify({'error': 'Invalid goal. Must be bulking or cutting'}), 400
+    
+    user_id = session['user_id']
+    user = users.find_one({"_id": ObjectId(user_id)})
+    
+    # Get user data
+    bmi = user.get('bmi', 22)
+    weight = user.get('weight', 70)
+    height = user.get('height', 170)
+    age = user.get('age', 25)
+    sex = user.get('sex', 'male')
+    
+    # Check if we already generated a plan today
+    today = datetime.now().strftime("%Y-%m-%d")
+    cached_plan_date = user.get(f'meal_plan_{goal}_date')
+    
+    if cached_plan_date == today:
+        # Return cached plan
+        cached_plan = user.get(f'meal_plan_{goal}')
+        if cached_plan:
+            return jsonify(cached_plan)
     
+    bucket = profile_bucket(goal, sex, bmi, weight, height, age)
+
+    if not _gemini_enabled():
+        meal_plan = _local_plan(goal, sex, weight, height, age, bucket, today)
+        _save_user_meal_plan(user_id, goal, meal_plan, today)
+        return jsonify(meal_plan)
+
+    if not llm.available:
+        # Breaker is open: answer now and let a later request retry Gemini
+        return jsonify(_local_plan(goal, sex, weight, height, age, bucket, today))
+
+    def shared_plan():
+        # Reuse a plan generated today for someone with a matching profile
+        plan = meal_plan_cache.get(bucket)
+        if plan:
+            return plan
+        plan = _request_meal_plan(
+            _build_meal_plan_prompt(goal, sex, bmi, weight, height, age))
+        meal_plan_cache.put(bucket, plan)
+        return plan
+
+    def user_plan():
+        # Users in the same bucket wait on a single Gemini call
+        plan = meal_plan_flights.do(("bucket", bucket, today), shared_plan)
+        if not plan:
+            # joined a streamed generation that ended incomplete
+            raise ValueError('Shared meal plan generation was incomplete')
+        _save_user_meal_plan(user_id, goal, plan, today)
+        return plan
+
     try:
-        response = client.models.generate_content(
-            model='gemini-2.0-flash-exp',
-            contents=prompt
-        )
-        # Handle response structure from new API
-        if hasattr(response, 'text'):
-            meal_plan_text = response.text
-        elif hasattr(response, 'candidates') and len(response.candidates) > 0:
-            meal_plan_text = response.candidates[0].content.parts[0].text
-        else:
-            return jsonify({'error': 'Unexpected API response format'}), 500
-        
-        # Extract JSON from response
-        json_match = re.search(r'\{.*\}', meal_plan_text, re.DOTALL)
-        if json_match:
-            meal_plan = json.loads(json_match.group())
-            
-            # Save to database
-            users.update_one(
-                {"_id": ObjectId(session['user_id'])},
-                {"$set": {
-                    f"meal_plan_{goal}": meal_plan,
-                    f"meal_plan_{goal}_date": today
-                }}
-            )
-            
-            return jsonify(meal_plan)
-        else:
-            return jsonify({'error': 'Could not parse meal plan from AI response'}), 500
+        # Double clicks and extra tabs share the request already running
+        meal_plan = meal_plan_flights.do(("user", user_id, goal, today), user_plan)
+        return jsonify(meal_plan)
     
     except Exception as e:
-        print(f"Error generating meal plan: {str(e)}")
-        return jsonify({'error': f'Failed to generate meal plan: {str(e)}'}), 500
+        # Fall back to the local engine; nothing is saved so the next
+        # request tries Gemini again
+        print(f"Error generating meal plan, using local engine: {str(e)}")
+        return jsonify(_local_plan(goal, sex, weight, height, age, bucket, today))
+
+
+@app.route('/generate_meal_plan/stream', methods=['POST'])
+def generate_meal_plan_stream():
+    """Stream a meal plan to the browser one meal at a time (NDJSON)"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
+    
+    data = request.get_json()
+    goal = data.get('goal', 'bulking').lower()
+    
+    if goal not in ['bulking', 'cutting']:
+        return jsonify({'error': 'Invalid goal. Must be bulking or cutting'}), 400
+    
+    user_id = session['user_id']
+    user = users.find_one({"_id": ObjectId(user_id)})
+    
+    bmi = user.get('bmi', 22)
+    weight = user.get('weight', 70)
+    height = user.get('height', 170)
+    age = user.get('age', 25)
+    sex = user.get('sex', 'male')
+    
+    today = datetime.now().strftime("%Y-%m-%d")
+    bucket = profile_bucket(goal, sex, bmi, weight, height, age)
+
+    cached_plan = None
+    if user.get(f'meal_plan_{goal}_date') == today:
+        cached_plan = user.get(f'meal_plan_{goal}')
+    if not cached_plan and not _gemini_enabled():
+        cached_plan = _local_plan(goal, sex, weight, height, age, bucket, today)
+        _save_user_meal_plan(user_id, goal, cached_plan, today)
+    if not cached_plan:
+        cached_plan = meal_plan_cache.get(bucket)
+        if cached_plan:
+            _save_user_meal_plan(user_id, goal, cached_plan, today)
+    if not cached_plan and not llm.available:
+        cached_plan = _local_plan(goal, sex, weight, height, age, bucket, today)
+
+    def line(payload):
+        return json.dumps(payload) + '\n'
+
+    def gemini_meals():
+        parser = MealPlanStreamParser()
+        for text in llm.generate_stream(
+                _build_meal_plan_prompt(goal, sex, bmi, weight, height, age)):
+            yield from parser.feed(text)
+
+    def finish_plan(meals):
+        # Runs once, in the leading request; /generate_meal_plan followers get the plan
+        plan = dict(meals)
+        if not all(key in plan for key in MEAL_KEYS):
+            return None
+        meal_plan_cache.put(bucket, plan)
+        return plan
+
+    def generate():
+        if cached_plan:
+            for key, meal in cached_plan.items():
+                yield line({'meal': key, 'data': meal})
+            yield line({'done': True})
+            return
+
+        plan = {}
+        try:
+            # Requests in the same bucket (double clicks, extra tabs, matching
+            # profiles) share one Gemini stream; followers replay its meals
+            meals = meal_plan_flights.stream(("bucket", bucket, today), gemini_meals,
+                                             collect=finish_plan,
+                                             replay=lambda shared: (shared or {}).items())
+            for key, meal in meals:
+                plan[key] = meal
+                yield line({'meal': key, 'data': meal})
+        except Exception as e:
+            print(f"Error streaming meal plan: {str(e)}")
+
+        if not all(key in plan for key in MEAL_KEYS):
+            # Fill whatever Gemini did not deliver from the local engine
+            fallback = _local_plan(goal, sex, weight, height, age, bucket, today)
+            for key, meal in fallback.items():
+                if key not in plan:
+                    yield line({'meal': key, 'data': meal})
+            yield line({'done': True})
+            return
+
+        _save_user_meal_plan(user_id, goal, plan, today)
+        yield line({'done': True})
+
+    return app.response_class(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/meal_plan_cache/stats')
+def meal_plan_cache_stats():
+    """Hit-rate metrics for the shared meal plan cache"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
+    return jsonify(meal_plan_cache.stats())
+
+
+@app.route('/llm/stats')
+def llm_stats():
+    """Latency, token and circuit breaker metrics for the Gemini client"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Not logged in'}), 401
+    if not llm:
+        return jsonify({'error': 'Gemini API not configured'}), 500
+    return jsonify(llm.stats())
 
 
 if __name__ == '__main__':
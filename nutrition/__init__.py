@@ -0,0 +1,22 @@
+"""Meal-plan helpers used by the diet routes in app.py."""
+
+from .cache import SharedMealPlanCache, profile_bucket
+from .engine import local_meal_plan, macro_targets
+from .llm import CircuitBreaker, GeminiBackend, LLMUnavailableError, ResilientLLM, StubBackend
+from .singleflight import SingleFlight
+from .streaming import MEAL_KEYS, MealPlanStreamParser
+
+__all__ = [
+    "CircuitBreaker",
+    "GeminiBackend",
+    "LLMUnavailableError",
+    "MEAL_KEYS",
+    "MealPlanStreamParser",
+    "ResilientLLM",
+    "SharedMealPlanCache",
+    "SingleFlight",
+    "StubBackend",
+    "local_meal_plan",
+    "macro_targets",
+    "profile_bucket",
+]
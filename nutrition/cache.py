@@ -0,0 +1,164 @@
+"""Shared meal-plan cache keyed by a normalized user profile bucket.
+
+Users with the same goal, sex and near-identical body stats get the same
+plan, so one Gemini call can serve all of them. Entries live in a small
+in-process LRU and, when a Mongo collection is given, in a shared
+collection so every worker sees the same plans.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+
+# Bucket widths: stats inside one bucket get the same plan
+BMI_STEP = 1.0
+WEIGHT_STEP = 5.0
+HEIGHT_STEP = 5.0
+AGE_STEP = 5
+
+
+def _bucket(value, step, default):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        value = float(default)
+    return int(value // step * step)
+
+
+def profile_bucket(goal, sex, bmi, weight, height, age) -> str:
+    """Return the cache key shared by every user in the same profile bucket."""
+    sex = (sex or 'male').strip().lower()
+    if sex not in ('male', 'female'):
+        sex = 'other'
+    return "|".join([
+        goal.lower(),
+        sex,
+        f"bmi{_bucket(bmi, BMI_STEP, 22)}",
+        f"w{_bucket(weight, WEIGHT_STEP, 70)}",
+        f"h{_bucket(height, HEIGHT_STEP, 170)}",
+        f"a{_bucket(age, AGE_STEP, 25)}",
+    ])
+
+
+class SharedMealPlanCache:
+    """TTL + LRU bounded meal-plan cache with hit-rate counters.
+
+    The local tier is an OrderedDict in LRU order. The optional Mongo tier
+    stores one document per bucket; a TTL index on ``expires_at`` drops
+    stale plans and ``put`` trims the least recently used documents once
+    the collection grows past ``max_entries``.
+    """
+
+    def __init__(self, collection=None, ttl_seconds=86400, max_entries=512):
+        self.collection = collection
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._local: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._indexes_ready = False
+        self._stats = {"local_hits": 0, "mongo_hits": 0, "misses": 0,
+                       "stores": 0, "evictions": 0, "errors": 0}
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._stats[name] += n
+
+    def _ensure_indexes(self):
+        if self._indexes_ready or self.collection is None:
+            return
+        self.collection.create_index("bucket", unique=True)
+        self.collection.create_index("expires_at", expireAfterSeconds=0)
+        self.collection.create_index([("last_used", ASCENDING)])
+        self._indexes_ready = True
+
+    def _local_get(self, bucket):
+        with self._lock:
+            entry = self._local.get(bucket)
+            if entry is None:
+                return None
+            expires, plan = entry
+            if expires <= time.time():
+                del self._local[bucket]
+                return None
+            self._local.move_to_end(bucket)
+            return plan
+
+    def _local_put(self, bucket, plan, expires):
+        with self._lock:
+            self._local[bucket] = (expires, plan)
+            self._local.move_to_end(bucket)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def get(self, bucket: str) -> dict | None:
+        plan = self._local_get(bucket)
+        if plan is not None:
+            self._count("local_hits")
+            return plan
+
+        if self.collection is not None:
+            try:
+                self._ensure_indexes()
+                now = datetime.utcnow()
+                doc = self.collection.find_one_and_update(
+                    {"bucket": bucket, "expires_at": {"$gt": now}},
+                    {"$set": {"last_used": now}, "$inc": {"hits": 1}},
+                )
+            except PyMongoError as e:
+                print(f"Meal plan cache lookup failed: {str(e)}")
+                self._count("errors")
+                doc = None
+            if doc:
+                remaining = (doc["expires_at"] - now).total_seconds()
+                self._local_put(bucket, doc["plan"], time.time() + remaining)
+                self._count("mongo_hits")
+                return doc["plan"]
+
+        self._count("misses")
+        return None
+
+    def put(self, bucket: str, plan: dict) -> None:
+        self._local_put(bucket, plan, time.time() + self.ttl_seconds)
+        self._count("stores")
+        if self.collection is None:
+            return
+
+        try:
+            self._ensure_indexes()
+            now = datetime.utcnow()
+            self.collection.update_one(
+                {"bucket": bucket},
+                {"$set": {
+                    "plan": plan,
+                    "last_used": now,
+                    "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                }, "$setOnInsert": {"created_at": now, "hits": 0}},
+                upsert=True,
+            )
+            overflow = self.collection.estimated_document_count() - self.max_entries
+            if overflow > 0:
+                stale = self.collection.find({}, {"_id": 1}).sort(
+                    "last_used", ASCENDING).limit(overflow)
+                ids = [doc["_id"] for doc in stale]
+                if ids:
+                    self.collection.delete_many({"_id": {"$in": ids}})
+                    self._count("evictions", len(ids))
+        except PyMongoError as e:
+            print(f"Meal plan cache store failed: {str(e)}")
+            self._count("errors")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["local_entries"] = len(self._local)
+        hits = stats["local_hits"] + stats["mongo_hits"]
+        lookups = hits + stats["misses"]
+        stats["hits"] = hits
+        stats["lookups"] = lookups
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,190 @@
+"""Deterministic local meal-plan engine.
+
+Computes maintenance calories with the Mifflin-St Jeor equation, applies the
+same surplus/deficit and g/kg protein rules the Gemini prompt asks for, then
+builds each meal from the bundled ``dataset/foods.csv`` table by solving a
+tiny non-negative least-squares problem per food combination. The result has
+the same shape as the Gemini plan and takes milliseconds to build.
+"""
+
+import csv
+import itertools
+import os
+import zlib
+
+from .streaming import MEAL_KEYS
+
+ACTIVITY_FACTOR = 1.55  # people using a gym app train 3-5 days a week
+
+GOALS = {
+    # calorie offset, protein g/kg, share of calories from fat
+    'bulking': {'offset': 400, 'protein_per_kg': 2.0, 'fat_share': 0.25},
+    'cutting': {'offset': -400, 'protein_per_kg': 2.3, 'fat_share': 0.20},
+}
+
+# Share of the daily targets that goes into each meal
+MEAL_SPLIT = {
+    'pre_workout': 0.12,
+    'post_workout': 0.20,
+    'breakfast': 0.22,
+    'lunch': 0.28,
+    'dinner': 0.18,
+}
+
+MAX_GRAMS = {'protein': 300, 'carb': 350, 'fat': 40}
+REUSE_PENALTY = 40  # kcal of error charged per earlier use of the same food
+
+# Errors are measured in kcal so a gram of fat counts as much as it weighs
+_KCAL_PER_GRAM = (4, 4, 9)
+
+_FOODS = []
+
+
+def _load_foods() -> list[dict]:
+    global _FOODS
+    if not _FOODS:
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with open(os.path.join(base_dir, 'dataset', 'foods.csv'), 'r', encoding='utf-8') as f:
+            _FOODS = [{
+                'name': row['name'],
+                'category': row['category'],
+                'meals': set(row['meals'].split(';')),
+                # macros per gram
+                'macros': tuple(float(row[k]) / 100 for k in ('protein', 'carbs', 'fats')),
+            } for row in csv.DictReader(f)]
+            for food in _FOODS:
+                food['kcal'] = tuple(w * m for w, m in zip(_KCAL_PER_GRAM, food['macros']))
+    return _FOODS
+
+
+def macro_targets(goal, weight, height, age, sex) -> dict:
+    """Daily calorie and macro targets for a goal."""
+    weight, height, age = float(weight), float(height), float(age)
+    sex_offset = {'male': 5, 'female': -161}.get((sex or '').lower(), -78)
+    bmr = 10 * weight + 6.25 * height - 5 * age + sex_offset
+    maintenance = bmr * ACTIVITY_FACTOR
+
+    rules = GOALS[goal]
+    calories = max(1200.0, maintenance + rules['offset'])
+    protein = weight * rules['protein_per_kg']
+    fats = calories * rules['fat_share'] / 9
+    carbs = max(0.0, (calories - protein * 4 - fats * 9) / 4)
+    return {
+        'maintenance': round(maintenance),
+        'calories': round(calories),
+        'protein': round(protein),
+        'carbs': round(carbs),
+        'fats': round(fats),
+    }
+
+
+def _solve(matrix, rhs):
+    """Gaussian elimination for the small normal-equation systems below."""
+    n = len(rhs)
+    m = [row[:] + [rhs[i]] for i, row in enumerate(matrix)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(m[r][col]))
+        if abs(m[pivot][col]) < 1e-12:
+            return None
+        m[col], m[pivot] = m[pivot], m[col]
+        for r in range(n):
+            if r != col:
+                factor = m[r][col] / m[col][col]
+                for c in range(col, n + 1):
+                    m[r][c] -= factor * m[col][c]
+    return [m[i][n] / m[i][i] for i in range(n)]
+
+
+def _error(foods, grams, target):
+    return sum(
+        (_KCAL_PER_GRAM[k] * (sum(f['macros'][k] * g for f, g in zip(foods, grams)) - target[k])) ** 2
+        for k in range(3)
+    ) ** 0.5
+
+
+def _portions(foods, target):
+    """Non-negative, capped grams of ``foods`` that best hit ``target``.
+
+    With at most three foods every active set can be tried directly, which
+    gives the exact non-negative least-squares answer. The full set is tried
+    first; when its solution is already non-negative and within the caps it
+    is optimal and the smaller sets are skipped.
+    """
+    best, best_error = None, None
+    rhs = [w * t for w, t in zip(_KCAL_PER_GRAM, target)]
+    for size in range(len(foods), 0, -1):
+        for subset in itertools.combinations(range(len(foods)), size):
+            cols = [foods[i]['kcal'] for i in subset]
+            normal = [[sum(a * b for a, b in zip(ci, cj)) for cj in cols] for ci in cols]
+            solution = _solve(normal, [sum(a * b for a, b in zip(ci, rhs)) for ci in cols])
+            if solution is None or min(solution) < 0:
+                continue
+            grams = [0.0] * len(foods)
+            clipped = False
+            for i, g in zip(subset, solution):
+                cap = MAX_GRAMS[foods[i]['category']]
+                clipped = clipped or g > cap
+                grams[i] = min(g, cap)
+            # Portions are served in 5 g steps
+            grams = [round(g / 5) * 5 for g in grams]
+            error = _error(foods, grams, target)
+            if best_error is None or error < best_error:
+                best, best_error = grams, error
+            if size == len(foods) and not clipped:
+                return best, best_error
+    return best, best_error
+
+
+def _describe(foods, grams):
+    parts = [f"{g} g {f['name'].lower()}" for f, g in zip(foods, grams) if g > 0]
+    return ", ".join(parts[:-1]) + " and " + parts[-1] if len(parts) > 1 else parts[0]
+
+
+def local_meal_plan(goal, weight=70, height=170, age=25, sex='male', seed='') -> dict:
+    """Build a five-meal plan in the same JSON shape Gemini returns.
+
+    ``seed`` only breaks ties between equally good combinations, so callers
+    can vary plans from day to day while staying deterministic.
+    """
+    foods = _load_foods()
+    targets = macro_targets(goal, weight, height, age, sex)
+    used: dict[str, int] = {}
+    plan = {}
+
+    for meal in MEAL_KEYS:
+        share = MEAL_SPLIT[meal]
+        target = (targets['protein'] * share, targets['carbs'] * share, targets['fats'] * share)
+        options = {
+            category: [f for f in foods if f['category'] == category and meal in f['meals']]
+            for category in ('protein', 'carb', 'fat')
+        }
+
+        best = None
+        for combo in itertools.product(options['protein'], options['carb'], options['fat']):
+            grams, error = _portions(combo, target)
+            # Every meal keeps its protein source
+            if grams is None or grams[0] == 0:
+                continue
+            error += REUSE_PENALTY * sum(used.get(f['name'], 0) for f, g in zip(combo, grams) if g > 0)
+            tiebreak = zlib.crc32(f"{seed}|{meal}|{'|'.join(f['name'] for f in combo)}".encode())
+            if best is None or (error, tiebreak) < best[0]:
+                best = ((error, tiebreak), combo, grams)
+
+        _, combo, grams = best
+        chosen = [(f, g) for f, g in zip(combo, grams) if g > 0]
+        for f, _ in chosen:
+            used[f['name']] = used.get(f['name'], 0) + 1
+
+        protein, carbs, fats = (
+            sum(f['macros'][k] * g for f, g in chosen) for k in range(3)
+        )
+        names = [f['name'] for f, _ in chosen if f['category'] != 'fat'] or [chosen[0][0]['name']]
+        plan[meal] = {
+            "name": " with ".join(names),
+            "calories": round(protein * 4 + carbs * 4 + fats * 9),
+            "protein": round(protein),
+            "carbs": round(carbs),
+            "fats": round(fats),
+            "description": _describe([f for f, _ in chosen], [g for _, g in chosen]).capitalize() + ".",
+        }
+    return plan
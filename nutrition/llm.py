@@ -0,0 +1,267 @@
+"""Resilient wrapper around the Gemini client used for meal plans.
+
+``ResilientLLM`` adds a per-call deadline, jittered exponential backoff, a
+circuit breaker, a concurrency limit and latency/token counters on top of a
+backend. ``GeminiBackend`` talks to the real API; ``StubBackend`` returns a
+canned plan after a configurable delay so the diet flow can be load tested
+without network access.
+"""
+
+import json
+import random
+import threading
+import time
+
+from google import genai
+from google.genai import types
+
+DEFAULT_MODEL = 'gemini-2.0-flash-exp'
+
+
+class LLMUnavailableError(Exception):
+    """Raised when a call is refused (breaker open, too busy) or out of time."""
+
+
+class GeminiBackend:
+    def __init__(self, api_key: str, model: str = DEFAULT_MODEL):
+        self.model = model
+        self.client = genai.Client(api_key=api_key)
+
+    def _config(self, timeout):
+        return types.GenerateContentConfig(
+            http_options=types.HttpOptions(timeout=int(timeout * 1000)))
+
+    def generate(self, prompt: str, timeout: float):
+        response = self.client.models.generate_content(
+            model=self.model, contents=prompt, config=self._config(timeout))
+        # Handle response structure from new API
+        if hasattr(response, 'text'):
+            text = response.text
+        elif hasattr(response, 'candidates') and len(response.candidates) > 0:
+            text = response.candidates[0].content.parts[0].text
+        else:
+            raise ValueError('Unexpected API response format')
+        return text, _token_count(response)
+
+    def generate_stream(self, prompt: str, timeout: float):
+        stream = self.client.models.generate_content_stream(
+            model=self.model, contents=prompt, config=self._config(timeout))
+        for chunk in stream:
+            yield chunk.text or '', _token_count(chunk)
+
+
+def _token_count(response) -> int:
+    usage = getattr(response, 'usage_metadata', None)
+    return (getattr(usage, 'total_token_count', None) or 0) if usage else 0
+
+
+STUB_MEAL_PLAN = {
+    "pre_workout": {"name": "Banana Peanut Butter Toast", "calories": 350, "protein": 12,
+                    "carbs": 48, "fats": 13, "description": "Whole wheat toast with peanut butter and a sliced banana"},
+    "post_workout": {"name": "Paneer Bhurji Wrap", "calories": 520, "protein": 35,
+                     "carbs": 45, "fats": 22, "description": "Scrambled paneer with onions and tomatoes in a whole wheat roti"},
+    "breakfast": {"name": "Masala Oats with Eggs", "calories": 480, "protein": 28,
+                  "carbs": 55, "fats": 15, "description": "Vegetable masala oats served with two boiled eggs"},
+    "lunch": {"name": "Chicken Curry with Rice and Dal", "calories": 750, "protein": 50,
+              "carbs": 85, "fats": 20, "description": "Home-style chicken curry, steamed rice, moong dal and salad"},
+    "dinner": {"name": "Grilled Fish with Sabzi", "calories": 500, "protein": 40,
+               "carbs": 35, "fats": 20, "description": "Tandoori fish with mixed vegetable sabzi and two rotis"},
+}
+
+
+class StubBackend:
+    """Offline backend returning a fixed plan, for local load tests."""
+
+    def __init__(self, latency: float = 0.5, failure_rate: float = 0.0, chunk_size: int = 64):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.chunk_size = chunk_size
+        self.text = json.dumps(STUB_MEAL_PLAN, indent=4)
+
+    def _maybe_fail(self, timeout):
+        if self.latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError('Stub LLM call timed out')
+        if random.random() < self.failure_rate:
+            raise ConnectionError('Stub LLM failure')
+
+    def generate(self, prompt: str, timeout: float):
+        self._maybe_fail(timeout)
+        time.sleep(self.latency)
+        return self.text, len(prompt) // 4 + len(self.text) // 4
+
+    def generate_stream(self, prompt: str, timeout: float):
+        self._maybe_fail(timeout)
+        chunks = [self.text[i:i + self.chunk_size] for i in range(0, len(self.text), self.chunk_size)]
+        for chunk in chunks:
+            time.sleep(self.latency / len(chunks))
+            yield chunk, 0
+
+
+class CircuitBreaker:
+    """Closed -> open after ``failure_threshold`` straight failures.
+
+    While open every call is refused; after ``reset_timeout`` seconds one
+    trial call is let through (half-open) and its outcome closes or re-opens
+    the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half_open'
+            return 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def release_trial(self):
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class ResilientLLM:
+    def __init__(self, backend, timeout: float = 20.0, max_retries: int = 2,
+                 backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 max_concurrency: int = 4, breaker: CircuitBreaker | None = None):
+        self.backend = backend
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._metrics = {"calls": 0, "successes": 0, "failures": 0, "retries": 0,
+                         "rejected": 0, "tokens": 0, "latency_total": 0.0, "latency_max": 0.0}
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._metrics[name] += n
+
+    def _record_latency(self, seconds):
+        with self._lock:
+            self._metrics["latency_total"] += seconds
+            self._metrics["latency_max"] = max(self._metrics["latency_max"], seconds)
+
+    def _backoff(self, attempt) -> float:
+        # Full jitter keeps retrying clients from hitting the API in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _acquire(self, deadline):
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise LLMUnavailableError('Gemini circuit breaker is open')
+        if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            # The breaker may have handed us its half-open trial slot
+            self.breaker.release_trial()
+            self._count("rejected")
+            raise LLMUnavailableError('Too many concurrent Gemini calls')
+
+    def _attempts(self, call, deadline):
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMUnavailableError('Gemini call deadline exceeded')
+            self._acquire(deadline)
+            self._count("calls")
+            start = time.monotonic()
+            try:
+                result = call(remaining)
+            except Exception:
+                # give the slot back before backing off, so sleeping retries
+                # do not fill the semaphore during an outage
+                self._slots.release()
+                self._record_latency(time.monotonic() - start)
+                self._count("failures")
+                self.breaker.record_failure()
+                delay = self._backoff(attempt)
+                if attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    raise
+                attempt += 1
+                self._count("retries")
+                time.sleep(delay)
+                continue
+            except BaseException:
+                self._slots.release()
+                raise
+            self._slots.release()
+            self._record_latency(time.monotonic() - start)
+            self._count("successes")
+            self.breaker.record_success()
+            return result
+
+    def generate(self, prompt: str, timeout: float | None = None) -> str:
+        """Return the reply text, retrying transient failures inside ``timeout``."""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        text, tokens = self._attempts(lambda remaining: self.backend.generate(prompt, remaining), deadline)
+        self._count("tokens", tokens)
+        return text
+
+    def generate_stream(self, prompt: str, timeout: float | None = None):
+        """Yield reply chunks.
+
+        Only opening the stream is retried and held against the concurrency
+        limit; the rest of the reply is read without a slot.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+
+        def open_stream(remaining):
+            stream = self.backend.generate_stream(prompt, remaining)
+            return stream, next(stream, None)
+
+        stream, first = self._attempts(open_stream, deadline)
+        if first is None:
+            return
+        tokens = first[1]
+        yield first[0]
+        for text, count in stream:
+            tokens = max(tokens, count)
+            yield text
+        self._count("tokens", tokens)
+
+    @property
+    def available(self) -> bool:
+        return self.breaker.state != 'open'
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._metrics)
+        finished = stats["successes"] + stats["failures"]
+        stats["latency_avg"] = round(stats["latency_total"] / finished, 4) if finished else 0.0
+        stats["latency_total"] = round(stats["latency_total"], 4)
+        stats["latency_max"] = round(stats["latency_max"], 4)
+        stats["breaker"] = self.breaker.state
+        stats["backend"] = type(self.backend).__name__
+        return stats
@@ -0,0 +1,117 @@
+"""In-flight deduplication for expensive calls.
+
+While a call for a key is running, later callers with the same key wait for
+it and share its result (or its exception) instead of starting their own.
+``stream`` does the same for a generator: followers replay the items the
+leader has produced so far and then receive each new one as it arrives.
+Coalescing is per process; each gunicorn worker keeps its own table.
+"""
+
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "items", "cond")
+
+    def __init__(self, streaming=False):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        # streamed calls only: items produced so far, guarded by ``cond``
+        self.items = [] if streaming else None
+        self.cond = threading.Condition() if streaming else None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[object, _Call] = {}
+
+    def do(self, key, fn, timeout=None):
+        """Run ``fn()`` once per key at a time and return its result.
+
+        Followers wait up to ``timeout`` seconds for the leader and raise
+        ``TimeoutError`` if it has not finished by then.
+        """
+        call, leader = self._join(key, streaming=False)
+        if not leader:
+            return self._wait(call, key, timeout)
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def _join(self, key, streaming):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call(streaming)
+                return call, True
+            return call, False
+
+    @staticmethod
+    def _wait(call, key, timeout):
+        if not call.done.wait(timeout):
+            raise TimeoutError(f"Timed out waiting for in-flight call {key!r}")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stream(self, key, fn, collect=list, replay=iter, timeout=None):
+        """Iterate ``fn()`` once per key at a time, sharing its items.
+
+        Followers get every item the leader has yielded so far, then each
+        new one as it arrives, waiting up to ``timeout`` seconds for the
+        next. ``do`` callers on the same key receive ``collect(items)`` once
+        the stream ends; a stream that joins a running ``do`` call yields
+        ``replay(result)`` when it finishes.
+        """
+        call, leader = self._join(key, streaming=True)
+        if not leader:
+            if call.items is None:
+                yield from replay(self._wait(call, key, timeout))
+                return
+            index = 0
+            while True:
+                with call.cond:
+                    while index == len(call.items) and not call.done.is_set():
+                        if not call.cond.wait(timeout):
+                            raise TimeoutError(f"Timed out waiting for in-flight stream {key!r}")
+                    pending = call.items[index:]
+                    finished = call.done.is_set()
+                index += len(pending)
+                yield from pending
+                if finished:
+                    if call.error is not None:
+                        raise call.error
+                    return
+
+        try:
+            for item in fn():
+                with call.cond:
+                    call.items.append(item)
+                    call.cond.notify_all()
+                yield item
+            call.result = collect(call.items)
+        except BaseException as e:
+            # a leader whose client went away (GeneratorExit) ends the stream for everyone
+            call.error = e if isinstance(e, Exception) else \
+                RuntimeError(f"In-flight stream {key!r} was abandoned")
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            with call.cond:
+                call.done.set()
+                call.cond.notify_all()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,65 @@
+"""Incremental parsing of a meal plan JSON object as it streams in."""
+
+import json
+
+MEAL_KEYS = ("pre_workout", "post_workout", "breakfast", "lunch", "dinner")
+
+
+class MealPlanStreamParser:
+    """Pull complete meals out of a streamed ``{"meal": {...}, ...}`` reply.
+
+    Text before the opening brace (such as a markdown fence) is skipped.
+    ``feed`` returns the ``(key, meal)`` pairs whose objects closed in the
+    new chunk, so each meal can be sent on before the reply is finished.
+    """
+
+    def __init__(self):
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._key = None
+        self._value_start = None
+        self.done = False
+        self.plan: dict = {}
+
+    def feed(self, chunk: str) -> list[tuple[str, dict]]:
+        self._buf += chunk
+        meals = []
+        buf = self._buf
+        i = self._pos
+        while i < len(buf) and not self.done:
+            ch = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._key = json.loads(buf[self._string_start:i + 1])
+            elif ch == '"' and self._depth > 0:
+                self._in_string = True
+                self._string_start = i
+            elif ch == '{':
+                self._depth += 1
+                if self._depth == 2:
+                    self._value_start = i
+            elif ch == '}' and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    value = json.loads(buf[self._value_start:i + 1])
+                    self.plan[self._key] = value
+                    meals.append((self._key, value))
+                    self._value_start = None
+                elif self._depth == 0:
+                    self.done = True
+            i += 1
+        self._pos = i
+        return meals
+
+    def is_complete(self) -> bool:
+        return all(key in self.plan for key in MEAL_KEYS)
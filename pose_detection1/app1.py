@@ -1,342 +1,255 @@
-import cv2
-import mediapipe as mp
-import numpy as np
-import time
-import pygame
+"""AI Bodybuilding Coach: live webcam pose scoring.
+
+Usage: python app1.py [--pose N] [--source 0|VIDEO|SESSION.cfs] [--record [SESSION.cfs]]
+       [--snapshot-format jpg|png|webp]
+       [--voice elevenlabs|local] [--no-smoothing]
+       [--control-port PORT] [--idle-timeout SECONDS]
+       [--profile] [--profile-csv [PATH]]
+
+Scoring lives in the ``checkfit`` package; this script only runs the
+camera loop, overlay, sounds and snapshots. The web app's /checkfit-desktop
+starts it with --control-port and then switches poses in the running window
+over that port (checkfit/control.py) instead of launching it again.
+
+Every frame's stage timings (capture, pose.process, scoring, drawing, text,
+imshow) are recorded (checkfit/profiler.py); --profile shows their rolling
+p50/p95 on screen (P toggles it) and --profile-csv writes them all on exit.
+--source plays a video or a recorded session (checkfit/sources.py) instead
+of the webcam; bench_coach.py runs the same loop headless.
+"""
+
+import argparse
+import logging
 import os
+import sys
+import time
 
-print("Running from:", os.getcwd())
-
-# ---------- SOUND SYSTEM ----------
-pygame.mixer.init()
-
-correct_sound = None
-coach_sound = None
-
-try:
-    correct_sound = pygame.mixer.Sound(os.path.join(os.getcwd(), "correct.wav"))
-except:
-    pass
+import cv2
+import mediapipe as mp
 
-try:
-    coach_sound = pygame.mixer.Sound(os.path.join(os.getcwd(), "coach.wav"))
-except:
-    pass
+from checkfit import POSE_RULES
+from checkfit.buffers import FramePool
+from checkfit.control import ControlServer
+from checkfit.filters import HoldTracker
+from checkfit.live import load_cues
+from checkfit.overlay import draw_footer, draw_scores
+from checkfit.pipeline import FramePipeline
+from checkfit.profiler import StageProfiler, default_profile_path
+from checkfit.session import SessionRecorder, default_session_path
+from checkfit.snapshots import ENCODERS, SnapshotWriter
+from checkfit.sources import open_source
+from checkfit.voice import BACKENDS
 
-# ---------- Mediapipe Setup ----------
 mp_drawing = mp.solutions.drawing_utils
 mp_pose = mp.solutions.pose
 
-# ---------- Utility Functions ----------
-def calculate_angle(a, b, c):
-    a, b, c = np.array(a), np.array(b), np.array(c)
-    ba, bc = a - b, c - b
-    cosine = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
-    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
-
-# READY = both hands generally up (for double-biceps)
-def is_pose_ready(lm):
-    left_wrist_y, right_wrist_y = lm[15][1], lm[16][1]
-    left_shoulder_y, right_shoulder_y = lm[11][1], lm[12][1]
-    return (left_wrist_y < left_shoulder_y - 0.02 and
-            right_wrist_y < right_shoulder_y - 0.02)
-
-# generic angle scorer: ideal +/- soft_tol is “good”, up to hard_tol is “okay”
-def angle_score(angle, ideal, soft_tol=15, hard_tol=35):
-    diff = abs(angle - ideal)
-
-    if diff <= soft_tol:            # looks correct
-        score = 100 - diff * 0.7
-    elif diff <= hard_tol:          # acceptable for normal people
-        score = 90 - (diff - soft_tol) * 1.5
-    else:                           # far from pose
-        score = 55
-
-    return max(0, min(100, score))
-
-
-# ---------- Pose Scoring Functions ----------
-
-# FRONT DOUBLE BICEPS
-# realistic: elbow flex ~ 60–90°, both arms high & symmetric
-def score_front_double_biceps(lm):
-    if not is_pose_ready(lm):
-        return 0, "Lift arms above shoulders"
-
-    left = calculate_angle(lm[11], lm[13], lm[15])
-    right = calculate_angle(lm[12], lm[14], lm[16])
-
-    # Broad human range
-    def human_arm_score(angle):
-        if 50 <= angle <= 100:
-            return 100
-        elif 40 <= angle < 50 or 100 < angle <= 115:
-            return 85
-        elif 30 <= angle < 40 or 115 < angle <= 130:
-            return 65
-        else:
-            return 40
-
-    left_score = human_arm_score(left)
-    right_score = human_arm_score(right)
-
-    symmetry_diff = abs(left - right)
-    symmetry_penalty = max(0, symmetry_diff - 20) * 0.7
-
-    score = (left_score + right_score) / 2 - symmetry_penalty
-    score = max(0, min(100, score))
-
-    if score >= 85:
-        feedback = "Strong double biceps!"
-    elif symmetry_diff > 25:
-        feedback = "Match arm angles"
-    else:
-        feedback = "Flex biceps more"
-
-    return int(score), feedback
-
-
-# BACK DOUBLE BICEPS
-def score_back_double_biceps(lm):
-    if not is_pose_ready(lm):
-        return 0, "Raise arms and flex back"
-
-    left = calculate_angle(lm[11], lm[13], lm[15])
-    right = calculate_angle(lm[12], lm[14], lm[16])
-
-    # Human-friendly scoring for back pose
-    def back_arm_score(angle):
-        if 65 <= angle <= 110:
-            return 100
-        elif 55 <= angle < 65 or 110 < angle <= 125:
-            return 85
-        elif 45 <= angle < 55 or 125 < angle <= 140:
-            return 65
-        else:
-            return 40
-
-    left_score = back_arm_score(left)
-    right_score = back_arm_score(right)
-
-    # More forgiving symmetry (back pose is harder)
-    symmetry_diff = abs(left - right)
-    symmetry_penalty = max(0, symmetry_diff - 30) * 0.5
-
-    score = (left_score + right_score) / 2 - symmetry_penalty
-    score = max(0, min(100, score))
-
-    # Feedback tuned for humans
-    if score >= 85:
-        feedback = "Strong back double biceps!"
-    elif symmetry_diff > 35:
-        feedback = "Balance both arms"
-    elif left > 125 or right > 125:
-        feedback = "Bend elbows slightly more"
-    elif left < 55 or right < 55:
-        feedback = "Flex arms and back harder"
-    else:
-        feedback = "Tighten back and raise elbows"
-
-    return int(score), feedback
-
-
-# SIDE CHEST
-# idea: arms near chest height, front arm well bent (~60–90°)
-def score_side_chest(lm):
-    left_wrist_y, right_wrist_y = lm[15][1], lm[16][1]
-    left_sh_y, right_sh_y = lm[11][1], lm[12][1]
-    left_hip_y, right_hip_y = lm[23][1], lm[24][1]
-
-    # Chest-height zone
-    chest_top = min(left_sh_y, right_sh_y) + 0.05
-    chest_bottom = max(left_hip_y, right_hip_y) - 0.05
-
-    if not (chest_top < left_wrist_y < chest_bottom or
-            chest_top < right_wrist_y < chest_bottom):
-        return 0, "Bring arms in front of chest"
-
-    left_elbow = calculate_angle(lm[11], lm[13], lm[15])
-    right_elbow = calculate_angle(lm[12], lm[14], lm[16])
-
-    # Identify front arm (more bent)
-    front = min(left_elbow, right_elbow)
-    back = max(left_elbow, right_elbow)
-
-    # Very forgiving human ranges
-    if 50 <= front <= 100:
-        front_score = 100
-    elif 40 <= front < 50 or 100 < front <= 120:
-        front_score = 80
-    else:
-        front_score = 55
-
-    if 70 <= back <= 140:
-        back_score = 100
-    elif 60 <= back < 70 or 140 < back <= 160:
-        back_score = 80
-    else:
-        back_score = 60
-
-    score = 0.7 * front_score + 0.3 * back_score
-    score = max(0, min(100, score))
-
-    if score >= 85:
-        feedback = "Nice side chest!"
-    elif front < 50:
-        feedback = "Squeeze chest more"
-    else:
-        feedback = "Adjust arm position"
-
-    return int(score), feedback
-
-
-# LAT FLEX / LAT SPREAD
-def score_lat_flex(lm):
-    left_shoulder = np.array(lm[11])
-    right_shoulder = np.array(lm[12])
-    left_wrist = np.array(lm[15])
-    right_wrist = np.array(lm[16])
-
-    shoulder_width = np.linalg.norm(left_shoulder - right_shoulder)
-    wrist_width = np.linalg.norm(left_wrist - right_wrist)
-    ratio = wrist_width / (shoulder_width + 1e-6)
-
-    # check that arms are roughly at ribcage level (not hanging totally down)
-    left_wrist_y, right_wrist_y = lm[15][1], lm[16][1]
-    left_hip_y, right_hip_y = lm[23][1], lm[24][1]
-    left_sh_y, right_sh_y = lm[11][1], lm[12][1]
-
-    chest_top = min(left_sh_y, right_sh_y) + 0.05
-    hip_line = max(left_hip_y, right_hip_y) - 0.02
-
-    hands_in_zone = ((chest_top < left_wrist_y < hip_line) and
-                     (chest_top < right_wrist_y < hip_line))
-
-    if not hands_in_zone:
-        return 0, "Keep elbows wide at ribcage level"
-
-    # ratio ~1.0 = normal, 1.1–1.2 = good, >1.25 = very wide
-    if ratio >= 1.25:
-        score = 100
-        feedback = "Huge lat spread!"
-    elif ratio >= 1.15:
-        score = int(90 + (ratio - 1.15) * 100)  # 90–100
-        feedback = "Great lat spread"
-    elif ratio >= 1.05:
-        score = int(75 + (ratio - 1.05) * 150)  # 75–90
-        feedback = "Good, flare lats a bit more"
-    else:
-        score = max(50, int(ratio * 60))        # 50–63ish
-        feedback = "Spread elbows out and widen back"
-
-    score = max(0, min(100, score))
-    return score, feedback
-
-
-POSES = {
-    "1": ("Front Double Biceps", score_front_double_biceps),
-    "2": ("Back Double Biceps", score_back_double_biceps),
-    "3": ("Side Chest", score_side_chest),
-    "4": ("Lat Flex", score_lat_flex),
-}
-
-# Default to Front Double Biceps (1) to avoid blocking input when run from web app
-choice = "1"
-
-if choice not in POSES:
-    print("Invalid option. Exiting.")
-    raise SystemExit
-
-current_pose_key = choice
-pose_name, pose_scoring = POSES[current_pose_key]
-print(f"\n🔥 Selected Pose: {pose_name}\n")
-
-# ---------- Camera ----------
-cap = cv2.VideoCapture(0)
-os.makedirs("snapshots", exist_ok=True)
-
-hold_start_time = None
-screenshot_taken = False
-
-with mp_pose.Pose(min_detection_confidence=0.7,
-                  min_tracking_confidence=0.7) as pose:
-
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = pose.process(image)
-        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-
-        if result.pose_landmarks:
-            mp_drawing.draw_landmarks(
-                image, result.pose_landmarks, mp_pose.POSE_CONNECTIONS)
-
-            lm = [[lm.x, lm.y, lm.z]
-                  for lm in result.pose_landmarks.landmark]
-
-            score, feedback = pose_scoring(lm)
-            now = time.time()
-
-            # ---------- HOLD + SCREENSHOT (3s at good score) ----------
-            if score >= 80:
-                if hold_start_time is None:
-                    hold_start_time = now
-                elif now - hold_start_time >= 3 and not screenshot_taken:
-                    path = os.path.join("snapshots", f"{pose_name}_held.jpg")
-                    cv2.imwrite(path, image)
-                    screenshot_taken = True
-                    if correct_sound:
-                        correct_sound.play()
+# keyboard key -> position of the pose in the POSE_RULES output
+POSE_INDEX = {str(i + 1): i for i in range(len(POSE_RULES))}
+POSE_HELP = "  ".join(f"{key}:{POSE_RULES.names[i].split()[0]}" for key, i in POSE_INDEX.items())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="AI Bodybuilding Coach")
+    # Default to Front Double Biceps (1) to avoid blocking input when run from web app
+    parser.add_argument("--pose", default="1", choices=list(POSE_INDEX),
+                        help="starting pose (switch with the number keys)")
+    parser.add_argument("--source", default="0",
+                        help="camera index, video file, or session file (.cfs) to replay without inference")
+    parser.add_argument("--record", nargs="?", const=default_session_path(), metavar="PATH",
+                        help="record landmarks and scores to a session file")
+    parser.add_argument("--snapshot-format", default="jpg", choices=list(ENCODERS),
+                        help="image format for held-pose snapshots")
+    parser.add_argument("--voice", choices=list(BACKENDS),
+                        help="speak feedback with clips pre-rendered by build_voice_pack.py")
+    parser.add_argument("--no-smoothing", action="store_true",
+                        help="score raw landmarks (no One-Euro filter)")
+    parser.add_argument("--control-port", type=int,
+                        help="accept pose/status/quit commands on this local port (one coach per port)")
+    parser.add_argument("--idle-timeout", type=float, default=0,
+                        help="close after this many seconds with no one in view (0: never)")
+    parser.add_argument("--profile", action="store_true",
+                        help="show per-stage p50/p95 timings and FPS on screen")
+    parser.add_argument("--profile-csv", nargs="?", const=default_profile_path(), metavar="PATH",
+                        help="write every frame's stage timings to a CSV on exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("Running from:", os.getcwd())
+
+    # governor decisions are logged at INFO
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+
+    # claim the control port before the camera: it is the single-instance lock
+    control = None
+    if args.control_port:
+        try:
+            control = ControlServer(args.control_port)
+        except OSError:
+            print(f"A coach is already running on control port {args.control_port}")
+            return 1
+
+    # played on a worker thread with per-cue cooldowns; posting never blocks
+    cues = load_cues(os.getcwd(), voice=args.voice)
+
+    current_pose_key = args.pose
+    pose_name = POSE_RULES.names[POSE_INDEX[current_pose_key]]
+    print(f"\n🔥 Selected Pose: {pose_name}\n")
+
+    # ---------- Camera ----------
+    # videos and recordings play at their own frame rate
+    cap = open_source(args.source, realtime=True)
+    if not cap.isOpened():
+        print(f"Cannot open source {args.source}")
+        cues.close()
+        if control:
+            control.close()
+        return 1
+    # encoded and written on a background thread, off the frame loop
+    snapshots = SnapshotWriter("snapshots", args.snapshot_format)
+
+    # hysteresis: a hold survives a noisy frame or a missed detection
+    hold = HoldTracker(enter=80, exit=70, grace=0.3, hold_seconds=3)
+
+    last_report = time.time()
+    last_active = time.time()
+
+    # crop, adaptive model complexity / stride and landmark mapping (recorded landmarks on replay)
+    tracker = cap.tracker(smoothing=not args.no_smoothing)
+    recorder = SessionRecorder(args.record, POSE_RULES.names) if args.record else None
+    # one row of stage timings per presented frame
+    profiler = StageProfiler(csv_path=args.profile_csv)
+    show_profile = args.profile
+
+    # ---------- INFERENCE (runs on the pipeline's inference thread) ----------
+    def infer(frame):
+        start = time.perf_counter()
+        result, lm = tracker.process(frame)
+        tracked = time.perf_counter()
+        # every pose is scored each frame for the side panel
+        scored = POSE_RULES.score_frame(lm) if lm is not None else None
+        return result, lm, scored, (tracked - start, time.perf_counter() - tracked)
+
+    try:
+        # capture and inference run on their own threads; stale frames are dropped,
+        # and frames are decoded into arrays recycled once presented or dropped
+        pipeline = FramePipeline(cap.read, infer, pool=FramePool()).start()
+
+        for packet in pipeline:
+            image = packet.frame
+            result, lm, scored, (process_seconds, scoring_seconds) = packet.result
+            profiler.add("capture", packet.read_seconds)
+            profiler.add("pose.process", process_seconds)
+            if scored:
+                profiler.add("scoring", scoring_seconds)
+            if recorder:
+                recorder.append(packet.captured_at, lm, *(scored or (None, None)),
+                                pose=POSE_INDEX[current_pose_key])
+
+            if scored:
+                with profiler.measure("draw_landmarks"):
+                    mp_drawing.draw_landmarks(
+                        image, result.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+
+                scores, feedback_ids = scored
+                pose_idx = POSE_INDEX[current_pose_key]
+                score = scores[pose_idx]
+                feedback = POSE_RULES.feedback[pose_idx][feedback_ids[pose_idx]]
+                now = time.time()
+                last_active = now
+
+                # ---------- HOLD + SCREENSHOT (3s at good score) ----------
+                if hold.update(now, score) == "complete":
+                    snapshots.submit(f"{pose_name}_held", image)
+                    cues.post("correct")
+                elif not hold.holding and score > 0:  # not while no pose is held
+                    cues.post(feedback if feedback in cues.sounds else "coach")
+
+                # ---------- UI ----------
+                with profiler.measure("putText"):
+                    draw_scores(image, pose_name, score, feedback, POSE_RULES.names, scores,
+                                hold.hold_time(now) if hold.holding else None)
             else:
-                hold_start_time = None
-                screenshot_taken = False
-                if coach_sound and score > 0:  # avoid spam when no pose
-                    coach_sound.play()
-
-            # ---------- UI ----------
-            color = (0, 255, 0) if score >= 80 else (0, 0, 255)
-            cv2.putText(image, f"{pose_name} | Score: {score}",
-                        (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 3)
-
-            if hold_start_time:
-                hold_time = int(now - hold_start_time)
-                cv2.putText(image, f"Hold: {hold_time}s",
-                            (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.8,
-                            (255, 255, 255), 2)
-
-            cv2.putText(image, feedback,
-                        (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.8,
-                        (255, 255, 255), 2)
-
-        # bottom help text (always visible)
-        cv2.putText(image, "1:Front  2:Back  3:Side  4:Lat | Q:Quit",
-                    (10, image.shape[0] - 15),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-
-        cv2.imshow("AI Bodybuilding Coach", image)
-
-        # ---- KEYBOARD CONTROLS ----
-        key = cv2.waitKey(1) & 0xFF
-
-        # pose switching
-        if key in [ord('1'), ord('2'), ord('3'), ord('4')]:
-            new_key = chr(key)
-            if new_key != current_pose_key:
+                hold.update(time.time(), None)
+
+            # bottom help text (always visible) and frame rate
+            fps = pipeline.stats["present"].snapshot()["fps"]
+            with profiler.measure("putText"):
+                draw_footer(image, f"{POSE_HELP} | Q:Quit", fps)
+
+            if show_profile:
+                profiler.overlay(image)
+
+            with profiler.measure("imshow"):
+                cv2.imshow("AI Bodybuilding Coach", image)
+            pipeline.presented(packet)
+
+            if time.time() - last_report >= 5:
+                print(pipeline.report(), "|", tracker.status())
+                last_report = time.time()
+
+            # ---- KEYBOARD AND REMOTE CONTROLS ----
+            with profiler.measure("waitKey"):
+                key = cv2.waitKey(1) & 0xFF
+            profiler.end_frame()
+            if key == ord('p'):
+                show_profile = not show_profile
+            new_key = chr(key) if chr(key) in POSE_INDEX else None
+            quit_requested = key == ord('q')
+
+            if control:
+                for command in control.pending():
+                    last_active = time.time()
+                    if command["cmd"] == "pose" and command.get("pose") in POSE_INDEX:
+                        new_key = command["pose"]
+                    elif command["cmd"] == "quit":
+                        quit_requested = True
+                    # bring the window to the front for every web request
+                    cv2.setWindowProperty("AI Bodybuilding Coach", cv2.WND_PROP_TOPMOST, 1)
+                    cv2.setWindowProperty("AI Bodybuilding Coach", cv2.WND_PROP_TOPMOST, 0)
+                control.state.update(pose=pose_name, fps=round(fps, 1),
+                                     idle=round(time.time() - last_active, 1))
+
+            # pose switching
+            if new_key and new_key != current_pose_key:
                 current_pose_key = new_key
-                pose_name, pose_scoring = POSES[current_pose_key]
+                pose_name = POSE_RULES.names[POSE_INDEX[current_pose_key]]
 
                 # reset hold logic on pose change
-                hold_start_time = None
-                screenshot_taken = False
+                hold.reset()
 
                 print(f"Switched to pose: {pose_name}")
 
-        # quit
-        if key == ord('q'):
-            break
-
-cap.release()
-cv2.destroyAllWindows()
+            if args.idle_timeout and time.time() - last_active > args.idle_timeout:
+                print(f"No one in view for {args.idle_timeout:.0f}s, closing")
+                quit_requested = True
+
+            # quit
+            if quit_requested:
+                break
+
+        pipeline.stop()
+        print(pipeline.report(), "|", tracker.status())
+        print(profiler.report())
+
+    finally:
+        if control:
+            control.close()
+        tracker.close()
+        snapshots.close()
+        cues.close()
+        print(snapshots.stats())
+        print(cues.stats())
+        if recorder:
+            recorder.close()
+            print(f"Recorded {recorder.frames} frames to {recorder.path}")
+        if args.profile_csv:
+            profiler.close()
+            print(f"Wrote {profiler.frames} frame timings to {args.profile_csv}")
+        cap.release()
+        cv2.destroyAllWindows()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Score recorded posing routines and photo sets offline.
+
+Usage: python batch_score.py INPUT [INPUT ...] [--pose N|all] [--out scores.csv]
+                             [--workers N] [--complexity 0-2]
+
+INPUT is a video file, an image file or a folder of images. Frames are
+decoded and run through MediaPipe in a pool of worker processes. Per-frame
+scores and feedback go to --out (.csv or .parquet); the best frame of every
+source and pose goes next to it as <out>_best.csv / .parquet.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+from checkfit import POSE_RULES
+from checkfit.batch import BestFrames, frame_columns, score_sources
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-score videos and images with the CheckFit scorers")
+    parser.add_argument("inputs", nargs="+", help="video files, image files or image folders")
+    pose_keys = [str(i + 1) for i in range(len(POSE_RULES))]
+    parser.add_argument("--pose", default="all", choices=pose_keys + ["all"],
+                        help="pose to score (number keys as in app1.py) or all")
+    parser.add_argument("--out", default="scores.csv", help="per-frame output (.csv or .parquet)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--complexity", type=int, default=1, choices=(0, 1, 2),
+                        help="MediaPipe model complexity")
+    parser.add_argument("--chunk", type=int, default=240, help="video frames per task")
+    return parser.parse_args(argv)
+
+
+def best_path(out):
+    root, ext = os.path.splitext(out)
+    return f"{root}_best{ext}"
+
+
+class CsvWriter:
+    def __init__(self, path, columns):
+        self._file = open(path, "w", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=columns)
+        self._writer.writeheader()
+
+    def write(self, row):
+        self._writer.writerow(row)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """Buffers rows and writes them with pandas on close (needs pyarrow)."""
+
+    def __init__(self, path, columns):
+        try:
+            import pandas  # noqa: F401
+        except ImportError:
+            raise SystemExit("Parquet output needs pandas and pyarrow: pip install pandas pyarrow")
+        self.path = path
+        self.columns = columns
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+
+    def close(self):
+        import pandas as pd
+        pd.DataFrame(self.rows, columns=self.columns).to_parquet(self.path, index=False)
+
+
+def open_writer(path, columns):
+    if path.lower().endswith(".parquet"):
+        return ParquetWriter(path, columns)
+    return CsvWriter(path, columns)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.pose == "all":
+        pose_indices = list(range(len(POSE_RULES)))
+    else:
+        pose_indices = [int(args.pose) - 1]
+
+    best = BestFrames()
+    writer = open_writer(args.out, frame_columns(pose_indices))
+    start = time.perf_counter()
+
+    def progress(done, total, frames):
+        elapsed = time.perf_counter() - start
+        print(f"\r{done}/{total} tasks | {frames} frames | {frames / elapsed:.1f} fps",
+              end="", flush=True)
+
+    try:
+        for row in score_sources(args.inputs, pose_indices, workers=args.workers,
+                                 model_complexity=args.complexity, chunk_frames=args.chunk,
+                                 best=best, progress=progress):
+            writer.write(row)
+    finally:
+        writer.close()
+    print()
+
+    best_rows = list(best.rows())
+    best_writer = open_writer(best_path(args.out), list(best_rows[0]) if best_rows else ["source"])
+    for row in best_rows:
+        best_writer.write(row)
+        print(f"{row['source']} | {row['pose']}: best frame {row['best_frame']} "
+              f"(score {row['best_score']}, {row['detected_frames']}/{row['frames']} frames detected)")
+    best_writer.close()
+
+    print(f"Wrote {args.out} and {best_path(args.out)} "
+          f"in {time.perf_counter() - start:.1f}s with {args.workers} workers")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
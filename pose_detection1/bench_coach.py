@@ -0,0 +1,186 @@
+"""Headless end-to-end benchmark of the coach loop, no webcam or display needed.
+
+Usage: python bench_coach.py SOURCE [SOURCE ...] [--configs threaded,sequential,...]
+                             [--frames 300] [--warmup 30] [--json results.json] [--min-fps N]
+
+A SOURCE is a video file or a session recorded with ``app1.py --record``
+(``.cfs``, replayed without inference so scoring and rendering are measured
+on their own); a camera index also works. Every source is run through each
+configuration of the app1.py loop (capture, tracking, scoring, skeleton and
+text overlay, everything but the window) as fast as it will go:
+
+    threaded     capture and inference on their own threads (app1.py)
+    sequential   read, infer and draw one frame at a time (make_sounds.py)
+    raw          threaded, without One-Euro smoothing
+    no-render    threaded, without drawing
+
+After --warmup frames, it reports the sustained FPS, capture-to-present
+latency percentiles and per-stage p50/p95 over the next --frames frames.
+Sources loop until enough frames have been presented. With --min-fps it exits
+with 1 when any run is slower, for CI.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import mediapipe as mp
+import numpy as np
+
+from checkfit import POSE_RULES
+from checkfit.buffers import FramePool
+from checkfit.overlay import draw_footer, draw_scores
+from checkfit.pipeline import FramePipeline, Packet
+from checkfit.profiler import StageProfiler
+from checkfit.sources import open_source
+
+mp_drawing = mp.solutions.drawing_utils
+mp_pose = mp.solutions.pose
+
+CONFIGS = {
+    "threaded": {"threaded": True, "smoothing": True, "render": True},
+    "sequential": {"threaded": False, "smoothing": True, "render": True},
+    "raw": {"threaded": True, "smoothing": False, "render": True},
+    "no-render": {"threaded": True, "smoothing": True, "render": False},
+}
+STAGES = ("capture", "pose.process", "scoring", "draw_landmarks", "putText")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the coach loop without a webcam")
+    parser.add_argument("sources", nargs="+", help="video files, session files (.cfs) or camera indexes")
+    parser.add_argument("--configs", default=",".join(CONFIGS),
+                        help=f"comma-separated configurations ({', '.join(CONFIGS)})")
+    parser.add_argument("--frames", type=int, default=300, help="frames measured per run")
+    parser.add_argument("--warmup", type=int, default=30, help="frames presented before measuring")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--min-fps", type=float, help="exit with 1 if any run is slower")
+    args = parser.parse_args(argv)
+    args.configs = args.configs.split(",")
+    unknown = [name for name in args.configs if name not in CONFIGS]
+    if unknown:
+        parser.error(f"unknown configurations: {', '.join(unknown)}")
+    return args
+
+
+def sequential(read_frame, infer):
+    """``FramePipeline``'s packets, produced one at a time on this thread."""
+    frame = None
+    while True:
+        start = time.perf_counter()
+        # decoded into the previous frame's array, as make_sounds.py does
+        ok, frame = read_frame(frame)
+        if not ok:
+            return
+        packet = Packet(frame, start, time.perf_counter() - start)
+        packet.result = infer(frame)
+        packet.inferred_at = time.perf_counter()
+        yield packet
+
+
+def run(spec, config, frames, warmup):
+    source = open_source(spec, loop=True)
+    if not source.isOpened():
+        raise OSError(f"cannot open {spec}")
+    tracker = source.tracker(smoothing=config["smoothing"])
+    profiler = StageProfiler(STAGES, capacity=frames, window=frames)
+    latencies = np.zeros(frames)
+    pose_idx = 0
+
+    def infer(frame):
+        start = time.perf_counter()
+        result, lm = tracker.process(frame)
+        tracked = time.perf_counter()
+        scored = POSE_RULES.score_frame(lm) if lm is not None else None
+        return result, lm, scored, (tracked - start, time.perf_counter() - tracked)
+
+    pipeline = FramePipeline(source.read, infer, pool=FramePool()).start() if config["threaded"] else None
+    packets = pipeline if pipeline else sequential(source.read, infer)
+    presented, detected, started, finished = 0, 0, time.perf_counter(), None
+    try:
+        for packet in packets:
+            image = packet.frame
+            result, lm, scored, (process_seconds, scoring_seconds) = packet.result
+            profiler.add("capture", packet.read_seconds)
+            profiler.add("pose.process", process_seconds)
+            if scored:
+                profiler.add("scoring", scoring_seconds)
+            if config["render"]:
+                if scored:
+                    with profiler.measure("draw_landmarks"):
+                        mp_drawing.draw_landmarks(image, result.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+                    scores, feedback_ids = scored
+                    with profiler.measure("putText"):
+                        draw_scores(image, POSE_RULES.names[pose_idx], scores[pose_idx],
+                                    POSE_RULES.feedback[pose_idx][feedback_ids[pose_idx]],
+                                    POSE_RULES.names, scores)
+                with profiler.measure("putText"):
+                    draw_footer(image, "benchmark", 0.0)
+
+            now = time.perf_counter()
+            if pipeline:
+                pipeline.presented(packet)
+            presented += 1
+            if presented == warmup:
+                started = now
+            elif presented > warmup:
+                latencies[presented - warmup - 1] = now - packet.captured_at
+                detected += scored is not None
+                profiler.end_frame()
+                finished = now
+                if presented == warmup + frames:
+                    break
+            else:
+                profiler.discard_frame()
+    finally:
+        if pipeline:
+            pipeline.stop()
+        tracker.close()
+        source.release()
+
+    measured = max(presented - warmup, 0)
+    if not measured:
+        raise RuntimeError(f"{spec} ended during warmup")
+    latencies = latencies[:measured] * 1000
+    summary = profiler.summary(max_age=0)
+    return {
+        "fps": measured / (finished - started) if finished > started else 0.0,
+        "frames": measured,
+        "detected": detected,
+        "latency_ms": {f"p{q}": float(np.percentile(latencies, q)) for q in (50, 95, 99)},
+        "stages_ms": {stage: {"p50": summary[stage][0], "p95": summary[stage][1]} for stage in STAGES},
+        "dropped": pipeline.captured.dropped + pipeline.inferred.dropped if pipeline else 0,
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results, slow = [], []
+    print(f"{args.frames} frames per run after {args.warmup} warmup frames")
+    for spec in args.sources:
+        print(f"\n{spec}")
+        print(f"  {'':<11}{'FPS':>7} {'latency p50/p95/p99 ms':>24}  " +
+              "  ".join(f"{stage:>14}" for stage in STAGES) + f"  {'dropped':>7}")
+        for name in args.configs:
+            result = run(spec, CONFIGS[name], args.frames, args.warmup)
+            results.append({"source": spec, "config": name, **result})
+            latency = result["latency_ms"]
+            print(f"  {name:<11}{result['fps']:7.1f} "
+                  f"{latency['p50']:10.1f} /{latency['p95']:6.1f} /{latency['p99']:6.1f}  " +
+                  "  ".join(f"{result['stages_ms'][stage]['p50']:6.2f}/{result['stages_ms'][stage]['p95']:<7.2f}"
+                            for stage in STAGES) + f"  {result['dropped']:7d}")
+            if args.min_fps and result["fps"] < args.min_fps:
+                slow.append(f"{spec} {name}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"frames": args.frames, "warmup": args.warmup, "results": results}, f, indent=2)
+        print(f"\nWrote {args.json}")
+    if slow:
+        print(f"\nBelow {args.min_fps} FPS: " + ", ".join(slow))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
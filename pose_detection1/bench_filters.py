@@ -0,0 +1,127 @@
+"""Count hold / sound / snapshot transitions on recorded sessions, with and without smoothing.
+
+Usage: python bench_filters.py SESSION.cfs [SESSION.cfs ...] [--min-cutoff 1.5] [--beta 8]
+                               [--enter 80] [--exit 70] [--grace 0.3]
+
+Each session (recorded with ``--record``) is replayed four ways: raw
+landmarks with the old hold logic (break on the first frame under 80), raw
+with hysteresis, One-Euro filtered landmarks with the old logic, and filtered
+with hysteresis. For the pose that was active on each frame it counts hold
+starts and breaks, completed holds (snapshots), coaching cues (entering the
+"not held, score > 0" state) and frames where the score crossed 80, plus the
+mean frame-to-frame score change. Fewer transitions mean fewer snapshot writes
+and fewer sounds.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from checkfit import POSE_RULES
+from checkfit.filters import HoldTracker, OneEuroFilter
+from checkfit.session import SessionReader
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark landmark smoothing and hold hysteresis")
+    parser.add_argument("sessions", nargs="+", help="session files (.cfs)")
+    parser.add_argument("--min-cutoff", type=float, default=1.5)
+    parser.add_argument("--beta", type=float, default=8.0)
+    parser.add_argument("--enter", type=int, default=80)
+    parser.add_argument("--exit", type=int, default=70)
+    parser.add_argument("--grace", type=float, default=0.3)
+    return parser.parse_args(argv)
+
+
+def filtered(timestamps, landmarks, one_euro):
+    """Run the filter over a session; returns the smoothed landmarks and µs per frame."""
+    out = np.full_like(landmarks, np.nan)
+    start = time.perf_counter()
+    for i in range(len(landmarks)):
+        lm = None if np.isnan(landmarks[i, 0, 0]) else landmarks[i]
+        smoothed = one_euro(lm, timestamps[i])
+        if smoothed is not None:
+            out[i] = smoothed
+    return out, (time.perf_counter() - start) / max(len(landmarks), 1) * 1e6
+
+
+def active_scores(landmarks, pose):
+    """The active pose's score per frame; -1 where nobody was detected."""
+    scores = np.full(len(landmarks), -1, dtype=np.int64)
+    detected = ~np.isnan(landmarks[:, 0, 0])
+    if detected.any():
+        all_scores, _ = POSE_RULES.score(landmarks[detected])
+        scores[detected] = all_scores[np.arange(len(all_scores)), pose[detected]]
+    return scores
+
+
+def transitions(timestamps, scores, hold):
+    counts = {"starts": 0, "breaks": 0, "snapshots": 0, "coach cues": 0}
+    coaching = False
+    for t, score in zip(timestamps.tolist(), scores.tolist()):
+        event = hold.update(t, None if score < 0 else score)
+        if event == "start":
+            counts["starts"] += 1
+        elif event == "break":
+            counts["breaks"] += 1
+        elif event == "complete":
+            counts["snapshots"] += 1
+        now_coaching = not hold.holding and score > 0
+        counts["coach cues"] += now_coaching and not coaching
+        coaching = now_coaching
+    detected = scores >= 0
+    above = scores[detected] >= hold.enter
+    counts["80 crossings"] = int(np.count_nonzero(above[1:] != above[:-1]))
+    counts["mean |dscore|"] = float(np.abs(np.diff(scores[detected])).mean()) if detected.sum() > 1 else 0.0
+    return counts
+
+
+def report(path, args):
+    with SessionReader(path) as reader:
+        if not reader.frames:
+            print(f"\n{path}: empty")
+            return
+        timestamps = reader.column("timestamps")
+        landmarks = reader.column("landmarks").astype(np.float64)
+        pose = reader.column("pose").astype(np.int64)
+        # sessions recorded with other pose lists: map by name, skip unknown poses
+        names = [POSE_RULES.names.index(n) if n in POSE_RULES.names else -1 for n in reader.pose_names]
+    pose = np.array(names)[pose]
+    landmarks[pose < 0] = np.nan
+    pose[pose < 0] = 0
+
+    smooth, cost = filtered(timestamps, landmarks, OneEuroFilter(args.min_cutoff, args.beta))
+    raw_scores, smooth_scores = active_scores(landmarks, pose), active_scores(smooth, pose)
+
+    def old_logic():
+        return HoldTracker(enter=args.enter, exit=args.enter, grace=0)
+
+    def hysteresis():
+        return HoldTracker(enter=args.enter, exit=args.exit, grace=args.grace)
+
+    rows = {
+        "raw": transitions(timestamps, raw_scores, old_logic()),
+        "raw + hysteresis": transitions(timestamps, raw_scores, hysteresis()),
+        "one-euro": transitions(timestamps, smooth_scores, old_logic()),
+        "one-euro + hysteresis": transitions(timestamps, smooth_scores, hysteresis()),
+    }
+    duration = float(timestamps[-1] - timestamps[0])
+    print(f"\n{path}: {reader.frames} frames, {duration:.1f}s | one-euro {cost:.1f} us/frame")
+    columns = list(rows["raw"])
+    print(f"  {'':<22}" + "".join(f"{c:>14}" for c in columns))
+    for label, counts in rows.items():
+        print(f"  {label:<22}" + "".join(
+            f"{counts[c]:>14.2f}" if isinstance(counts[c], float) else f"{counts[c]:>14d}" for c in columns))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    for path in args.sessions:
+        report(path, args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
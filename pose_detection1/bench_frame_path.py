@@ -0,0 +1,158 @@
+"""Compare the frame path in front of MediaPipe with and without reused buffers.
+
+Usage: python bench_frame_path.py [VIDEO] [--frames 500] [--size 1280x720] [--roi 320] [--mediapipe]
+
+The same frames go through three versions of the per-frame work between
+decoding and pose inference:
+
+    round-trip   BGR->RGB of the whole frame, then RGB->BGR back to draw on (the original loop)
+    allocating   crop, downscale and convert, each into a new array (the loop before buffer reuse)
+    reused       decode into a recycled frame; downscale and convert into preallocated
+                 buffers; MediaPipe gets a read-only view (app1.py / make_sounds.py now)
+
+The athlete is taken to fill the middle half of the frame, as the ROI crop
+would find. Without VIDEO, frames of --size are produced by copying a noise
+image, which stands in for decoding. For each version it prints the time per
+frame (p50/p95), the bytes allocated per frame (tracemalloc, measured in a
+second pass) and how many new image arrays the timed frames made. By
+default the model is a stub that reads the image, so only the frame path is
+timed; --mediapipe runs the real model too.
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from checkfit.buffers import FrameBuffer, to_rgb
+from checkfit.sources import VideoFileSource
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the frame path with and without buffer reuse")
+    parser.add_argument("video", nargs="?", help="video file (default: synthetic frames)")
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--size", default="1280x720", help="synthetic frame size, WIDTHxHEIGHT")
+    parser.add_argument("--roi", type=int, default=320, help="longest side of the image handed to the model")
+    parser.add_argument("--mediapipe", action="store_true", help="run MediaPipe Pose (complexity 0) as the model")
+    return parser.parse_args(argv)
+
+
+class SyntheticCapture:
+    """``read(image=None)`` like ``VideoCapture``: a copy of a noise frame, into ``image`` if given."""
+
+    def __init__(self, width, height):
+        self._frame = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+    def read(self, image=None):
+        if image is not None and image.shape == self._frame.shape:
+            np.copyto(image, self._frame)
+            return True, image
+        return True, self._frame.copy()
+
+
+def athlete_box(frame, target):
+    """Crop (middle half of the frame) and the downscaled size of it."""
+    h, w = frame.shape[:2]
+    x0, y0, cw, ch = w // 4, h // 8, w // 2, h * 3 // 4
+    scale = min(1.0, target / max(cw, ch))
+    return (x0, y0, cw, ch), (max(1, round(cw * scale)), max(1, round(ch * scale)))
+
+
+def round_trip(read, model, target, state):
+    ok, frame = read()
+    state["arrays"] += 1
+    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    rgb.flags.writeable = False
+    model(rgb)
+    rgb.flags.writeable = True
+    image = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+    state["arrays"] += 2
+    return image
+
+
+def allocating(read, model, target, state):
+    ok, frame = read()
+    (x0, y0, w, h), size = athlete_box(frame, target)
+    small = cv2.resize(frame[y0:y0 + h, x0:x0 + w], size, interpolation=cv2.INTER_AREA)
+    model(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+    state["arrays"] += 3
+    return frame
+
+
+def reused(read, model, target, state):
+    ok, frame = read(state.get("frame"))
+    if frame is not state.get("frame"):
+        state["frame"] = frame
+        state["arrays"] += 1
+    (x0, y0, w, h), size = athlete_box(frame, target)
+    small = cv2.resize(frame[y0:y0 + h, x0:x0 + w], size, interpolation=cv2.INTER_AREA,
+                       dst=state["small"].get(size[::-1] + (3,)))
+    model(to_rgb(small, state["rgb"]))
+    return frame
+
+
+PATHS = {"round-trip": round_trip, "allocating": allocating, "reused": reused}
+
+
+def arrays_made(state):
+    return state["arrays"] + state["small"].allocations + state["rgb"].allocations
+
+
+def run(path, state, read, model, frames, target, traced=False):
+    """Time per frame and bytes allocated per frame (with ``traced``)."""
+    times, allocated = np.zeros(frames), np.zeros(frames)
+    for i in range(frames):
+        if traced:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        path(read, model, target, state)
+        times[i] = time.perf_counter() - start
+        if traced:
+            allocated[i] = tracemalloc.get_traced_memory()[1] - before
+    return times, allocated
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.video:
+        source = VideoFileSource(args.video, loop=True)
+        if not source.isOpened():
+            print(f"Cannot open {args.video}")
+            return 1
+        read, label = source.read, args.video
+    else:
+        width, height = (int(v) for v in args.size.split("x"))
+        read, label = SyntheticCapture(width, height).read, f"synthetic {args.size}"
+
+    if args.mediapipe:
+        import mediapipe as mp
+        model = mp.solutions.pose.Pose(model_complexity=0).process
+    else:
+        def model(rgb):
+            return int(rgb[::16, ::16, 0].sum())
+
+    frame_shape = read()[1].shape
+    print(f"{label}: {frame_shape[1]}x{frame_shape[0]} frames, model input <= {args.roi}px, "
+          f"{args.frames} frames per run")
+    print(f"  {'':<12}{'p50 us':>9}{'p95 us':>9}{'FPS':>9}{'KB/frame':>11}{'new arrays':>12}")
+    for name, path in PATHS.items():
+        state = {"arrays": 0, "small": FrameBuffer(), "rgb": FrameBuffer()}
+        run(path, state, read, model, 20, args.roi)  # warm up caches, decoder and buffers
+        warm = arrays_made(state)
+        times, _ = run(path, state, read, model, args.frames, args.roi)
+        arrays = arrays_made(state) - warm
+        tracemalloc.start()
+        _, allocated = run(path, state, read, model, min(args.frames, 100), args.roi, traced=True)
+        tracemalloc.stop()
+        print(f"  {name:<12}{np.percentile(times, 50) * 1e6:9.0f}{np.percentile(times, 95) * 1e6:9.0f}"
+              f"{1 / times.mean():9.0f}{allocated.mean() / 1024:11.1f}{arrays:12d}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
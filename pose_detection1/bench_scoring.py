@@ -0,0 +1,81 @@
+"""Per-frame scoring microbenchmark: reference scorers vs the rule engine.
+
+Usage: python bench_scoring.py [frames]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from checkfit import POSES, POSE_RULES, REFERENCE_POSES
+
+
+def synthetic_frames(n, seed=0):
+    """Landmark frames jittered around a loose double-biceps stance."""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0.3, 0.7, size=(33, 3))
+    base[[11, 12], 1] = 0.35          # shoulders
+    base[[13, 14], 1] = 0.30          # elbows
+    base[[15, 16], 1] = 0.25          # wrists
+    base[[23, 24], 1] = 0.70          # hips
+    base[[11, 13, 15, 23], 0] += 0.1  # left side
+    base[[12, 14, 16, 24], 0] -= 0.1  # right side
+    return base + rng.normal(0, 0.06, size=(n, 33, 3))
+
+
+def timed(label, fn, frames):
+    start = time.perf_counter()
+    fn()
+    per_frame = (time.perf_counter() - start) / frames * 1e6
+    print(f"{label:<42} {per_frame:8.1f} us/frame")
+    return per_frame
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    frames = synthetic_frames(n)
+    # What app1.py builds from MediaPipe today: a list of [x, y, z] lists
+    as_lists = [frame.tolist() for frame in frames]
+    scorers = [POSES[key] for key in sorted(POSES)]
+    references = dict(REFERENCE_POSES[key] for key in sorted(REFERENCE_POSES))
+
+    # Check both rule engine paths against the hand-written reference scorers
+    scores, feedback = POSE_RULES.score(frames)
+    for i, lm in enumerate(as_lists):
+        live = POSE_RULES.score_all(frames[i])
+        for p, name in enumerate(POSE_RULES.names):
+            expected = references[name](lm)
+            batched = (int(scores[i, p]), POSE_RULES.feedback[p][feedback[i, p]])
+            if batched != (int(expected[0]), expected[1]) or live[p][1:] != batched:
+                print(f"Mismatch frame {i} pose {name}: {batched} / {live[p][1:]} != {expected}")
+                return 1
+    print(f"Rule engine matches the reference scorers on {n} frames\n")
+
+    def reference_one():
+        for lm in as_lists:
+            scorers[0][1](lm)
+
+    def reference_all():
+        for lm in as_lists:
+            for _, scorer in scorers:
+                scorer(lm)
+
+    def rules_frame():
+        for lm in frames:
+            POSE_RULES.score_frame(lm)
+
+    def rules_batch():
+        POSE_RULES.score(frames)
+
+    before_one = timed("before: one pose (calculate_angle)", reference_one, n)
+    before_all = timed(f"before: all {len(scorers)} poses", reference_all, n)
+    after = timed(f"after: all {len(POSE_RULES)} poses, rules per frame", rules_frame, n)
+    timed(f"after: all {len(POSE_RULES)} poses, rules batched", rules_batch, n)
+    print(f"\nPer-frame speedup: {before_all / after:.1f}x for all {len(POSE_RULES)} poses "
+          f"against {len(scorers)} reference poses (one pose before: {before_one:.1f} us)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
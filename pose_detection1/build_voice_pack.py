@@ -0,0 +1,53 @@
+"""Pre-render spoken coaching clips for every pose feedback message.
+
+Usage: python build_voice_pack.py [--backend elevenlabs|local] [--voice ID] [--model ID]
+                                  [--cache voice_cache] [--workers 4] [--batch 8]
+
+Collects every feedback string the pose rules can give and synthesizes the
+ones not already in the cache, a few at a time in parallel. Clips are stored
+by a hash of text, voice and model, so rerunning after a rules change only
+renders the new phrases. Start the coach with ``--voice BACKEND`` to speak
+them. The local backend needs no network or API key (tones, for testing).
+"""
+
+import argparse
+import sys
+import time
+
+from checkfit import POSE_RULES
+from checkfit.voice import BACKENDS, DEFAULT_CACHE, VoiceCache, build_voice_pack, feedback_phrases
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render voice coaching clips")
+    parser.add_argument("--backend", default="elevenlabs", choices=list(BACKENDS))
+    parser.add_argument("--voice", help="voice id (default: the backend's)")
+    parser.add_argument("--model", help="model id (default: the backend's)")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="clip cache directory")
+    parser.add_argument("--workers", type=int, default=4, help="parallel synthesis requests")
+    parser.add_argument("--batch", type=int, default=8, help="phrases per batch")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    options = {key: value for key, value in (("voice", args.voice), ("model", args.model)) if value}
+    if args.backend == "elevenlabs":
+        from dotenv import load_dotenv
+        load_dotenv()
+    backend = BACKENDS[args.backend](**options)
+
+    phrases = feedback_phrases(POSE_RULES)
+    print(f"{len(phrases)} feedback phrases | {backend.name} voice {backend.voice}, model {backend.model}")
+
+    start = time.perf_counter()
+    paths, stats = build_voice_pack(phrases, backend, VoiceCache(args.cache),
+                                    workers=args.workers, batch_size=args.batch,
+                                    progress=lambda text: print(f"  rendered: {text}"))
+    print(f"{stats['cached']} cached, {stats['synthesized']} synthesized, "
+          f"{stats['failed']} failed in {time.perf_counter() - start:.1f}s -> {args.cache}/")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,28 @@
+"""Pose scoring for the CheckFit bodybuilding coach.
+
+Importing this package has no side effects (no camera, audio or MediaPipe),
+so the scorers can be used from benchmarks, worker processes and the Flask
+app (``pose_detection1.checkfit``). The names in ``__all__`` are the stable
+API; ``app1.py`` and ``make_sounds.py`` are thin front-ends over it and
+``checkfit.live`` holds the webcam tracking they share.
+"""
+
+from .poses import FEATURES, POSE_DEFINITIONS
+from .rules import PoseRules, compile_poses, load_poses
+from .scoring import POSES, REFERENCE_POSES, calculate_angle, is_pose_ready
+
+# every pose in POSE_DEFINITIONS, compiled once
+POSE_RULES = compile_poses(POSE_DEFINITIONS, FEATURES)
+
+__all__ = [
+    "FEATURES",
+    "POSES",
+    "POSE_DEFINITIONS",
+    "POSE_RULES",
+    "REFERENCE_POSES",
+    "PoseRules",
+    "calculate_angle",
+    "compile_poses",
+    "is_pose_ready",
+    "load_poses",
+]
@@ -0,0 +1,234 @@
+"""Offline scoring of recorded videos and image folders in worker processes.
+
+Inputs are split into tasks (a range of video frames or a slice of an image
+folder) that a process pool decodes and runs through MediaPipe, one Pose
+instance per worker process. Each task's landmarks are scored together with
+the compiled ``POSE_RULES``. ``score_sources`` yields the per-frame rows in input order
+and keeps track of the best frame for every source and pose.
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from . import POSE_RULES
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+class Task:
+    """One unit of work: frames ``start..start+count`` of a video, or a list of images."""
+    __slots__ = ("source", "kind", "start", "count", "paths")
+
+    def __init__(self, source, kind, start=0, count=0, paths=()):
+        self.source = source
+        self.kind = kind  # "video" or "images"
+        self.start = start
+        self.count = count
+        self.paths = paths
+
+
+def _video_frame_count(path):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"Cannot open video: {path}")
+    frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return frames
+
+
+def plan_tasks(inputs, chunk_frames=240, chunk_images=32):
+    """Expand video files, image files and image folders into tasks."""
+    tasks = []
+    for path in inputs:
+        if os.path.isdir(path):
+            images = sorted(os.path.join(path, name) for name in os.listdir(path)
+                            if name.lower().endswith(IMAGE_EXTENSIONS))
+            for start in range(0, len(images), chunk_images):
+                paths = tuple(images[start:start + chunk_images])
+                tasks.append(Task(path, "images", start, len(paths), paths))
+        elif path.lower().endswith(IMAGE_EXTENSIONS):
+            tasks.append(Task(path, "images", 0, 1, (path,)))
+        else:
+            frames = _video_frame_count(path)
+            if frames <= 0:
+                # no frame count in the container: decode it as one task
+                tasks.append(Task(path, "video", 0, -1))
+                continue
+            for start in range(0, frames, chunk_frames):
+                # the count is read from the container and may be short: the last task reads to the end
+                count = chunk_frames if start + chunk_frames < frames else -1
+                tasks.append(Task(path, "video", start, count))
+    return tasks
+
+
+# ---------- worker process state ----------
+_complexity = 1
+_models = {}
+
+
+def _init_worker(model_complexity):
+    global _complexity
+    _complexity = model_complexity
+    # parallelism comes from the pool; keep OpenCV from oversubscribing cores
+    cv2.setNumThreads(1)
+
+
+def _pose_model(static_image_mode):
+    if static_image_mode not in _models:
+        import mediapipe as mp
+        _models[static_image_mode] = mp.solutions.pose.Pose(
+            static_image_mode=static_image_mode,
+            model_complexity=_complexity,
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.7)
+    return _models[static_image_mode]
+
+
+def _seek(cap, start):
+    """Position ``cap`` so the next ``read`` returns frame ``start``; ``False`` past the end.
+
+    Seeking may land on a nearby keyframe instead, so the capture decodes
+    forward from wherever it reports it landed; only a seek that overshot
+    (or failed) starts over from the first frame.
+    """
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    position = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+    if not 0 <= position <= start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        position = 0
+    for _ in range(start - position):
+        if not cap.grab():
+            return False
+    return True
+
+
+def _read_video(task):
+    cap = cv2.VideoCapture(task.source)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    if task.start and not _seek(cap, task.start):
+        cap.release()
+        return
+    index = task.start
+    while task.count < 0 or index < task.start + task.count:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        yield index, (round(index / fps, 3) if fps else None), "", frame
+        index += 1
+    cap.release()
+
+
+def _read_images(task):
+    for offset, path in enumerate(task.paths):
+        yield task.start + offset, None, os.path.basename(path), cv2.imread(path)
+
+
+def score_task(task):
+    """Worker entry point: decode, run MediaPipe and score every frame of ``task``.
+
+    Returns ``(meta, scores, feedback)`` where ``meta`` is a list of
+    ``(frame, time_s, image, detected)`` and the arrays hold detected frames only.
+    """
+    if task.kind == "video":
+        pose = _pose_model(False)
+        # tracking state from the previous task belongs to another clip
+        pose.reset()
+        frames = _read_video(task)
+    else:
+        pose = _pose_model(True)
+        frames = _read_images(task)
+
+    meta, landmarks = [], []
+    for index, time_s, image, frame in frames:
+        result = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)) if frame is not None else None
+        detected = bool(result and result.pose_landmarks)
+        if detected:
+            landmarks.append([[l.x, l.y, l.z] for l in result.pose_landmarks.landmark])
+        meta.append((index, time_s, image, detected))
+
+    if not landmarks:
+        empty = np.zeros((0, len(POSE_RULES)), dtype=np.int64)
+        return meta, empty, empty
+    scores, feedback = POSE_RULES.score(np.asarray(landmarks, dtype=np.float64))
+    return meta, scores, feedback
+
+
+class BestFrames:
+    """Highest-scoring frame per (source, pose); the earliest frame wins ties."""
+
+    def __init__(self):
+        self.best = {}
+        self.frames = {}
+        self.detected = {}
+
+    def update(self, source, pose_index, frame, time_s, score, detected):
+        key = (source, pose_index)
+        self.frames[key] = self.frames.get(key, 0) + 1
+        if not detected:
+            return
+        self.detected[key] = self.detected.get(key, 0) + 1
+        if key not in self.best or score > self.best[key][2]:
+            self.best[key] = (frame, time_s, score)
+
+    def rows(self):
+        for (source, pose_index), frames in self.frames.items():
+            frame, time_s, score = self.best.get((source, pose_index), (None, None, None))
+            yield {
+                "source": source,
+                "pose": POSE_RULES.names[pose_index],
+                "best_frame": frame,
+                "best_time_s": time_s,
+                "best_score": score,
+                "frames": frames,
+                "detected_frames": self.detected.get((source, pose_index), 0),
+            }
+
+
+def _column(pose_index):
+    return re.sub(r"[^a-z]+", "_", POSE_RULES.names[pose_index].lower())
+
+
+def frame_columns(pose_indices):
+    columns = ["source", "frame", "time_s", "image", "detected"]
+    for p in pose_indices:
+        columns += [f"{_column(p)}_score", f"{_column(p)}_feedback"]
+    return columns
+
+
+def score_sources(inputs, pose_indices, workers=None, model_complexity=1,
+                  chunk_frames=240, chunk_images=32, best=None, progress=None):
+    """Score every frame of ``inputs``; yields one row dict per frame, in order.
+
+    ``pose_indices`` selects poses by their index in ``POSE_RULES.names``. Pass a
+    ``BestFrames`` as ``best`` to collect the best frame indices, and a
+    callable as ``progress`` to receive ``(tasks_done, tasks_total, frames)``.
+    """
+    tasks = plan_tasks(inputs, chunk_frames, chunk_images)
+    workers = workers or os.cpu_count() or 1
+    frames = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(model_complexity,)) as pool:
+        # map() keeps input order while workers run ahead
+        for done, (task, (meta, scores, feedback)) in enumerate(
+                zip(tasks, pool.map(score_task, tasks)), 1):
+            row_index = 0
+            for frame, time_s, image, detected in meta:
+                row = {"source": task.source, "frame": frame, "time_s": time_s,
+                       "image": image, "detected": detected}
+                for p in pose_indices:
+                    score = int(scores[row_index, p]) if detected else None
+                    row[f"{_column(p)}_score"] = score
+                    row[f"{_column(p)}_feedback"] = \
+                        POSE_RULES.feedback[p][feedback[row_index, p]] if detected else ""
+                    if best is not None:
+                        best.update(task.source, p, frame, time_s, score, detected)
+                if detected:
+                    row_index += 1
+                frames += 1
+                yield row
+            if progress:
+                progress(done, len(tasks), frames)
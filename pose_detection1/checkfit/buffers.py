@@ -0,0 +1,71 @@
+"""Preallocated frame buffers for the coach's hot path.
+
+``FrameBuffer`` is one block of memory written in place every frame (the
+downscaled crop, the RGB copy for MediaPipe). ``get`` returns a contiguous
+array of the requested shape over the start of it, so the crop size may
+change every frame without a new allocation; the block only grows. ``to_rgb``
+converts into it and returns a read-only array, so MediaPipe takes the pixels
+by reference and the BGR frame stays the one we draw on. ``FramePool``
+recycles whole capture frames through the threaded pipeline:
+``VideoCapture.read`` decodes into a returned array instead of a new one.
+"""
+
+import math
+import threading
+
+import cv2
+import numpy as np
+
+
+class FrameBuffer:
+    def __init__(self):
+        self._data = None
+        self.allocations = 0
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes if self._data is not None else 0
+
+    def get(self, shape, dtype=np.uint8):
+        """A contiguous ``shape`` array over the buffer (a view; grows the buffer if needed)."""
+        dtype = np.dtype(dtype)
+        size = math.prod(shape) * dtype.itemsize
+        if self._data is None or self._data.nbytes < size:
+            self._data = np.empty(size, dtype=np.uint8)
+            self.allocations += 1
+        return self._data[:size].view(dtype).reshape(shape)
+
+
+def to_rgb(image, buffer):
+    """BGR ``image`` converted into ``buffer``; returns it read-only for MediaPipe."""
+    rgb = buffer.get(image.shape)
+    cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=rgb)
+    rgb.flags.writeable = False
+    return rgb
+
+
+class FramePool:
+    """Capture frames handed back once presented or dropped, for ``read(image)`` to reuse."""
+
+    def __init__(self, size=4):
+        self.size = size
+        self._free = []
+        self._lock = threading.Lock()
+        self.allocations = 0
+
+    def acquire(self):
+        """A free frame array, or ``None`` (``read`` then allocates one)."""
+        with self._lock:
+            return self._free.pop() if self._free else None
+
+    def decoded(self, buffer, frame):
+        """Count ``read`` allocating ``frame`` instead of reusing ``buffer``."""
+        if frame is not None and frame is not buffer:
+            self.allocations += 1
+
+    def release(self, frame):
+        if frame is None:
+            return
+        with self._lock:
+            if len(self._free) < self.size:
+                self._free.append(frame)
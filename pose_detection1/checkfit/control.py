@@ -0,0 +1,196 @@
+"""Single-instance control of the desktop coach (app1.py).
+
+The coach started with ``--control-port`` listens on 127.0.0.1 for
+authenticated ``multiprocessing.connection`` messages: ``{"cmd": "pose",
+"pose": "2"}`` switches the pose in the running window, ``{"cmd": "status"}``
+reports what it is doing and ``{"cmd": "quit"}`` closes it. Holding the port
+is also the per-host lock: a second coach cannot bind it and exits.
+
+``CoachManager`` is the web app's side. ``open`` reuses the warm coach when
+one answers and only starts a new process (paying MediaPipe's cold start)
+when none does, without waiting for it to load. The coach closes itself
+after ``--idle-timeout`` seconds without anyone in view or any command.
+"""
+
+import hashlib
+import os
+import queue
+import socket
+import subprocess
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Connection, Listener, answer_challenge, deliver_challenge
+
+DEFAULT_PORT = 47641
+KEY_ENV = "CHECKFIT_CONTROL_KEY"
+COMMAND_TIMEOUT = 2.0
+
+
+def control_key(secret):
+    """Authkey shared by the web app and the coach, derived from the app's secret."""
+    return hashlib.sha256(b"checkfit-control:" + secret.encode()).hexdigest()
+
+
+class ControlServer:
+    """Coach side: answers ``status`` itself and queues the other commands for the frame loop."""
+
+    def __init__(self, port=DEFAULT_PORT, authkey=None):
+        authkey = (authkey or os.getenv(KEY_ENV) or "").encode()
+        # raises OSError when another coach already holds the port
+        self._listener = Listener(("127.0.0.1", port), authkey=authkey or None)
+        self.port = port
+        self.commands = queue.SimpleQueue()
+        # filled in by the frame loop (pose, fps, idle seconds, ...)
+        self.state = {"pid": os.getpid(), "started": time.time()}
+        threading.Thread(target=self._serve, name="control", daemon=True).start()
+
+    def _serve(self):
+        while True:
+            # close() may clear the attribute at any moment
+            listener = self._listener
+            if listener is None:
+                return
+            try:
+                conn = listener.accept()
+            except (EOFError, ConnectionError, AuthenticationError):
+                continue  # failed handshake (wrong key, or a client that hung up): keep listening
+            except OSError:
+                return  # the listening socket itself is closed or broken
+            with conn:
+                try:
+                    # a client that never sends must not block the next one
+                    if conn.poll(COMMAND_TIMEOUT):
+                        conn.send(self._handle(conn.recv()))
+                except (EOFError, OSError, TypeError) as e:
+                    print(f"Error on control connection: {str(e)}")
+
+    def _handle(self, message):
+        if not isinstance(message, dict):
+            return {"ok": False, "error": f"Expected a dict, got {type(message).__name__}"}
+        cmd = message.get("cmd")
+        if cmd == "status":
+            return {"ok": True, **self.state, "uptime": round(time.time() - self.state["started"], 1)}
+        if cmd in ("pose", "quit", "show"):
+            self.commands.put(message)
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown command {cmd!r}"}
+
+    def pending(self):
+        """Commands received since the last call (for the frame loop; never blocks)."""
+        while True:
+            try:
+                yield self.commands.get_nowait()
+            except queue.Empty:
+                return
+
+    def close(self):
+        listener, self._listener = self._listener, None
+        if listener:
+            # closing the socket does not wake a blocked accept(); a connection does,
+            # and _serve then sees the cleared listener and returns
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=COMMAND_TIMEOUT).close()
+            except OSError:
+                pass
+            listener.close()
+
+
+def send_command(message, port=DEFAULT_PORT, authkey=None, timeout=COMMAND_TIMEOUT):
+    """Send one command to a running coach; ``None`` if none answers within ``timeout`` seconds.
+
+    ``Client`` has no timeout, and a wedged coach can stall its handshake as
+    well as its reply. So the connect, the handshake, the command and the
+    reply all share one deadline: they run on a helper thread, and a socket
+    still open at the deadline is shut down, which also ends that thread.
+    """
+    deadline = time.monotonic() + timeout
+    key = (authkey or "").encode() or None
+    try:
+        sock = socket.create_connection(("127.0.0.1", port), timeout=timeout)
+        sock.setblocking(True)
+        # the Connection owns a duplicate; this one is kept to shut it down
+        conn = Connection(sock.dup().detach())
+    except OSError:
+        return None
+    reply = []
+
+    def exchange():
+        with conn:
+            try:
+                if key is not None:
+                    answer_challenge(conn, key)
+                    deliver_challenge(conn, key)
+                conn.send(message)
+                reply.append(conn.recv())
+            except (EOFError, OSError, AuthenticationError):
+                pass
+
+    worker = threading.Thread(target=exchange, name="control-client", daemon=True)
+    worker.start()
+    worker.join(max(0.0, deadline - time.monotonic()))
+    with sock:
+        if worker.is_alive():
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+    return reply[0] if reply else None
+
+
+class CoachManager:
+    """Web app side: at most one warm coach process per host."""
+
+    def __init__(self, command, cwd, authkey, poses, port=DEFAULT_PORT, idle_timeout=600):
+        """
+        command: argv that starts the coach, without the control options
+        poses: the coach's ``--pose`` keys (``"1"`` for its first pose, ...)
+        idle_timeout: seconds the coach stays open with no one in view
+        """
+        self.command = list(command)
+        self.poses = set(poses)
+        self.cwd = cwd
+        self.authkey = authkey
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._process = None
+        self.launches = 0
+
+    def send(self, message):
+        return send_command(message, self.port, self.authkey)
+
+    def status(self):
+        reply = self.send({"cmd": "status"})
+        if reply is None:
+            return {"running": False, "launches": self.launches}
+        return {"running": True, "launches": self.launches, **reply}
+
+    def open(self, pose=None):
+        """Show the coach on ``pose``, starting it if none answers.
+
+        Returns ``"reused"``, ``"starting"`` (launched earlier, still loading)
+        or ``"started"``. Never waits for the cold start. Raises ``ValueError``
+        for a pose the coach does not have.
+        """
+        if pose and pose not in self.poses:
+            raise ValueError(f"Unknown pose {pose!r}")
+        with self._lock:
+            message = {"cmd": "pose", "pose": pose} if pose else {"cmd": "show"}
+            if self.send(message) is not None:
+                return "reused"
+            if self._process is not None and self._process.poll() is None:
+                return "starting"
+            argv = self.command + ["--control-port", str(self.port),
+                                   "--idle-timeout", str(self.idle_timeout)]
+            if pose:
+                argv += ["--pose", pose]
+            # a coach started at the same moment by another web worker loses
+            # the control port and exits before opening the camera
+            self._process = subprocess.Popen(argv, cwd=self.cwd,
+                                             env={**os.environ, KEY_ENV: self.authkey})
+            self.launches += 1
+            return "started"
+
+    def close(self):
+        self.send({"cmd": "quit"})
@@ -0,0 +1,119 @@
+"""Audio cue scheduler for the coach loop.
+
+The frame loop calls ``CueScheduler.post("coach")`` as often as it likes; the
+call only takes a lock and never touches the mixer. Posts that arrive inside
+the cue's cooldown are dropped right away. The rest wait in a single pending
+slot, where a higher priority (or newer) cue supersedes what is waiting, and a
+worker thread plays them. A cue is dropped while a sound of the same or
+higher priority is still playing (so spoken feedback never overlaps) and
+interrupts a lower priority one. Every played and suppressed cue is counted.
+
+Sounds are ``pygame.mixer.Sound`` objects (decoded once at load time, see
+``live.load_sounds``) or anything with a ``play()`` that returns an object
+with ``get_busy()`` and ``stop()``.
+"""
+
+import threading
+import time
+from collections import Counter, namedtuple
+
+Cue = namedtuple("Cue", "priority cooldown")
+
+# make_sounds.py used a 2 s cooldown for both; app1.py had none
+DEFAULT_CUES = {
+    "correct": Cue(priority=1, cooldown=2.0),
+    "coach": Cue(priority=0, cooldown=2.0),
+}
+# each pre-rendered feedback phrase (see voice.py) is a cue of its own
+SPOKEN_FEEDBACK = Cue(priority=0, cooldown=6.0)
+
+
+class CueScheduler:
+    def __init__(self, sounds, cues=DEFAULT_CUES, max_delay=0.5):
+        # cues without a loaded sound are suppressed as "missing"
+        self.sounds = {name: sound for name, sound in sounds.items() if sound is not None}
+        self.cues = dict(cues)
+        self.max_delay = max_delay
+        self.played = Counter()
+        self.suppressed = Counter()
+        self.interrupted = 0
+        self.delay_ms = 0.0
+        self._last_played = {}
+        self._pending = None  # (name, posted_at)
+        self._channel = None
+        self._channel_priority = None
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="cues", daemon=True)
+        self._thread.start()
+
+    def post(self, name):
+        """Ask for ``name`` to be played; returns at once. True if it was queued."""
+        now = time.monotonic()
+        cue = self.cues[name]
+        with self._cond:
+            if self._closed:
+                return False
+            if name not in self.sounds:
+                self.suppressed["missing"] += 1
+                return False
+            if now - self._last_played.get(name, float("-inf")) < cue.cooldown:
+                self.suppressed["cooldown"] += 1
+                return False
+            if self._pending is not None:
+                # one of the two is dropped: the waiting cue unless it outranks this one
+                self.suppressed["superseded"] += 1
+                if self.cues[self._pending[0]].priority > cue.priority:
+                    return False
+            self._pending = (name, now)
+            self._cond.notify()
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                name, posted_at = self._pending
+                self._pending = None
+            self._play(name, posted_at)
+
+    def _play(self, name, posted_at):
+        cue, now = self.cues[name], time.monotonic()
+        if now - posted_at > self.max_delay:
+            self.suppressed["stale"] += 1
+            return
+        try:
+            if self._channel is not None and self._channel.get_busy():
+                if self._channel_priority >= cue.priority:
+                    self.suppressed["busy"] += 1
+                    return
+                if self._channel_priority < cue.priority:
+                    self._channel.stop()
+                    self.interrupted += 1
+            self._channel = self.sounds[name].play()
+            self._channel_priority = cue.priority
+        except Exception as e:
+            self.suppressed["failed"] += 1
+            print(f"Error playing cue {name}: {str(e)}")
+            return
+        with self._cond:
+            self._last_played[name] = now
+        self.played[name] += 1
+        self.delay_ms += (time.monotonic() - posted_at) * 1000
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(1)
+
+    def stats(self) -> str:
+        total = sum(self.played.values())
+        played = ", ".join(f"{name} {n}" for name, n in sorted(self.played.items())) or "none"
+        suppressed = ", ".join(f"{reason} {n}" for reason, n in sorted(self.suppressed.items())) or "none"
+        mean = self.delay_ms / total if total else 0.0
+        return (f"cues played: {played} ({mean:.1f} ms after post, {self.interrupted} cut short) "
+                f"| suppressed: {suppressed}")
@@ -0,0 +1,115 @@
+"""Temporal smoothing of landmarks and a hold state machine with hysteresis.
+
+``OneEuroFilter`` is the One-Euro filter (Casiez et al., CHI 2012) applied
+to all 33 x 3 landmark coordinates at once with NumPy: an exponential
+smoother whose cutoff rises with speed, so a held pose is steadied hard while
+a fast movement keeps up with little lag.
+
+``HoldTracker`` is the coach's hold logic with hysteresis. A hold starts
+once the score reaches ``enter``, and it only breaks after the score stays
+below ``exit`` (or nobody is detected) for ``grace`` seconds, so one noisy
+frame or one missed detection no longer restarts the hold timer. The snapshot and sound triggers
+follow its events.
+"""
+
+import numpy as np
+
+
+def _alpha(cutoff, dt):
+    """Smoothing factor of a first-order low-pass at ``cutoff`` Hz (scalar or array)."""
+    return 1.0 / (1.0 + 1.0 / (2 * np.pi * cutoff * dt))
+
+
+class OneEuroFilter:
+    def __init__(self, min_cutoff=1.5, beta=8.0, d_cutoff=1.0):
+        """
+        min_cutoff: cutoff frequency (Hz) when still; lower is smoother
+        beta: how fast the cutoff rises with speed (normalized units/s); higher lags less
+        d_cutoff: cutoff used to smooth the speed estimate
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self):
+        self._x = self._dx = self._t = None
+
+    def __call__(self, lm, timestamp):
+        """Filter one ``(33, 3)`` frame; ``None`` (nobody in view) resets the filter."""
+        if lm is None:
+            self.reset()
+            return None
+        lm = np.asarray(lm, dtype=np.float64)
+        if self._x is None:
+            self._x, self._dx, self._t = lm.copy(), np.zeros_like(lm), timestamp
+            return lm
+        dt = timestamp - self._t
+        if dt <= 0:
+            return self._x.copy()
+        self._t = timestamp
+
+        self._dx += _alpha(self.d_cutoff, dt) * ((lm - self._x) / dt - self._dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        self._x += _alpha(cutoff, dt) * (lm - self._x)
+        return self._x.copy()
+
+
+class HoldTracker:
+    def __init__(self, enter=80, exit=70, grace=0.3, hold_seconds=3.0):
+        """
+        enter: score that starts (and counts toward) a hold
+        exit: the hold breaks only below this score ...
+        grace: ... sustained for this many seconds
+        hold_seconds: held this long completes the hold (snapshot + sound)
+        """
+        self.enter = enter
+        self.exit = exit
+        self.grace = grace
+        self.hold_seconds = hold_seconds
+        self.start = None
+        self.completed = False
+        self._below_since = None
+        self.transitions = 0
+
+    def reset(self):
+        if self.start is not None:
+            self.transitions += 1
+        self.start, self.completed, self._below_since = None, False, None
+
+    def update(self, timestamp, score):
+        """Advance with this frame's score (``None``: nobody in view).
+
+        Returns ``"start"``, ``"complete"``, ``"break"`` or ``None``.
+        """
+        if self.start is None:
+            if score is None:
+                return None
+            if score >= self.enter:
+                self.start = timestamp
+                self.transitions += 1
+                return "start"
+            return None
+
+        # a frame with nobody detected counts as a low score, so a single
+        # missed detection does not break the hold either
+        if score is None or score < self.exit:
+            if self._below_since is None:
+                self._below_since = timestamp
+            if timestamp - self._below_since >= self.grace:
+                self.reset()
+                return "break"
+        else:
+            self._below_since = None
+
+        if not self.completed and timestamp - self.start >= self.hold_seconds:
+            self.completed = True
+            return "complete"
+        return None
+
+    @property
+    def holding(self):
+        return self.start is not None
+
+    def hold_time(self, timestamp):
+        return timestamp - self.start if self.start is not None else 0.0
@@ -0,0 +1,155 @@
+"""Adaptive model-complexity and inference-stride governor for the coach.
+
+``FrameRateGovernor`` measures how long each MediaPipe call takes and moves
+between levels of (model complexity, stride) to hold a target frame rate and
+a per-inference latency budget. With a stride of N only every Nth frame is
+sent to MediaPipe and ``LandmarkPredictor`` fills in the frames between.
+Every switch is logged on the ``checkfit.governor`` logger.
+"""
+
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# (model_complexity, stride) from best quality to cheapest
+LEVELS = ((1, 1), (0, 1), (0, 2), (0, 3))
+
+
+class FrameRateGovernor:
+    def __init__(self, target_fps=20, latency_budget_ms=80, levels=LEVELS,
+                 start_level=0, window=30, cooldown=45, headroom=0.7):
+        """
+        target_fps: frames per second the coach should keep up with
+        latency_budget_ms: longest acceptable single inference
+        window: inferences averaged before deciding
+        cooldown: frames to wait after a switch before deciding again
+        headroom: only step up when the better level is predicted to use
+            less than this fraction of the budget
+        """
+        self.target_fps = target_fps
+        self.latency_budget_ms = latency_budget_ms
+        self.levels = levels
+        self.level = start_level
+        self.window = window
+        self.cooldown = cooldown
+        self.headroom = headroom
+        self._samples = deque(maxlen=window)
+        # how much slower the heavier model is, re-measured on every
+        # complexity switch; assume twice as slow until then
+        self.cost_ratio = 2.0
+        self._pending_ratio = None  # (complexity, mean_ms) before a complexity switch
+        self._frame = 0
+        self._since_switch = 0
+        self.decisions = []
+
+    @property
+    def complexity(self):
+        return self.levels[self.level][0]
+
+    @property
+    def stride(self):
+        return self.levels[self.level][1]
+
+    def tick(self) -> bool:
+        """Advance one frame; True when this frame should run inference."""
+        self._frame += 1
+        self._since_switch += 1
+        return self._frame % self.stride == 0
+
+    def _fits(self, level, mean_ms, margin=1.0):
+        stride = self.levels[level][1]
+        frame_budget_ms = 1000 / self.target_fps
+        return (mean_ms / stride <= frame_budget_ms * margin and
+                mean_ms <= self.latency_budget_ms * margin)
+
+    def _switch(self, level, mean_ms, reason):
+        old = self.levels[self.level]
+        if self.levels[level][0] != old[0]:
+            self._pending_ratio = (old[0], mean_ms)
+        self.level = level
+        self._samples.clear()
+        self._since_switch = 0
+        decision = {"time": time.time(), "from": old, "to": self.levels[level],
+                    "mean_ms": round(mean_ms, 1), "reason": reason}
+        self.decisions.append(decision)
+        logger.info("governor %s -> %s (complexity, stride): %s, inference %.1f ms",
+                    old, self.levels[level], reason, mean_ms)
+
+    def record(self, inference_seconds):
+        """Feed one measured inference time and re-evaluate the level."""
+        self._samples.append(inference_seconds * 1000)
+        if len(self._samples) < self.window or self._since_switch < self.cooldown:
+            return
+        mean_ms = sum(self._samples) / len(self._samples)
+        if self._pending_ratio is not None:
+            old_complexity, old_ms = self._pending_ratio
+            heavy, light = (old_ms, mean_ms) if old_complexity > self.complexity else (mean_ms, old_ms)
+            self.cost_ratio = max(1.0, heavy / max(light, 1e-3))
+            self._pending_ratio = None
+
+        if not self._fits(self.level, mean_ms) and self.level < len(self.levels) - 1:
+            self._switch(self.level + 1, mean_ms, "over budget")
+            return
+
+        if self.level > 0:
+            better = self.level - 1
+            heavier = self.levels[better][0] > self.complexity
+            predicted = mean_ms * self.cost_ratio if heavier else mean_ms
+            if self._fits(better, predicted, self.headroom):
+                self._switch(better, mean_ms, "under budget")
+
+    def status(self) -> str:
+        return f"complexity {self.complexity} stride {self.stride}"
+
+
+class LandmarkPredictor:
+    """Fill frames skipped by the stride from the last two inferred poses.
+
+    Frames are predicted by linear extrapolation; true interpolation would
+    have to wait for the next inference and add a stride of latency.
+    """
+
+    def __init__(self, max_gap=0.25):
+        self.max_gap = max_gap
+        self._prev = None
+        self._last = None
+
+    def update(self, lm, timestamp):
+        if lm is None:
+            self._prev = self._last = None
+            return
+        self._prev, self._last = self._last, (lm, timestamp)
+
+    def predict(self, timestamp):
+        if self._last is None:
+            return None
+        lm, t1 = self._last
+        if self._prev is None or timestamp - t1 > self.max_gap:
+            return lm
+        prev, t0 = self._prev
+        if t1 <= t0:
+            return lm
+        return lm + (lm - prev) * ((timestamp - t1) / (t1 - t0))
+
+
+class PoseModels:
+    """Lazily created MediaPipe Pose instances, one per model complexity.
+
+    Instances stay open once created so switching back is instant.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._models = {}
+
+    def get(self, complexity):
+        if complexity not in self._models:
+            self._models[complexity] = self.factory(complexity)
+        return self._models[complexity]
+
+    def close(self):
+        for model in self._models.values():
+            model.close()
+        self._models.clear()
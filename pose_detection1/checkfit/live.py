@@ -0,0 +1,176 @@
+"""Live landmark tracking shared by the webcam front-ends.
+
+``PoseTracker`` wraps what both coach scripts do per frame: crop around the
+athlete (``roi``), pick the model complexity / stride (``governor``), run
+MediaPipe, map the landmarks back to full-frame coordinates and smooth them
+over time (``filters``). The frame is converted to RGB once, into a reused
+buffer handed to MediaPipe read-only; the BGR frame is left untouched for
+drawing. MediaPipe and pygame are only imported when a tracker or the sounds
+are created, so this module stays import-safe.
+"""
+
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from .buffers import FrameBuffer, to_rgb
+from .filters import OneEuroFilter
+from .governor import FrameRateGovernor, LandmarkPredictor, PoseModels
+from .roi import RoiPreprocessor
+
+
+def default_pose_factory(complexity):
+    import mediapipe as mp
+    return mp.solutions.pose.Pose(model_complexity=complexity,
+                                  min_detection_confidence=0.7,
+                                  min_tracking_confidence=0.7)
+
+
+def landmark_result(lm, visibility=None):
+    """A MediaPipe-style result with ``lm`` as ``pose_landmarks``, for ``draw_landmarks``."""
+    from mediapipe.framework.formats import landmark_pb2
+
+    landmarks = landmark_pb2.NormalizedLandmarkList()
+    if visibility is None:
+        visibility = [1.0] * len(lm)
+    for (x, y, z), v in zip(lm.tolist(), visibility):
+        landmarks.landmark.add(x=x, y=y, z=z, visibility=v)
+    return SimpleNamespace(pose_landmarks=landmarks)
+
+
+class PoseTracker:
+    def __init__(self, pose_factory=default_pose_factory, target_fps=20,
+                 latency_budget_ms=80, roi_size=320, smoothing=True):
+        """
+        pose_factory: builds a MediaPipe Pose for a model complexity
+        roi_size: longest side of the crop handed to MediaPipe (None: full frame)
+        smoothing: One-Euro filter the landmarks (steadier scores, fewer false hold breaks)
+        """
+        self.models = PoseModels(pose_factory)
+        self.roi = RoiPreprocessor(target_size=roi_size) if roi_size else None
+        self.governor = FrameRateGovernor(target_fps=target_fps,
+                                          latency_budget_ms=latency_budget_ms)
+        self.predictor = LandmarkPredictor()
+        self.filter = OneEuroFilter() if smoothing else None
+        self._visibility = None  # of the last detected pose, for predicted frames
+        self._rgb = FrameBuffer()
+
+    def process(self, frame):
+        """Track one BGR frame.
+
+        Returns ``(result, lm)``: the MediaPipe result (landmarks in
+        full-frame coordinates, ready to draw) and the ``(33, 3)`` array, or
+        ``(None, None)`` when no one is in view.
+        """
+        now = time.perf_counter()
+
+        if not self.governor.tick():
+            # skipped by the stride: move the last skeleton along, in a new
+            # result since the last one may still be drawn on another thread
+            lm = self.predictor.predict(now)
+            if lm is None or self._visibility is None:
+                return None, None
+            return landmark_result(lm, self._visibility), lm
+
+        if self.roi:
+            image, transform = self.roi.prepare(frame)
+        else:
+            image, transform = frame, None
+        model = self.models.get(self.governor.complexity)
+        if self.roi and self.roi.moved:
+            # the tracker's region is in the old crop's coordinates: detect afresh
+            model.reset()
+        result = model.process(to_rgb(image, self._rgb))
+        self.governor.record(time.perf_counter() - now)
+
+        if not result.pose_landmarks:
+            if self.roi:
+                self.roi.update(None)
+            self.predictor.update(None, now)
+            if self.filter:
+                self.filter.reset()
+            self._visibility = None
+            return None, None
+
+        landmarks = result.pose_landmarks.landmark
+        if self.roi:
+            # landmarks back in full-frame coordinates, so scoring is unchanged
+            lm = self.roi.restore(landmarks, transform)
+            self.roi.update(lm)
+        else:
+            lm = np.array([[l.x, l.y, l.z] for l in landmarks])
+        if self.filter:
+            lm = self.filter(lm, now)
+            # the drawn skeleton follows the smoothed landmarks too
+            for l, (x, y, z) in zip(landmarks, lm.tolist()):
+                l.x, l.y, l.z = x, y, z
+        self.predictor.update(lm, now)
+        self._visibility = [l.visibility for l in landmarks]
+        return result, lm
+
+    def status(self) -> str:
+        return self.governor.status()
+
+    def close(self):
+        self.models.close()
+
+
+def load_sounds(directory, verbose=False):
+    """Return ``(correct_sound, coach_sound)``; either is ``None`` if it cannot be loaded."""
+    import pygame
+    pygame.mixer.init()
+
+    sounds = []
+    for name in ("correct.wav", "coach.wav"):
+        path = os.path.join(directory, name)
+        try:
+            sounds.append(pygame.mixer.Sound(path))
+            if verbose:
+                print("✅ Loaded:", path)
+        except Exception as e:
+            sounds.append(None)
+            if verbose:
+                print(f"⚠️ {name} not loaded:", e)
+    return tuple(sounds)
+
+
+def load_cues(directory, voice=None, verbose=False):
+    """A started ``CueScheduler`` with the correct/coach sounds from ``directory``.
+
+    ``voice`` names a ``voice.BACKENDS`` entry whose pre-rendered feedback
+    clips are added as cues, one per phrase; post the feedback text to speak it.
+    """
+    from .cues import DEFAULT_CUES, SPOKEN_FEEDBACK, CueScheduler
+    from . import POSE_RULES
+    from .voice import BACKENDS, VoiceCache, feedback_phrases
+
+    correct_sound, coach_sound = load_sounds(directory, verbose=verbose)
+    sounds, cues = {"correct": correct_sound, "coach": coach_sound}, dict(DEFAULT_CUES)
+    if voice:
+        cache_dir = os.path.join(directory, "voice_cache")
+        # the voice and model build_voice_pack.py last rendered this backend with
+        voice_id, model = VoiceCache(cache_dir).voice_for(BACKENDS[voice])
+        clips = load_voice_clips(feedback_phrases(POSE_RULES), voice_id, model, cache_dir)
+        if verbose or not clips:
+            print(f"{len(clips)} spoken feedback clips loaded ({voice} {voice_id}, {model}); "
+                  "build them with build_voice_pack.py")
+        sounds.update(clips)
+        cues.update((text, SPOKEN_FEEDBACK) for text in clips)
+    return CueScheduler(sounds, cues)
+
+
+def load_voice_clips(phrases, voice, model, cache_dir="voice_cache"):
+    """``{text: Sound}`` for the phrases already rendered by build_voice_pack.py."""
+    import pygame
+    from .voice import VoiceCache
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+
+    cache, clips = VoiceCache(cache_dir), {}
+    for text in phrases:
+        path = cache.get(text, voice, model)
+        if path:
+            clips[text] = pygame.mixer.Sound(path)
+    return clips
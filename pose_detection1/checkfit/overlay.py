@@ -0,0 +1,39 @@
+"""Text overlay of the desktop coach, shared by ``app1.py`` and ``bench_coach.py``."""
+
+import cv2
+
+WHITE = (255, 255, 255)
+GREEN = (0, 255, 0)
+RED = (0, 0, 255)
+GREY = (200, 200, 200)
+
+
+def draw_scores(image, pose_name, score, feedback, names, scores, hold_seconds=None):
+    """Active pose, score, hold time and feedback (left) and every pose's score (right)."""
+    color = GREEN if score >= 80 else RED
+    cv2.putText(image, f"{pose_name} | Score: {score}",
+                (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, color, 3)
+
+    if hold_seconds is not None:
+        cv2.putText(image, f"Hold: {int(hold_seconds)}s",
+                    (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.8, WHITE, 2)
+
+    cv2.putText(image, feedback,
+                (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.8, WHITE, 2)
+
+    # live scores for all poses (right side)
+    for i, name in enumerate(names):
+        panel_color = GREEN if scores[i] >= 80 else GREY
+        cv2.putText(image, f"{name}: {scores[i]}",
+                    (image.shape[1] - 300, 40 + i * 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, panel_color, 2)
+
+
+def draw_footer(image, help_text, fps):
+    """Key help (bottom left, always visible) and the frame rate (bottom right)."""
+    cv2.putText(image, help_text,
+                (10, image.shape[0] - 15),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6, WHITE, 2)
+    cv2.putText(image, f"{fps:.0f} FPS",
+                (image.shape[1] - 120, image.shape[0] - 15),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6, WHITE, 2)
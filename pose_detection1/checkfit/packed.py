@@ -0,0 +1,47 @@
+"""Packed binary landmark batches for the server-side scoring API.
+
+A batch is ``N`` frames of 33 landmarks × (x, y, z) as little-endian
+float32, back to back (``N * 396`` bytes) — what a browser gets from a
+``Float32Array``. ``unpack_frames`` views the request body as an
+``(N, 33, 3)`` array without copying it; ``pack_results`` returns scores
+and feedback ids as two ``uint8`` blocks.
+"""
+
+import numpy as np
+
+WIRE_DTYPE = np.dtype("<f4")
+LANDMARKS = 33
+FRAME_BYTES = LANDMARKS * 3 * WIRE_DTYPE.itemsize
+
+
+def pack_frames(frames) -> bytes:
+    """Pack ``(N, 33, 3)`` landmarks into the wire format."""
+    return np.ascontiguousarray(frames, dtype=WIRE_DTYPE).tobytes()
+
+
+def unpack_frames(buffer) -> np.ndarray:
+    """View a packed buffer as a read-only ``(N, 33, 3)`` float32 array.
+
+    Raises ``ValueError`` for a truncated buffer or non-finite coordinates.
+    """
+    if len(buffer) == 0 or len(buffer) % FRAME_BYTES:
+        raise ValueError(f"body must be a non-empty multiple of {FRAME_BYTES} bytes "
+                         f"(N x 33 x 3 float32), got {len(buffer)}")
+    frames = np.frombuffer(buffer, dtype=WIRE_DTYPE).reshape(-1, LANDMARKS, 3)
+    if not np.isfinite(frames).all():
+        raise ValueError("landmarks must be finite numbers")
+    return frames
+
+
+def pack_results(scores, feedback) -> bytes:
+    """``(N, P)`` scores then ``(N, P)`` feedback ids, each as ``uint8``."""
+    return (np.ascontiguousarray(scores, dtype=np.uint8).tobytes() +
+            np.ascontiguousarray(feedback, dtype=np.uint8).tobytes())
+
+
+def best_frames(scores, names):
+    """Best frame and score per pose column, plus how many frames scored above 0."""
+    best = scores.argmax(axis=0)
+    return [{"pose": name, "frame": int(best[i]), "score": int(scores[best[i], i]),
+             "scored_frames": int((scores[:, i] > 0).sum())}
+            for i, name in enumerate(names)]
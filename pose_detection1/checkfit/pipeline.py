@@ -0,0 +1,197 @@
+"""Threaded capture -> inference -> presentation pipeline for the coach loop.
+
+Capture and inference run on their own threads; presentation stays on the
+caller's (main) thread because ``cv2.imshow`` must. Stages are joined by
+single-slot queues that keep only the newest item, so a slow stage drops
+stale frames instead of building up latency. With a ``FramePool``, frames
+that were presented or dropped go back to the capture thread, which decodes
+the next frame into one of them instead of allocating a new image.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class LatestSlot:
+    """Single-slot queue: ``put`` replaces an unread item instead of blocking."""
+
+    def __init__(self, on_drop=None):
+        self._cond = threading.Condition()
+        self._item = None
+        self._closed = False
+        self._on_drop = on_drop
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+                if self._on_drop:
+                    self._on_drop(self._item)
+            self._item = item
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the newest item, or ``None`` once closed and drained."""
+        with self._cond:
+            while self._item is None and not self._closed:
+                if not self._cond.wait(timeout):
+                    return None
+            item, self._item = self._item, None
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class StageStats:
+    """Throughput and busy time of one stage over a rolling window."""
+
+    def __init__(self, window=120):
+        self._lock = threading.Lock()
+        self._ends = deque(maxlen=window)
+        self._busy = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, busy_seconds):
+        with self._lock:
+            self._ends.append(time.perf_counter())
+            self._busy.append(busy_seconds)
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            ends, busy = list(self._ends), sorted(self._busy)
+        fps = (len(ends) - 1) / (ends[-1] - ends[0]) if len(ends) > 1 and ends[-1] > ends[0] else 0.0
+        return {
+            "fps": fps,
+            "mean_ms": sum(busy) / len(busy) * 1000 if busy else 0.0,
+            "p95_ms": busy[int(0.95 * (len(busy) - 1))] * 1000 if busy else 0.0,
+        }
+
+
+class Packet:
+    __slots__ = ("frame", "captured_at", "read_seconds", "result", "inferred_at", "dequeued_at")
+
+    def __init__(self, frame, captured_at, read_seconds=0.0):
+        self.frame = frame
+        self.captured_at = captured_at
+        self.read_seconds = read_seconds
+        self.result = None
+        self.inferred_at = None
+        self.dequeued_at = None
+
+
+class FramePipeline:
+    """Run ``read_frame`` and ``infer`` on worker threads; iterate for results.
+
+    ``read_frame`` has the ``cv2.VideoCapture.read`` signature and ``infer``
+    maps a frame to any result. Iterating yields the newest inferred
+    ``Packet``; call ``presented(packet)`` once it is on screen so
+    end-to-end latency (capture -> display) is tracked. With ``pool`` the
+    packet's frame is reused after ``presented``, so stop drawing on it then.
+    """
+
+    def __init__(self, read_frame, infer, pool=None):
+        self.read_frame = read_frame
+        self.infer = infer
+        self.pool = pool
+        self.captured = LatestSlot(self._recycle)
+        self.inferred = LatestSlot(self._recycle)
+        self.stats = {name: StageStats() for name in ("capture", "inference", "present")}
+        # time an inferred packet sat in its slot before the main thread took it
+        self.wait = StageStats()
+        self.latency = StageStats()
+        self._running = threading.Event()
+        self._threads = []
+        self.error = None
+
+    def start(self):
+        self._running.set()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._running.clear()
+        self.captured.close()
+        for thread in self._threads:
+            thread.join(timeout=2)
+
+    def _capture_loop(self):
+        try:
+            while self._running.is_set():
+                start = time.perf_counter()
+                if self.pool:
+                    buffer = self.pool.acquire()
+                    ok, frame = self.read_frame(buffer)
+                    self.pool.decoded(buffer, frame if ok else None)
+                else:
+                    ok, frame = self.read_frame()
+                if not ok:
+                    break
+                read_seconds = time.perf_counter() - start
+                self.stats["capture"].record(read_seconds)
+                self.captured.put(Packet(frame, start, read_seconds))
+        except Exception as e:
+            self.error = e
+        finally:
+            self.captured.close()
+
+    def _inference_loop(self):
+        try:
+            while self._running.is_set():
+                packet = self.captured.get()
+                if packet is None:
+                    break
+                start = time.perf_counter()
+                packet.result = self.infer(packet.frame)
+                packet.inferred_at = time.perf_counter()
+                self.stats["inference"].record(packet.inferred_at - start)
+                self.inferred.put(packet)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.inferred.close()
+
+    def __iter__(self):
+        while True:
+            packet = self.inferred.get()
+            if packet is None:
+                if self.error is not None:
+                    raise self.error
+                return
+            packet.dequeued_at = time.perf_counter()
+            self.wait.record(packet.dequeued_at - packet.inferred_at)
+            yield packet
+
+    def _recycle(self, packet):
+        if self.pool:
+            self.pool.release(packet.frame)
+
+    def presented(self, packet):
+        now = time.perf_counter()
+        # main-thread work only (drawing, imshow), from when the packet was taken
+        self.stats["present"].record(now - packet.dequeued_at)
+        self.latency.record(now - packet.captured_at)
+        self._recycle(packet)
+
+    def report(self) -> str:
+        parts = []
+        for name, stats in self.stats.items():
+            snap = stats.snapshot()
+            parts.append(f"{name} {snap['fps']:.1f} fps ({snap['mean_ms']:.1f} ms)")
+        parts.append(f"wait {self.wait.snapshot()['mean_ms']:.1f} ms")
+        latency = self.latency.snapshot()
+        parts.append(f"latency {latency['mean_ms']:.0f} ms (p95 {latency['p95_ms']:.0f})")
+        parts.append(f"dropped {self.captured.dropped}/{self.inferred.dropped}")
+        if self.pool:
+            parts.append(f"frames allocated {self.pool.allocations}")
+        return " | ".join(parts)
@@ -0,0 +1,179 @@
+"""Pose definitions for the rule engine in ``checkfit.rules``.
+
+Everything here is plain data (dicts, lists, numbers, strings), so a pose can
+also be loaded from JSON. Landmark indices are MediaPipe Pose indices:
+11/12 shoulders, 13/14 elbows, 15/16 wrists, 23/24 hips, 25/26 knees,
+27/28 ankles. Image y grows downwards.
+
+FEATURES are named measurements shared by every pose; each is computed once
+per frame however many poses use it:
+
+    {"angle": [a, b, c]}     angle at b in degrees
+    {"distance": [p, q]}     distance between two landmarks
+    {"y": i} / {"x": i}      one landmark coordinate
+    {"min": [f, ...]}, {"max": [f, ...]}, {"absdiff": [f, g]}
+    {"ratio": [f, g]}        f / (g + 1e-6)
+    {"add": [f, constant]}
+
+A pose has:
+
+    ready        condition that must hold before it is scored (else score 0)
+    not_ready    feedback when ``ready`` fails
+    score        {"bands": [[feature, weight, [[low, high, score], ...], default], ...],
+                  "penalties": [[feature, threshold, rate], ...]}
+                 weighted band scores minus rate * (feature - threshold) over
+                 threshold, or
+                 {"tiers": feature, "levels": [[minimum, base, at, slope], ...],
+                  "otherwise": [base, at, slope], "floor": n}
+                 base + (feature - at) * slope for the first level reached
+    feedback     [[condition, message], ...]; the first condition that holds wins
+    otherwise    feedback when no rule matches
+
+Conditions are ``[feature, op, value]`` (value is a number or a feature
+name, ``"score"`` is the pose's score), ``["between", feature, low, high]``
+(strict) or ``["all", [conditions]]`` / ``["any", [conditions]]``.
+"""
+
+FEATURES = {
+    "left_elbow": {"angle": [11, 13, 15]},
+    "right_elbow": {"angle": [12, 14, 16]},
+    "left_knee": {"angle": [23, 25, 27]},
+    "right_knee": {"angle": [24, 26, 28]},
+    "elbow_min": {"min": ["left_elbow", "right_elbow"]},
+    "elbow_max": {"max": ["left_elbow", "right_elbow"]},
+    "elbow_symmetry": {"absdiff": ["left_elbow", "right_elbow"]},
+    "knee_min": {"min": ["left_knee", "right_knee"]},
+    "shoulder_width": {"distance": [11, 12]},
+    "wrist_width": {"distance": [15, 16]},
+    "wrist_spread": {"ratio": ["wrist_width", "shoulder_width"]},
+    "left_wrist_y": {"y": 15},
+    "right_wrist_y": {"y": 16},
+    "left_shoulder_y": {"y": 11},
+    "right_shoulder_y": {"y": 12},
+    "left_arm_up_line": {"add": ["left_shoulder_y", -0.02]},
+    "right_arm_up_line": {"add": ["right_shoulder_y", -0.02]},
+    "chest_top": {"add": [{"min": ["left_shoulder_y", "right_shoulder_y"]}, 0.05]},
+    "hip_bottom": {"max": [{"y": 23}, {"y": 24}]},
+    "chest_bottom": {"add": ["hip_bottom", -0.05]},
+    "hip_line": {"add": ["hip_bottom", -0.02]},
+    "waist_low": {"add": ["hip_bottom", 0.05]},
+}
+
+ARMS_UP = ["all", [["left_wrist_y", "<", "left_arm_up_line"],
+                   ["right_wrist_y", "<", "right_arm_up_line"]]]
+
+POSE_DEFINITIONS = [
+    {
+        "name": "Front Double Biceps",
+        "ready": ARMS_UP,
+        "not_ready": "Lift arms above shoulders",
+        "score": {
+            "bands": [
+                ["left_elbow", 0.5, [[50, 100, 100], [40, 115, 85], [30, 130, 65]], 40],
+                ["right_elbow", 0.5, [[50, 100, 100], [40, 115, 85], [30, 130, 65]], 40],
+            ],
+            "penalties": [["elbow_symmetry", 20, 0.7]],
+        },
+        "feedback": [
+            [["score", ">=", 85], "Strong double biceps!"],
+            [["elbow_symmetry", ">", 25], "Match arm angles"],
+        ],
+        "otherwise": "Flex biceps more",
+    },
+    {
+        "name": "Back Double Biceps",
+        "ready": ARMS_UP,
+        "not_ready": "Raise arms and flex back",
+        "score": {
+            "bands": [
+                ["left_elbow", 0.5, [[65, 110, 100], [55, 125, 85], [45, 140, 65]], 40],
+                ["right_elbow", 0.5, [[65, 110, 100], [55, 125, 85], [45, 140, 65]], 40],
+            ],
+            "penalties": [["elbow_symmetry", 30, 0.5]],
+        },
+        "feedback": [
+            [["score", ">=", 85], "Strong back double biceps!"],
+            [["elbow_symmetry", ">", 35], "Balance both arms"],
+            [["elbow_max", ">", 125], "Bend elbows slightly more"],
+            [["elbow_min", "<", 55], "Flex arms and back harder"],
+        ],
+        "otherwise": "Tighten back and raise elbows",
+    },
+    {
+        "name": "Side Chest",
+        "ready": ["any", [["between", "left_wrist_y", "chest_top", "chest_bottom"],
+                          ["between", "right_wrist_y", "chest_top", "chest_bottom"]]],
+        "not_ready": "Bring arms in front of chest",
+        "score": {
+            "bands": [
+                ["elbow_min", 0.7, [[50, 100, 100], [40, 120, 80]], 55],
+                ["elbow_max", 0.3, [[70, 140, 100], [60, 160, 80]], 60],
+            ],
+        },
+        "feedback": [
+            [["score", ">=", 85], "Nice side chest!"],
+            [["elbow_min", "<", 50], "Squeeze chest more"],
+        ],
+        "otherwise": "Adjust arm position",
+    },
+    {
+        "name": "Lat Flex",
+        "ready": ["all", [["between", "left_wrist_y", "chest_top", "hip_line"],
+                          ["between", "right_wrist_y", "chest_top", "hip_line"]]],
+        "not_ready": "Keep elbows wide at ribcage level",
+        "score": {
+            "tiers": "wrist_spread",
+            "levels": [[1.25, 100, 1.25, 0], [1.15, 90, 1.15, 100], [1.05, 75, 1.05, 150]],
+            "otherwise": [0, 0, 60],
+            "floor": 50,
+        },
+        "feedback": [
+            [["wrist_spread", ">=", 1.25], "Huge lat spread!"],
+            [["wrist_spread", ">=", 1.15], "Great lat spread"],
+            [["wrist_spread", ">=", 1.05], "Good, flare lats a bit more"],
+        ],
+        "otherwise": "Spread elbows out and widen back",
+    },
+    {
+        # hands clasped in front of the waist, arms rounded
+        "name": "Most Muscular",
+        "ready": ["all", [["between", "left_wrist_y", "chest_top", "waist_low"],
+                          ["between", "right_wrist_y", "chest_top", "waist_low"],
+                          ["wrist_spread", "<", 0.8]]],
+        "not_ready": "Bring hands together in front of waist",
+        "score": {
+            "bands": [
+                ["left_elbow", 0.35, [[80, 130, 100], [65, 145, 85], [50, 160, 65]], 40],
+                ["right_elbow", 0.35, [[80, 130, 100], [65, 145, 85], [50, 160, 65]], 40],
+                ["wrist_spread", 0.3, [[0, 0.35, 100], [0, 0.55, 80]], 60],
+            ],
+            "penalties": [["elbow_symmetry", 25, 0.5]],
+        },
+        "feedback": [
+            [["score", ">=", 85], "Crushing most muscular!"],
+            [["wrist_spread", ">", 0.55], "Bring your hands closer"],
+            [["elbow_symmetry", ">", 30], "Round both arms evenly"],
+        ],
+        "otherwise": "Flex traps and chest harder",
+    },
+    {
+        # hands behind the head, elbows up, legs straight
+        "name": "Abs & Thigh",
+        "ready": ["all", [ARMS_UP, ["wrist_spread", "<", 1.2]]],
+        "not_ready": "Put hands behind your head",
+        "score": {
+            "bands": [
+                ["left_elbow", 0.3, [[15, 60, 100], [10, 75, 85], [5, 95, 65]], 40],
+                ["right_elbow", 0.3, [[15, 60, 100], [10, 75, 85], [5, 95, 65]], 40],
+                ["knee_min", 0.4, [[160, 180, 100], [145, 180, 80]], 55],
+            ],
+            "penalties": [["elbow_symmetry", 20, 0.5]],
+        },
+        "feedback": [
+            [["score", ">=", 85], "Great abs and thigh!"],
+            [["knee_min", "<", 150], "Straighten your front leg"],
+            [["elbow_max", ">", 75], "Keep elbows high and hands behind head"],
+        ],
+        "otherwise": "Crunch your abs harder",
+    },
+]
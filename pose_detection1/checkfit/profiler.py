@@ -0,0 +1,136 @@
+"""Per-stage frame timings for the coach loop.
+
+``StageProfiler`` keeps one row of stage durations per presented frame in a
+preallocated NumPy ring, so recording costs two ``perf_counter`` calls and an
+array store per stage. Rolling p50/p95 per stage and the frame rate come from
+the newest rows and are recomputed at most twice a second for the overlay.
+With ``csv_path`` set, each full ring is appended to the CSV when it wraps,
+along with the remainder on ``close``, so a long session is exported complete.
+"""
+
+import csv
+import os
+import time
+
+import cv2
+import numpy as np
+
+STAGES = ("capture", "pose.process", "scoring", "draw_landmarks", "putText", "imshow", "waitKey")
+
+
+class _StageTimer:
+    __slots__ = ("profiler", "column", "start")
+
+    def __init__(self, profiler, column):
+        self.profiler, self.column = profiler, column
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.column, time.perf_counter() - self.start)
+
+
+class StageProfiler:
+    def __init__(self, stages=STAGES, capacity=4096, window=120, csv_path=None):
+        """
+        capacity: frames kept in memory (and written per CSV flush)
+        window: newest frames the rolling percentiles cover
+        """
+        self.stages = tuple(stages)
+        self.capacity = capacity
+        self.window = window
+        self.csv_path = csv_path
+        # 0 marks a stage that did not run on that frame
+        self._ms = np.zeros((capacity, len(self.stages)), dtype=np.float32)
+        self._times = np.zeros(capacity, dtype=np.float64)
+        self._row = [0.0] * len(self.stages)
+        self._index = {stage: i for i, stage in enumerate(self.stages)}
+        self._timers = {stage: _StageTimer(self, i) for stage, i in self._index.items()}
+        self.frames = 0
+        self._flushed = 0
+        self._summary, self._summary_at = None, 0.0
+
+    def measure(self, stage):
+        """``with profiler.measure("imshow"): ...`` adds the block's time to this frame."""
+        return self._timers[stage]
+
+    def add(self, stage, seconds):
+        """Add ``seconds`` to ``stage`` (a name or column) for the current frame; repeats accumulate."""
+        column = self._index[stage] if isinstance(stage, str) else stage
+        self._row[column] += seconds * 1000
+
+    def end_frame(self):
+        """Store the current frame's row; stages that did not run are left blank."""
+        slot = self.frames % self.capacity
+        self._ms[slot] = self._row
+        self._times[slot] = time.perf_counter()
+        self._row = [0.0] * len(self.stages)
+        self.frames += 1
+        if self.csv_path and self.frames - self._flushed == self.capacity:
+            self._flush()
+
+    def discard_frame(self):
+        """Drop the current frame's timings (warmup frames, for example)."""
+        self._row = [0.0] * len(self.stages)
+
+    def _recent(self, n):
+        n = min(n, self.frames, self.capacity)
+        slots = (np.arange(self.frames - n, self.frames)) % self.capacity
+        return self._times[slots], self._ms[slots]
+
+    def summary(self, max_age=0.5):
+        """``{"fps": .., stage: (p50, p95) ms}`` over the newest ``window`` frames."""
+        now = time.perf_counter()
+        if self._summary is not None and now - self._summary_at < max_age:
+            return self._summary
+        times, ms = self._recent(self.window)
+        summary = {"fps": (len(times) - 1) / (times[-1] - times[0])
+                   if len(times) > 1 and times[-1] > times[0] else 0.0}
+        for stage, column in self._index.items():
+            values = ms[:, column]
+            values = values[values > 0]
+            summary[stage] = (float(np.percentile(values, 50)), float(np.percentile(values, 95))) \
+                if len(values) else (0.0, 0.0)
+        self._summary, self._summary_at = summary, now
+        return summary
+
+    def overlay(self, image, origin=(10, 160)):
+        """Draw the rolling summary onto ``image`` (BGR)."""
+        summary = self.summary()
+        x, y = origin
+        lines = [f"profile {summary['fps']:.1f} FPS   p50 / p95 ms"]
+        lines += [f"{stage:<15}{summary[stage][0]:6.1f} {summary[stage][1]:6.1f}" for stage in self.stages]
+        for i, line in enumerate(lines):
+            cv2.putText(image, line, (x, y + i * 20), cv2.FONT_HERSHEY_PLAIN, 1.1, (0, 255, 255), 1)
+
+    def report(self) -> str:
+        summary = self.summary(max_age=0)
+        return f"{summary['fps']:.1f} FPS | " + ", ".join(
+            f"{stage} {summary[stage][0]:.1f}/{summary[stage][1]:.1f}" for stage in self.stages) + " ms (p50/p95)"
+
+    def _flush(self):
+        pending = self.frames - self._flushed
+        if not pending:
+            return
+        times, ms = self._recent(pending)
+        new_file = not os.path.exists(self.csv_path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.csv_path)), exist_ok=True)
+        with open(self.csv_path, "a", newline="") as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(["frame", "time"] + [f"{stage}_ms" for stage in self.stages])
+            for i, (t, row) in enumerate(zip(times.tolist(), ms.tolist())):
+                writer.writerow([self._flushed + i, f"{t:.6f}"] +
+                                [f"{v:.3f}" if v > 0 else "" for v in row])
+        self._flushed = self.frames
+
+    def close(self):
+        """Write frames not yet exported (with ``csv_path``)."""
+        if self.csv_path:
+            self._flush()
+
+
+def default_profile_path(directory="profiles"):
+    """``profiles/profile_YYYYmmdd_HHMMSS.csv``"""
+    return os.path.join(directory, time.strftime("profile_%Y%m%d_%H%M%S.csv"))
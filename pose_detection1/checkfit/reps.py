@@ -0,0 +1,156 @@
+"""Streaming rep counter over landmark frames.
+
+Each exercise follows one joint angle (``calculate_angle`` on the left and/or
+right side), smoothed with an exponential moving average. A rep is a trip
+from the start zone past the turn threshold and back into the start zone:
+
+    start ──(leaves start zone)──> moving ──(passes turn)──> turned
+      ^                               │                         │
+      └────── partial (no turn) ──────┘<── back in start zone ──┘ rep
+
+The two thresholds sit far apart, so jitter around either one cannot count a
+rep twice. ``update`` does constant work per frame (two angles, a few
+comparisons), far below a 60 FPS frame budget, and returns a ``Rep`` when one
+completes: its duration, the time to the turn and back (tempo) and its range
+of motion in degrees.
+"""
+
+import json
+import math
+import urllib.parse
+import urllib.request
+from collections import namedtuple
+from http.cookiejar import CookieJar
+
+from .scoring import calculate_angle
+
+# joints as (a, b, c) landmark indices; the angle is measured at b
+LEFT_ELBOW, RIGHT_ELBOW = (11, 13, 15), (12, 14, 16)
+LEFT_KNEE, RIGHT_KNEE = (23, 25, 27), (24, 26, 28)
+
+Exercise = namedtuple("Exercise", "name joints start turn")
+Exercise.__doc__ = """``start``: angle of the rest position, ``turn``: angle the rep must reach.
+
+A curl starts straight (150°) and turns when flexed (70°); a press starts
+bent (95°) and turns at lockout (155°).
+"""
+
+EXERCISES = {
+    "curl": Exercise("Bicep Curl", (LEFT_ELBOW, RIGHT_ELBOW), start=150, turn=70),
+    "squat": Exercise("Squat", (LEFT_KNEE, RIGHT_KNEE), start=160, turn=105),
+    "press": Exercise("Shoulder Press", (LEFT_ELBOW, RIGHT_ELBOW), start=95, turn=155),
+    "row": Exercise("Row", (LEFT_ELBOW, RIGHT_ELBOW), start=150, turn=95),
+}
+
+SIDES = {"both": (0, 1), "left": (0,), "right": (1,)}
+
+Rep = namedtuple("Rep", "number start end duration to_turn back range_of_motion")
+
+
+class RepCounter:
+    def __init__(self, exercise, side="both", smoothing=0.08):
+        """
+        exercise: key of EXERCISES or an Exercise
+        side: follow the mean angle of both sides, or one side only
+        smoothing: time constant of the angle's moving average, in seconds
+        """
+        self.exercise = EXERCISES[exercise] if isinstance(exercise, str) else exercise
+        self.joints = [self.exercise.joints[i] for i in SIDES[side]]
+        self.smoothing = smoothing
+        # +1 when the rep closes the joint (curl, squat, row), -1 when it opens it (press)
+        self._direction = 1 if self.exercise.start > self.exercise.turn else -1
+        self.reps = []
+        self.partials = 0
+        self.state = "start"
+        self.angle = None
+        self._last_time = None
+        self._rep_start = self._turn_time = None
+        self._low = self._high = None
+
+    def _in_start(self, angle):
+        return self._direction * (angle - self.exercise.start) >= 0
+
+    def _past_turn(self, angle):
+        return self._direction * (self.exercise.turn - angle) >= 0
+
+    def update(self, timestamp, lm):
+        """Feed one frame (``lm`` is ``(33, 3)`` or ``None``); returns a ``Rep`` when one completes."""
+        if lm is None:
+            return None
+        raw = float(sum(calculate_angle(lm[a], lm[b], lm[c]) for a, b, c in self.joints)) / len(self.joints)
+        if math.isnan(raw):
+            return None
+        if self.angle is None or not self.smoothing:
+            self.angle = raw
+        else:
+            # frame-rate independent: the weight depends on the time since the last frame
+            dt = max(timestamp - self._last_time, 0.0)
+            self.angle += (1 - math.exp(-dt / self.smoothing)) * (raw - self.angle)
+        self._last_time = timestamp
+        angle = self.angle
+
+        if self.state == "start":
+            if not self._in_start(angle):
+                self.state = "moving"
+                self._rep_start = timestamp
+                self._low = self._high = angle
+            return None
+
+        self._low, self._high = min(self._low, angle), max(self._high, angle)
+        if self.state == "moving":
+            if self._past_turn(angle):
+                self.state = "turned"
+                self._turn_time = timestamp
+            elif self._in_start(angle):
+                self.state = "start"
+                self.partials += 1
+            return None
+
+        # turned: the rep completes back in the start zone
+        if not self._in_start(angle):
+            return None
+        self.state = "start"
+        rep = Rep(number=len(self.reps) + 1, start=self._rep_start, end=timestamp,
+                  duration=timestamp - self._rep_start,
+                  to_turn=self._turn_time - self._rep_start, back=timestamp - self._turn_time,
+                  range_of_motion=self._high - self._low)
+        self.reps.append(rep)
+        return rep
+
+    @property
+    def count(self):
+        return len(self.reps)
+
+    def summary(self):
+        """Counts and per-rep means for the set so far."""
+        n = len(self.reps)
+
+        def mean(field):
+            return round(sum(getattr(rep, field) for rep in self.reps) / n, 2) if n else 0.0
+
+        return {
+            "exercise": self.exercise.name,
+            "reps": n,
+            "partials": self.partials,
+            "tempo": mean("duration"),
+            "to_turn": mean("to_turn"),
+            "back": mean("back"),
+            "range_of_motion": mean("range_of_motion"),
+        }
+
+    def workout_payload(self, weight=0.0, sets=1):
+        """The single-exercise body ``POST /add_workout`` accepts."""
+        return {"exercise_name": self.exercise.name, "reps": self.count,
+                "sets": sets, "weight": float(weight)}
+
+
+def post_set(base_url, email, password, payload, timeout=10):
+    """Log in to the web app and add ``payload`` with ``/add_workout``; returns its JSON reply."""
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(CookieJar()))
+    login = urllib.parse.urlencode({"email": email, "password": password}).encode()
+    opener.open(base_url.rstrip("/") + "/login", data=login, timeout=timeout)
+    req = urllib.request.Request(base_url.rstrip("/") + "/add_workout",
+                                 data=json.dumps(payload).encode(),
+                                 headers={"Content-Type": "application/json"})
+    with opener.open(req, timeout=timeout) as response:
+        return json.loads(response.read())
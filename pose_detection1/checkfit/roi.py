@@ -0,0 +1,151 @@
+"""Landmark-guided cropping and downscaling of frames before pose inference.
+
+The athlete usually fills only part of the webcam image. ``RoiPreprocessor``
+crops each frame to a padded box around the previous frame's landmarks and
+downscales it to a small inference size; ``restore`` maps the landmarks found
+in the crop back to full-frame normalized coordinates, so the scorers see
+exactly the coordinates they would have seen on the full frame. When the
+subject is lost the next frame is processed whole.
+
+MediaPipe Pose in video mode tracks its own region from the previous
+image's coordinates, so a crop that shifts every frame would feed it shifted
+coordinates. The crop is therefore held still until the pose nears its edge
+(or shrinks well inside it), and ``moved`` tells the caller to reset the
+model's tracking whenever the crop does change. The downscaled crop is
+written into a reused buffer, so it costs no allocation per frame.
+"""
+
+import cv2
+import numpy as np
+
+from .buffers import FrameBuffer
+
+
+class RoiTransform:
+    """Where an inference image came from inside the full frame (pixels)."""
+    __slots__ = ("x0", "y0", "width", "height", "frame_width", "frame_height")
+
+    def __init__(self, x0, y0, width, height, frame_width, frame_height):
+        self.x0, self.y0 = x0, y0
+        self.width, self.height = width, height
+        self.frame_width, self.frame_height = frame_width, frame_height
+
+    @property
+    def is_full_frame(self):
+        return self.width == self.frame_width and self.height == self.frame_height
+
+
+class RoiPreprocessor:
+    def __init__(self, target_size=320, padding=0.25, min_box=0.2, edge=0.08):
+        """
+        target_size: longest side of the image handed to MediaPipe
+        padding: fraction of the landmark box added on every side
+        min_box: smallest crop side, as a fraction of the frame's shorter side
+        edge: the crop moves once the pose comes this close to its edge (fraction of its side)
+        """
+        self.target_size = target_size
+        self.padding = padding
+        self.min_box = min_box
+        self.edge = edge
+        self._box = None  # normalized (x_min, y_min, x_max, y_max) of the last pose
+        self._crop = None  # pixel (x0, y0, w, h) of the crop in use
+        self.moved = False  # the crop changed on the last ``prepare``
+        self.moves = 0
+        self._small = FrameBuffer()
+        self.crops = 0
+        self.full_frames = 0
+
+    def _crop_box(self, frame_w, frame_h):
+        if self._box is None:
+            return 0, 0, frame_w, frame_h
+        x_min, y_min, x_max, y_max = self._box
+        pad_x = (x_max - x_min) * self.padding
+        pad_y = (y_max - y_min) * self.padding
+        min_side = self.min_box * min(frame_w, frame_h)
+
+        x0, x1 = (x_min - pad_x) * frame_w, (x_max + pad_x) * frame_w
+        y0, y1 = (y_min - pad_y) * frame_h, (y_max + pad_y) * frame_h
+        if x1 - x0 < min_side:
+            cx = (x0 + x1) / 2
+            x0, x1 = cx - min_side / 2, cx + min_side / 2
+        if y1 - y0 < min_side:
+            cy = (y0 + y1) / 2
+            y0, y1 = cy - min_side / 2, cy + min_side / 2
+
+        x0, y0 = max(0, int(x0)), max(0, int(y0))
+        x1, y1 = min(frame_w, int(np.ceil(x1))), min(frame_h, int(np.ceil(y1)))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return 0, 0, frame_w, frame_h
+        return x0, y0, x1 - x0, y1 - y0
+
+    def _holds(self, crop, frame_w, frame_h):
+        """Whether the last pose is still well inside ``crop`` (frame borders do not count as edges)."""
+        x0, y0, w, h = crop
+        x_min, y_min, x_max, y_max = self._box
+        mx, my = w * self.edge, h * self.edge
+        inside = ((x0 == 0 or x_min * frame_w >= x0 + mx) and
+                  (y0 == 0 or y_min * frame_h >= y0 + my) and
+                  (x0 + w == frame_w or x_max * frame_w <= x0 + w - mx) and
+                  (y0 + h == frame_h or y_max * frame_h <= y0 + h - my))
+        # a pose that shrank to a small part of the crop (stepped back) gets a tighter one
+        fills = (x_max - x_min) * frame_w >= w / 3 or (y_max - y_min) * frame_h >= h / 3
+        return inside and fills
+
+    def prepare(self, frame):
+        """Return ``(image, transform)``: the crop to run inference on.
+
+        ``image`` is a view into ``frame`` or, when downscaled, into a buffer
+        that the next call overwrites.
+        """
+        frame_h, frame_w = frame.shape[:2]
+        crop = self._crop
+        # a full frame (nothing to crop around before) is never held
+        if (crop is None or self._box is None or crop[0] + crop[2] > frame_w or crop[1] + crop[3] > frame_h
+                or crop == (0, 0, frame_w, frame_h) or not self._holds(crop, frame_w, frame_h)):
+            crop = self._crop_box(frame_w, frame_h)
+        self.moved = crop != self._crop
+        self.moves += self.moved
+        self._crop = crop
+        x0, y0, w, h = crop
+        transform = RoiTransform(x0, y0, w, h, frame_w, frame_h)
+        if transform.is_full_frame:
+            self.full_frames += 1
+        else:
+            self.crops += 1
+
+        image = frame[y0:y0 + h, x0:x0 + w]
+        scale = self.target_size / max(w, h)
+        if scale < 1:
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            image = cv2.resize(image, size, dst=self._small.get(size[::-1] + frame.shape[2:]),
+                               interpolation=cv2.INTER_AREA)
+        return image, transform
+
+    def restore(self, landmarks, transform):
+        """Map crop-normalized landmarks to full-frame normalized ones.
+
+        ``landmarks`` is a MediaPipe landmark list; it is updated in place so
+        it can still be drawn on the full frame. Returns the ``(33, 3)`` array.
+        """
+        sx = transform.width / transform.frame_width
+        sy = transform.height / transform.frame_height
+        ox = transform.x0 / transform.frame_width
+        oy = transform.y0 / transform.frame_height
+        lm = np.array([[l.x, l.y, l.z] for l in landmarks])
+        lm[:, 0] = lm[:, 0] * sx + ox
+        lm[:, 1] = lm[:, 1] * sy + oy
+        # MediaPipe scales z like x
+        lm[:, 2] *= sx
+        if not transform.is_full_frame:
+            for l, (x, y, z) in zip(landmarks, lm.tolist()):
+                l.x, l.y, l.z = x, y, z
+        return lm
+
+    def update(self, lm):
+        """Track the pose found this frame (``None`` when the subject was lost)."""
+        if lm is None:
+            self._box = None
+            return
+        x_min, y_min = lm[:, :2].min(axis=0).tolist()
+        x_max, y_max = lm[:, :2].max(axis=0).tolist()
+        self._box = (x_min, y_min, x_max, y_max)
@@ -0,0 +1,449 @@
+"""Compile declarative pose definitions into one vectorized evaluator.
+
+``compile_poses`` turns the data in ``checkfit.poses`` (or any list of pose
+dicts in that format) into a ``PoseRules`` object. Its ``score`` runs on
+``(33, 3)`` frames or ``(N, 33, 3)`` batches: every angle, distance and
+coordinate any pose needs is gathered once, so scoring N poses costs little
+more than scoring one. ``score_frame`` is the single-frame path, where NumPy
+call overhead would dominate: one gather, then the same rules as small
+closures over a flat list of plain floats (features, the pose's score and
+the constants, all addressed by index).
+"""
+
+import json
+import math
+import operator
+from functools import reduce
+
+import numpy as np
+
+from .poses import FEATURES, POSE_DEFINITIONS
+
+# work on arrays and on plain floats alike
+_OPS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+class _FeaturePlan:
+    """Resolve named/inline features into batched gathers plus derived steps."""
+
+    def __init__(self, definitions):
+        self.definitions = definitions
+        self.angles = []     # (a, b, c) triplets
+        self.distances = []  # (p, q) pairs
+        self.coords = []     # (landmark, axis)
+        self.steps = []      # (key, op, operand keys, constant) in dependency order
+        self._keys = {}
+
+    def _key(self, spec):
+        return spec if isinstance(spec, str) else json.dumps(spec, sort_keys=True)
+
+    def resolve(self, spec):
+        """Plan ``spec`` (a feature name or inline definition) and return its key."""
+        key = self._key(spec)
+        if key in self._keys:
+            return key
+        if isinstance(spec, str):
+            if spec not in self.definitions:
+                raise ValueError(f"Unknown feature: {spec}")
+            definition = self.definitions[spec]
+        else:
+            definition = spec
+        if len(definition) != 1:
+            raise ValueError(f"Feature must have exactly one kind: {definition}")
+        (kind, args), = definition.items()
+
+        if kind == "angle":
+            self.angles.append(tuple(args))
+        elif kind == "distance":
+            self.distances.append(tuple(args))
+        elif kind in ("x", "y"):
+            self.coords.append((args, 0 if kind == "x" else 1))
+        elif kind in ("min", "max", "absdiff", "ratio"):
+            self.steps.append((key, kind, [self.resolve(arg) for arg in args], None))
+        elif kind == "add":
+            self.steps.append((key, kind, [self.resolve(args[0])], float(args[1])))
+        else:
+            raise ValueError(f"Unknown feature kind: {kind}")
+        self._keys[key] = (kind, args)
+        return key
+
+    def _indices(self):
+        """Landmark index arrays: angle points ``a, b, c``, distance ends ``p, q``, coordinate ``rows, axes``."""
+        a, b, c = (np.array(side, dtype=np.intp).reshape(-1) for side in zip(*self.angles)) \
+            if self.angles else (np.zeros(0, np.intp),) * 3
+        p, q = (np.array(side, dtype=np.intp).reshape(-1) for side in zip(*self.distances)) \
+            if self.distances else (np.zeros(0, np.intp),) * 2
+        rows = np.array([i for i, _ in self.coords], dtype=np.intp)
+        axes = np.array([axis for _, axis in self.coords], dtype=np.intp)
+        return a, b, c, p, q, rows, axes
+
+    def build(self):
+        angle_keys = [k for k, (kind, _) in self._keys.items() if kind == "angle"]
+        distance_keys = [k for k, (kind, _) in self._keys.items() if kind == "distance"]
+        coord_keys = [k for k, (kind, _) in self._keys.items() if kind in ("x", "y")]
+        a, b, c, p, q, rows, axes = self._indices()
+        steps = self.steps
+
+        def compute(lm):
+            features = {}
+            if len(a):
+                ba = lm[..., a, :] - lm[..., b, :]
+                bc = lm[..., c, :] - lm[..., b, :]
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    cosine = (ba * bc).sum(-1) / (np.linalg.norm(ba, axis=-1) *
+                                                  np.linalg.norm(bc, axis=-1))
+                angles = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+                for i, key in enumerate(angle_keys):
+                    features[key] = angles[..., i]
+            if len(p):
+                widths = np.linalg.norm(lm[..., p, :] - lm[..., q, :], axis=-1)
+                for i, key in enumerate(distance_keys):
+                    features[key] = widths[..., i]
+            if len(rows):
+                values = lm[..., rows, axes]
+                for i, key in enumerate(coord_keys):
+                    features[key] = values[..., i]
+            for key, kind, args, constant in steps:
+                values = [features[arg] for arg in args]
+                if kind == "min":
+                    features[key] = np.minimum.reduce(values)
+                elif kind == "max":
+                    features[key] = np.maximum.reduce(values)
+                elif kind == "absdiff":
+                    features[key] = np.abs(values[0] - values[1])
+                elif kind == "ratio":
+                    features[key] = values[0] / (values[1] + 1e-6)
+                else:
+                    features[key] = values[0] + constant
+            return features
+
+        return compute
+
+    def build_frame(self):
+        """Single-frame features as ``(slots, compute)``.
+
+        ``compute(lm)`` gathers every vector in one NumPy step, then works on
+        plain floats; it returns a list holding feature ``key`` at
+        ``slots[key]``.
+        """
+        kinds = [(key, kind) for key, (kind, _) in self._keys.items()]
+        angle_keys = [key for key, kind in kinds if kind == "angle"]
+        distance_keys = [key for key, kind in kinds if kind == "distance"]
+        coord_keys = [key for key, kind in kinds if kind in ("x", "y")]
+        step_keys = [key for key, *_ in self.steps]
+        slots = {key: i for i, key in
+                 enumerate(angle_keys + distance_keys + coord_keys + step_keys)}
+        steps = [_frame_step(kind, [slots[arg] for arg in args], constant)
+                 for _, kind, args, constant in self.steps]
+        a, b, c, p, q, rows, axes = self._indices()
+        # angle arms (a - b, then c - b) followed by the distance vectors
+        heads, tails = np.concatenate([a, c, p]), np.concatenate([b, b, q])
+        n = len(angle_keys)
+
+        def compute(lm):
+            v = (lm[heads] - lm[tails]).tolist()
+            f = [_angle(v[i], v[n + i]) for i in range(n)]
+            f += [_norm(d) for d in v[2 * n:]]
+            f += lm[rows, axes].tolist()
+            for step in steps:
+                f.append(step(f))
+            return f
+
+        return slots, compute
+
+
+def _dot(u, v):
+    return u[0] * v[0] + u[1] * v[1] + u[2] * v[2]
+
+
+def _angle(ba, bc):
+    norm = math.sqrt(_dot(ba, ba) * _dot(bc, bc))
+    if not norm > 0:  # zero-length arm or NaN coordinates
+        return math.nan
+    return math.degrees(math.acos(max(-1.0, min(1.0, _dot(ba, bc) / norm))))
+
+
+def _norm(v):
+    return math.sqrt(_dot(v, v))
+
+
+def _compile_condition(condition, plan):
+    """Return ``fn(features, score) -> bool array`` for a condition."""
+    head = condition[0]
+    if head in ("all", "any"):
+        parts = [_compile_condition(part, plan) for part in condition[1]]
+        combine = operator.and_ if head == "all" else operator.or_
+        return lambda f, s: reduce(combine, [part(f, s) for part in parts])
+
+    if head == "between":
+        value, low, high = (_compile_operand(arg, plan) for arg in condition[1:])
+        return lambda f, s: (low(f, s) < value(f, s)) & (value(f, s) < high(f, s))
+
+    left, op, right = condition
+    if op not in _OPS:
+        raise ValueError(f"Unknown operator: {op}")
+    compare = _OPS[op]
+    left, right = _compile_operand(left, plan), _compile_operand(right, plan)
+    return lambda f, s: compare(left(f, s), right(f, s))
+
+
+def _compile_operand(operand, plan):
+    if isinstance(operand, (int, float)):
+        return lambda f, s: operand
+    if operand == "score":
+        return lambda f, s: s
+    key = plan.resolve(operand)
+    return lambda f, s: f[key]
+
+
+def _bands(values, bands, default):
+    return np.select([(values >= lo) & (values <= hi) for lo, hi, _ in bands],
+                     [score for _, _, score in bands], default)
+
+
+def _band(value, bands, default):
+    for lo, hi, score in bands:
+        if lo <= value <= hi:
+            return score
+    return default
+
+
+def _compile_score(spec, plan):
+    if "bands" in spec:
+        terms = [(plan.resolve(feature), weight, bands, default)
+                 for feature, weight, bands, default in spec["bands"]]
+        penalties = [(plan.resolve(feature), threshold, rate)
+                     for feature, threshold, rate in spec.get("penalties", [])]
+
+        def score(f):
+            total = sum(weight * _bands(f[key], bands, default)
+                        for key, weight, bands, default in terms)
+            for key, threshold, rate in penalties:
+                total = total - np.fmax(0, f[key] - threshold) * rate
+            return np.trunc(np.clip(total, 0, 100))
+        return score
+
+    if "tiers" in spec:
+        key = plan.resolve(spec["tiers"])
+        levels = spec["levels"]
+        base, at, slope = spec["otherwise"]
+        floor = spec.get("floor", 0)
+
+        def score(f):
+            x = f[key]
+            value = np.select([x >= minimum for minimum, *_ in levels],
+                              [np.trunc(b + (x - a) * s) for _, b, a, s in levels],
+                              np.trunc(base + (x - at) * slope))
+            return np.clip(np.maximum(floor, value), 0, 100)
+        return score
+
+    raise ValueError(f"Unknown score spec: {sorted(spec)}")
+
+
+# ---------- single-frame evaluation ----------
+# the same features, conditions and scores on plain floats; every operand is
+# an index into one list holding the features, then the pose's score, then
+# the constants
+
+def _min(a, b):
+    # like np.minimum: NaN wins, where the builtin would keep the other value
+    return a if a <= b else b if b < a else math.nan
+
+
+def _max(a, b):
+    return a if a >= b else b if b > a else math.nan
+
+
+def _frame_step(kind, args, constant):
+    """Return ``fn(values) -> float`` for one derived feature."""
+    if kind in ("min", "max"):
+        pick = _min if kind == "min" else _max
+        if len(args) == 1:
+            i, = args
+            return lambda f: f[i]
+        if len(args) == 2:
+            i, j = args
+            return lambda f: pick(f[i], f[j])
+        return lambda f: reduce(pick, [f[i] for i in args])
+    if kind == "absdiff":
+        i, j = args
+        return lambda f: abs(f[i] - f[j])
+    if kind == "ratio":
+        i, j = args
+        return lambda f: f[i] / (f[j] + 1e-6)
+    i, = args
+    return lambda f: f[i] + constant
+
+
+def _frame_slot(operand, plan, slots, constants):
+    """Index of ``operand`` in the per-frame values: a feature, ``"score"`` or a constant."""
+    if isinstance(operand, (int, float)):
+        constants.append(operand)
+        return len(slots) + len(constants) - 1
+    if operand == "score":
+        return len(slots)
+    return slots[plan.resolve(operand)]
+
+
+def _frame_condition(condition, plan, slots, constants):
+    """Return ``fn(values) -> bool`` for a condition on one frame."""
+    head = condition[0]
+    if head in ("all", "any"):
+        parts = [_frame_condition(part, plan, slots, constants) for part in condition[1]]
+        if len(parts) == 2:
+            first, second = parts
+            if head == "all":
+                return lambda f: first(f) and second(f)
+            return lambda f: first(f) or second(f)
+        combine = all if head == "all" else any
+        return lambda f: combine(part(f) for part in parts)
+
+    if head == "between":
+        value, low, high = (_frame_slot(arg, plan, slots, constants) for arg in condition[1:])
+        return lambda f: f[low] < f[value] < f[high]
+
+    left, op, right = condition
+    compare = _OPS[op]
+    left, right = (_frame_slot(arg, plan, slots, constants) for arg in (left, right))
+    return lambda f: compare(f[left], f[right])
+
+
+def _frame_score(spec, plan, slots):
+    """Return ``fn(values) -> int``, the pose's score on one frame."""
+    if "bands" in spec:
+        terms = [(slots[plan.resolve(feature)], weight, tuple(map(tuple, bands)), default)
+                 for feature, weight, bands, default in spec["bands"]]
+        penalties = [(slots[plan.resolve(feature)], threshold, rate)
+                     for feature, threshold, rate in spec.get("penalties", [])]
+
+        def score(f):
+            total = 0
+            for i, weight, bands, default in terms:
+                total += weight * _band(f[i], bands, default)
+            for i, threshold, rate in penalties:
+                total -= max(0, f[i] - threshold) * rate
+            return int(max(0, min(100, total)))
+        return score
+
+    x = slots[plan.resolve(spec["tiers"])]
+    levels = [tuple(level) for level in spec["levels"]]
+    base, at, slope = spec["otherwise"]
+    floor = spec.get("floor", 0)
+
+    def score(f):
+        value = f[x]
+        for minimum, b, a, rate in levels:
+            if value >= minimum:
+                value = int(b + (value - a) * rate)
+                break
+        else:
+            value = int(base + (value - at) * slope)
+        return max(0, min(100, max(floor, value)))
+    return score
+
+
+def _compile_frame(definitions, plan):
+    """Build ``score_frame(lm)`` for one frame from table-driven closures over floats."""
+    slots, compute = plan.build_frame()
+    score_slot = len(slots)
+    constants = [0]  # the score slot, then every constant operand
+    evaluators = []
+    for pose in definitions:
+        rules = [(rule, _frame_condition(condition, plan, slots, constants))
+                 for rule, (condition, _) in enumerate(pose["feedback"], 1)]
+        evaluators.append((
+            _frame_condition(pose["ready"], plan, slots, constants),
+            _frame_score(pose["score"], plan, slots),
+            rules,
+            len(rules) + 1,
+        ))
+
+    def score_frame(lm):
+        f = compute(np.asarray(lm, dtype=np.float64))
+        f += constants
+        scores, feedback = [0] * len(evaluators), [0] * len(evaluators)
+        for i, (ready, score, rules, default) in enumerate(evaluators):
+            if ready(f):
+                f[score_slot] = scores[i] = score(f)
+                for rule, condition in rules:
+                    if condition(f):
+                        feedback[i] = rule
+                        break
+                else:
+                    feedback[i] = default
+        return scores, feedback
+
+    return score_frame
+
+
+class PoseRules:
+    """Compiled evaluator for a list of pose definitions."""
+
+    def __init__(self, names, feedback, compute_features, evaluators, score_frame):
+        self.names = names
+        self.feedback = feedback
+        self._compute_features = compute_features
+        self._evaluators = evaluators
+        self._score_frame = score_frame
+
+    def __len__(self):
+        return len(self.names)
+
+    def score(self, lm):
+        """Score every pose for one frame or a batch of frames.
+
+        Returns ``(scores, feedback)``, two int arrays shaped ``(..., P)`` in
+        ``names`` order; ``self.feedback[i][feedback[..., i]]`` is the message.
+        """
+        lm = np.asarray(lm, dtype=np.float64)
+        features = self._compute_features(lm)
+        scores, feedback = [], []
+        for ready, score, rules, default in self._evaluators:
+            ok = ready(features, None)
+            value = score(features)
+            scores.append(np.where(ok, value, 0))
+            feedback.append(np.where(ok, np.select([rule(features, value) for rule in rules],
+                                                   np.arange(1, len(rules) + 1), default), 0))
+        return (np.stack(scores, axis=-1).astype(np.int64),
+                np.stack(feedback, axis=-1).astype(np.int64))
+
+    def score_frame(self, lm):
+        """Score every pose for a single ``(33, 3)`` frame; returns ``(scores, feedback)`` lists."""
+        return self._score_frame(lm)
+
+    def score_all(self, lm):
+        """Score one ``(33, 3)`` frame: ``[(name, score, feedback), ...]`` for every pose."""
+        scores, feedback = self.score_frame(lm)
+        return [(name, scores[i], self.feedback[i][feedback[i]])
+                for i, name in enumerate(self.names)]
+
+
+def compile_poses(definitions=POSE_DEFINITIONS, features=FEATURES):
+    """Compile pose definitions (see ``checkfit.poses``) into a ``PoseRules``."""
+    plan = _FeaturePlan(features)
+    names, messages, evaluators = [], [], []
+    for pose in definitions:
+        rules = [_compile_condition(condition, plan) for condition, _ in pose["feedback"]]
+        evaluators.append((
+            _compile_condition(pose["ready"], plan),
+            _compile_score(pose["score"], plan),
+            rules,
+            len(rules) + 1,
+        ))
+        names.append(pose["name"])
+        messages.append(tuple([pose["not_ready"]] +
+                              [message for _, message in pose["feedback"]] +
+                              [pose["otherwise"]]))
+    return PoseRules(tuple(names), tuple(messages), plan.build(), evaluators,
+                     _compile_frame(definitions, plan))
+
+
+def load_poses(path, features=FEATURES):
+    """Compile pose definitions from a JSON file holding a list of pose dicts."""
+    with open(path) as f:
+        return compile_poses(json.load(f), features)
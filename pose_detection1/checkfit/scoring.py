@@ -0,0 +1,336 @@
+"""Reference pose scorers for the CheckFit coach.
+
+Each scorer takes the 33 MediaPipe pose landmarks as ``[x, y, z]`` rows and
+returns ``(score, feedback)``. ``checkfit.rules`` scores all poses at once
+with the same rules, written as data in ``checkfit.poses``.
+"""
+
+import numpy as np
+
+
+# ---------- Utility Functions ----------
+def calculate_angle(a, b, c):
+    a, b, c = np.array(a), np.array(b), np.array(c)
+    ba, bc = a - b, c - b
+    cosine = np.dot(ba, bc) / (np.linalg.norm(ba) * np.linalg.norm(bc))
+    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+# READY = both hands generally up (for double-biceps)
+def is_pose_ready(lm):
+    left_wrist_y, right_wrist_y = lm[15][1], lm[16][1]
+    left_shoulder_y, right_shoulder_y = lm[11][1], lm[12][1]
+    return (left_wrist_y < left_shoulder_y - 0.02 and
+            right_wrist_y < right_shoulder_y - 0.02)
+
+# generic angle scorer: ideal +/- soft_tol is “good”, up to hard_tol is “okay”
+def angle_score(angle, ideal, soft_tol=15, hard_tol=35):
+    diff = abs(angle - ideal)
+
+    if diff <= soft_tol:            # looks correct
+        score = 100 - diff * 0.7
+    elif diff <= hard_tol:          # acceptable for normal people
+        score = 90 - (diff - soft_tol) * 1.5
+    else:                           # far from pose
+        score = 55
+
+    return max(0, min(100, score))
+
+
+# ---------- Pose Scoring Functions ----------
+
+# FRONT DOUBLE BICEPS
+# realistic: elbow flex ~ 60–90°, both arms high & symmetric
+def score_front_double_biceps(lm):
+    if not is_pose_ready(lm):
+        return 0, "Lift arms above shoulders"
+
+    left = calculate_angle(lm[11], lm[13], lm[15])
+    right = calculate_angle(lm[12], lm[14], lm[16])
+
+    # Broad human range
+    def human_arm_score(angle):
+        if 50 <= angle <= 100:
+            return 100
+        elif 40 <= angle < 50 or 100 < angle <= 115:
+            return 85
+        elif 30 <= angle < 40 or 115 < angle <= 130:
+            return 65
+        else:
+            return 40
+
+    left_score = human_arm_score(left)
+    right_score = human_arm_score(right)
+
+    symmetry_diff = abs(left - right)
+    symmetry_penalty = max(0, symmetry_diff - 20) * 0.7
+
+    score = (left_score + right_score) / 2 - symmetry_penalty
+    score = max(0, min(100, score))
+
+    if score >= 85:
+        feedback = "Strong double biceps!"
+    elif symmetry_diff > 25:
+        feedback = "Match arm angles"
+    else:
+        feedback = "Flex biceps more"
+
+    return int(score), feedback
+
+
+# BACK DOUBLE BICEPS
+def score_back_double_biceps(lm):
+    if not is_pose_ready(lm):
+        return 0, "Raise arms and flex back"
+
+    left = calculate_angle(lm[11], lm[13], lm[15])
+    right = calculate_angle(lm[12], lm[14], lm[16])
+
+    # Human-friendly scoring for back pose
+    def back_arm_score(angle):
+        if 65 <= angle <= 110:
+            return 100
+        elif 55 <= angle < 65 or 110 < angle <= 125:
+            return 85
+        elif 45 <= angle < 55 or 125 < angle <= 140:
+            return 65
+        else:
+            return 40
+
+    left_score = back_arm_score(left)
+    right_score = back_arm_score(right)
+
+    # More forgiving symmetry (back pose is harder)
+    symmetry_diff = abs(left - right)
+    symmetry_penalty = max(0, symmetry_diff - 30) * 0.5
+
+    score = (left_score + right_score) / 2 - symmetry_penalty
+    score = max(0, min(100, score))
+
+    # Feedback tuned for humans
+    if score >= 85:
+        feedback = "Strong back double biceps!"
+    elif symmetry_diff > 35:
+        feedback = "Balance both arms"
+    elif left > 125 or right > 125:
+        feedback = "Bend elbows slightly more"
+    elif left < 55 or right < 55:
+        feedback = "Flex arms and back harder"
+    else:
+        feedback = "Tighten back and raise elbows"
+
+    return int(score), feedback
+
+
+# SIDE CHEST
+# idea: arms near chest height, front arm well bent (~60–90°)
+def score_side_chest(lm):
+    left_wrist_y, right_wrist_y = lm[15][1], lm[16][1]
+    left_sh_y, right_sh_y = lm[11][1], lm[12][1]
+    left_hip_y, right_hip_y = lm[23][1], lm[24][1]
+
+    # Chest-height zone
+    chest_top = min(left_sh_y, right_sh_y) + 0.05
+    chest_bottom = max(left_hip_y, right_hip_y) - 0.05
+
+    if not (chest_top < left_wrist_y < chest_bottom or
+            chest_top < right_wrist_y < chest_bottom):
+        return 0, "Bring arms in front of chest"
+
+    left_elbow = calculate_angle(lm[11], lm[13], lm[15])
+    right_elbow = calculate_angle(lm[12], lm[14], lm[16])
+
+    # Identify front arm (more bent)
+    front = min(left_elbow, right_elbow)
+    back = max(left_elbow, right_elbow)
+
+    # Very forgiving human ranges
+    if 50 <= front <= 100:
+        front_score = 100
+    elif 40 <= front < 50 or 100 < front <= 120:
+        front_score = 80
+    else:
+        front_score = 55
+
+    if 70 <= back <= 140:
+        back_score = 100
+    elif 60 <= back < 70 or 140 < back <= 160:
+        back_score = 80
+    else:
+        back_score = 60
+
+    score = 0.7 * front_score + 0.3 * back_score
+    score = max(0, min(100, score))
+
+    if score >= 85:
+        feedback = "Nice side chest!"
+    elif front < 50:
+        feedback = "Squeeze chest more"
+    else:
+        feedback = "Adjust arm position"
+
+    return int(score), feedback
+
+
+# LAT FLEX / LAT SPREAD
+def score_lat_flex(lm):
+    left_shoulder = np.array(lm[11])
+    right_shoulder = np.array(lm[12])
+    left_wrist = np.array(lm[15])
+    right_wrist = np.array(lm[16])
+
+    shoulder_width = np.linalg.norm(left_shoulder - right_shoulder)
+    wrist_width = np.linalg.norm(left_wrist - right_wrist)
+    ratio = wrist_width / (shoulder_width + 1e-6)
+
+    # check that arms are roughly at ribcage level (not hanging totally down)
+    left_wrist_y, right_wrist_y = lm[15][1], lm[16][1]
+    left_hip_y, right_hip_y = lm[23][1], lm[24][1]
+    left_sh_y, right_sh_y = lm[11][1], lm[12][1]
+
+    chest_top = min(left_sh_y, right_sh_y) + 0.05
+    hip_line = max(left_hip_y, right_hip_y) - 0.02
+
+    hands_in_zone = ((chest_top < left_wrist_y < hip_line) and
+                     (chest_top < right_wrist_y < hip_line))
+
+    if not hands_in_zone:
+        return 0, "Keep elbows wide at ribcage level"
+
+    # ratio ~1.0 = normal, 1.1–1.2 = good, >1.25 = very wide
+    if ratio >= 1.25:
+        score = 100
+        feedback = "Huge lat spread!"
+    elif ratio >= 1.15:
+        score = int(90 + (ratio - 1.15) * 100)  # 90–100
+        feedback = "Great lat spread"
+    elif ratio >= 1.05:
+        score = int(75 + (ratio - 1.05) * 150)  # 75–90
+        feedback = "Good, flare lats a bit more"
+    else:
+        score = max(50, int(ratio * 60))        # 50–63ish
+        feedback = "Spread elbows out and widen back"
+
+    score = max(0, min(100, score))
+    return score, feedback
+
+
+# MOST MUSCULAR
+# hands clasped in front of the waist, arms rounded (~80–130°)
+def score_most_muscular(lm):
+    left_wrist_y, right_wrist_y = lm[15][1], lm[16][1]
+    left_sh_y, right_sh_y = lm[11][1], lm[12][1]
+    left_hip_y, right_hip_y = lm[23][1], lm[24][1]
+
+    shoulder_width = np.linalg.norm(np.array(lm[11]) - np.array(lm[12]))
+    wrist_width = np.linalg.norm(np.array(lm[15]) - np.array(lm[16]))
+    spread = wrist_width / (shoulder_width + 1e-6)
+
+    chest_top = min(left_sh_y, right_sh_y) + 0.05
+    waist_low = max(left_hip_y, right_hip_y) + 0.05
+
+    if not (chest_top < left_wrist_y < waist_low and
+            chest_top < right_wrist_y < waist_low and spread < 0.8):
+        return 0, "Bring hands together in front of waist"
+
+    left = calculate_angle(lm[11], lm[13], lm[15])
+    right = calculate_angle(lm[12], lm[14], lm[16])
+
+    def rounded_arm_score(angle):
+        if 80 <= angle <= 130:
+            return 100
+        elif 65 <= angle < 80 or 130 < angle <= 145:
+            return 85
+        elif 50 <= angle < 65 or 145 < angle <= 160:
+            return 65
+        else:
+            return 40
+
+    if spread <= 0.35:
+        hands_score = 100
+    elif spread <= 0.55:
+        hands_score = 80
+    else:
+        hands_score = 60
+
+    symmetry_diff = abs(left - right)
+    symmetry_penalty = max(0, symmetry_diff - 25) * 0.5
+
+    score = 0.35 * rounded_arm_score(left) + 0.35 * rounded_arm_score(right) \
+        + 0.3 * hands_score - symmetry_penalty
+    score = max(0, min(100, score))
+
+    if score >= 85:
+        feedback = "Crushing most muscular!"
+    elif spread > 0.55:
+        feedback = "Bring your hands closer"
+    elif symmetry_diff > 30:
+        feedback = "Round both arms evenly"
+    else:
+        feedback = "Flex traps and chest harder"
+
+    return int(score), feedback
+
+
+# ABS & THIGH
+# hands behind the head (elbows tightly bent, ~15–60°), legs straight
+def score_abs_and_thigh(lm):
+    shoulder_width = np.linalg.norm(np.array(lm[11]) - np.array(lm[12]))
+    wrist_width = np.linalg.norm(np.array(lm[15]) - np.array(lm[16]))
+
+    if not is_pose_ready(lm) or wrist_width / (shoulder_width + 1e-6) >= 1.2:
+        return 0, "Put hands behind your head"
+
+    left = calculate_angle(lm[11], lm[13], lm[15])
+    right = calculate_angle(lm[12], lm[14], lm[16])
+    knee = min(calculate_angle(lm[23], lm[25], lm[27]),
+               calculate_angle(lm[24], lm[26], lm[28]))
+
+    def behind_head_score(angle):
+        if 15 <= angle <= 60:
+            return 100
+        elif 10 <= angle < 15 or 60 < angle <= 75:
+            return 85
+        elif 5 <= angle < 10 or 75 < angle <= 95:
+            return 65
+        else:
+            return 40
+
+    if 160 <= knee <= 180:
+        leg_score = 100
+    elif 145 <= knee < 160:
+        leg_score = 80
+    else:
+        leg_score = 55
+
+    symmetry_penalty = max(0, abs(left - right) - 20) * 0.5
+
+    score = 0.3 * behind_head_score(left) + 0.3 * behind_head_score(right) \
+        + 0.4 * leg_score - symmetry_penalty
+    score = max(0, min(100, score))
+
+    if score >= 85:
+        feedback = "Great abs and thigh!"
+    elif knee < 150:
+        feedback = "Straighten your front leg"
+    elif max(left, right) > 75:
+        feedback = "Keep elbows high and hands behind head"
+    else:
+        feedback = "Crunch your abs harder"
+
+    return int(score), feedback
+
+
+POSES = {
+    "1": ("Front Double Biceps", score_front_double_biceps),
+    "2": ("Back Double Biceps", score_back_double_biceps),
+    "3": ("Side Chest", score_side_chest),
+    "4": ("Lat Flex", score_lat_flex),
+}
+
+# every pose in checkfit.poses, scored by hand-written code independent of the
+# rule engine; parity_check.py freezes the golden fixtures from these
+REFERENCE_POSES = {
+    **POSES,
+    "5": ("Most Muscular", score_most_muscular),
+    "6": ("Abs & Thigh", score_abs_and_thigh),
+}
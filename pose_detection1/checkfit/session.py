@@ -0,0 +1,228 @@
+"""Compact chunked recording of CheckFit sessions, and replay without a camera.
+
+A session file (``.cfs``) is a JSON header followed by chunks of up to
+``chunk_frames`` frames and an index of chunk offsets at the end. Each chunk
+stores, as contiguous 8-byte aligned arrays:
+
+    timestamps  float64 (n,)        seconds since the session started
+    landmarks   float16 (n, 33, 3)  NaN when no one was detected
+    scores      uint8   (n, P)      every pose in the header's ``poses``
+    feedback    uint8   (n, P)      feedback ids, as returned by PoseRules
+    pose        int8    (n,)        active pose index
+
+``SessionReader`` memory-maps the file and returns NumPy views into it, so
+opening a long recording is instant. A file whose recorder never closed
+(no index) is read by walking the chunks.
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+MAGIC = b"CFSESS01"
+CHUNK_MAGIC = b"CFCHUNK\0"
+INDEX_MAGIC = b"CFINDEX\0"
+END_MAGIC = b"CFSEND\0\0"
+LANDMARKS = 33
+
+_CHUNK_HEAD = struct.Struct("<8sII")   # magic, frames, reserved
+_INDEX_HEAD = struct.Struct("<8sQ")    # magic, chunks
+_INDEX_ENTRY = struct.Struct("<QQd")   # offset, frames, first timestamp
+_TRAILER = struct.Struct("<Q8s")       # index offset, magic
+
+
+def _padded(size):
+    return (size + 7) & ~7
+
+
+def _chunk_layout(frames, poses):
+    """``[(name, dtype, shape, offset)]`` of a chunk's arrays after its header."""
+    layout, offset = [], _CHUNK_HEAD.size
+    for name, dtype, shape in (("timestamps", "<f8", (frames,)),
+                               ("landmarks", "<f2", (frames, LANDMARKS, 3)),
+                               ("scores", "u1", (frames, poses)),
+                               ("feedback", "u1", (frames, poses)),
+                               ("pose", "i1", (frames,))):
+        layout.append((name, np.dtype(dtype), shape, offset))
+        offset += _padded(int(np.prod(shape)) * np.dtype(dtype).itemsize)
+    return layout, offset
+
+
+class SessionRecorder:
+    """Append frames to a session file; call ``close`` (or use ``with``) to write the index."""
+
+    def __init__(self, path, pose_names, chunk_frames=256, metadata=None):
+        self.path = path
+        self.pose_names = list(pose_names)
+        self.chunk_frames = chunk_frames
+        self.frames = 0
+        self._start = None
+        self._index = []
+        n, poses = chunk_frames, len(self.pose_names)
+        self._buffers = {
+            "timestamps": np.zeros(n, dtype="<f8"),
+            "landmarks": np.full((n, LANDMARKS, 3), np.nan, dtype="<f2"),
+            "scores": np.zeros((n, poses), dtype="u1"),
+            "feedback": np.zeros((n, poses), dtype="u1"),
+            "pose": np.zeros(n, dtype="i1"),
+        }
+        self._used = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "wb")
+        header = json.dumps({"poses": self.pose_names, "chunk_frames": chunk_frames,
+                             "created": time.time(), **(metadata or {})}).encode()
+        self._file.write(MAGIC + struct.pack("<II", 1, len(header)))
+        self._file.write(header + b"\0" * (_padded(len(header)) - len(header)))
+
+    def append(self, timestamp, lm, scores=None, feedback=None, pose=0):
+        """Record one frame; ``lm`` is ``(33, 3)`` or ``None`` when no one was detected."""
+        if self._start is None:
+            self._start = timestamp
+        i, b = self._used, self._buffers
+        b["timestamps"][i] = timestamp - self._start
+        b["landmarks"][i] = np.nan if lm is None else lm
+        b["scores"][i] = 0 if scores is None else scores
+        b["feedback"][i] = 0 if feedback is None else feedback
+        b["pose"][i] = pose
+        self._used += 1
+        self.frames += 1
+        if self._used == self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered frames as one chunk."""
+        n = self._used
+        if not n:
+            return
+        offset = self._file.tell()
+        self._index.append((offset, n, float(self._buffers["timestamps"][0])))
+        layout, size = _chunk_layout(n, len(self.pose_names))
+        block = bytearray(size)
+        _CHUNK_HEAD.pack_into(block, 0, CHUNK_MAGIC, n, 0)
+        for name, dtype, shape, start in layout:
+            data = self._buffers[name][:n].tobytes()
+            block[start:start + len(data)] = data
+        self._file.write(block)
+        self._file.flush()
+        self._used = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        index_offset = self._file.tell()
+        self._file.write(_INDEX_HEAD.pack(INDEX_MAGIC, len(self._index)))
+        for entry in self._index:
+            self._file.write(_INDEX_ENTRY.pack(*entry))
+        self._file.write(_TRAILER.pack(index_offset, END_MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Chunk:
+    """NumPy views of one chunk (``timestamps``, ``landmarks``, ``scores``, ``feedback``, ``pose``)."""
+
+    def __init__(self, buffer, offset, poses):
+        magic, frames, _ = _CHUNK_HEAD.unpack_from(buffer, offset)
+        if magic != CHUNK_MAGIC:
+            raise ValueError(f"No chunk at offset {offset}")
+        self.frames = frames
+        layout, self.size = _chunk_layout(frames, poses)
+        for name, dtype, shape, start in layout:
+            count = int(np.prod(shape))
+            setattr(self, name, np.frombuffer(buffer, dtype=dtype, count=count,
+                                              offset=offset + start).reshape(shape))
+
+    @property
+    def detected(self):
+        return ~np.isnan(self.landmarks[:, 0, 0])
+
+
+class SessionReader:
+    """Memory-mapped, read-only view of a session file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_len = struct.unpack_from("<8sII", self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a CheckFit session file: {path}")
+        self.header = json.loads(bytes(self._map[16:16 + header_len]))
+        self.pose_names = self.header["poses"]
+        self._data_start = 16 + _padded(header_len)
+        self.chunks = self._load_index()
+        self.frames = sum(chunk.frames for chunk in self.chunks)
+
+    def _load_index(self):
+        poses = len(self.pose_names)
+        if len(self._map) >= self._data_start + _TRAILER.size:
+            index_offset, magic = _TRAILER.unpack_from(self._map, len(self._map) - _TRAILER.size)
+            if magic == END_MAGIC:
+                _, count = _INDEX_HEAD.unpack_from(self._map, index_offset)
+                entries = [_INDEX_ENTRY.unpack_from(self._map, index_offset + _INDEX_HEAD.size +
+                                                    i * _INDEX_ENTRY.size) for i in range(count)]
+                return [Chunk(self._map, offset, poses) for offset, _, _ in entries]
+        # recorder did not close: walk the complete chunks
+        chunks, offset = [], self._data_start
+        while offset + _CHUNK_HEAD.size <= len(self._map):
+            try:
+                chunk = Chunk(self._map, offset, poses)
+            except (ValueError, TypeError):
+                break
+            if offset + chunk.size > len(self._map):
+                break
+            chunks.append(chunk)
+            offset += chunk.size
+        return chunks
+
+    def column(self, name):
+        """One field for the whole session, concatenated (a copy)."""
+        if not self.chunks:
+            return None
+        return np.concatenate([getattr(chunk, name) for chunk in self.chunks])
+
+    def close(self):
+        self.chunks = []
+        self._file.close()
+        try:
+            self._map.close()
+        except BufferError:
+            # arrays handed out still point into the map; it closes when they go
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def default_session_path(directory="sessions"):
+    """``sessions/session_YYYYmmdd_HHMMSS.cfs``"""
+    return os.path.join(directory, time.strftime("session_%Y%m%d_%H%M%S.cfs"))
+
+
+def replay(reader, rules):
+    """Re-score a recording chunk by chunk with ``rules`` (a ``PoseRules``).
+
+    Yields ``(chunk, scores, feedback)``; rows where nothing was detected are
+    zero, as they were when recorded. Runs as fast as NumPy can score.
+    """
+    for chunk in reader.chunks:
+        scores = np.zeros((chunk.frames, len(rules)), dtype=np.int64)
+        feedback = np.zeros_like(scores)
+        detected = chunk.detected
+        if detected.any():
+            scores[detected], feedback[detected] = rules.score(chunk.landmarks[detected])
+        yield chunk, scores, feedback
@@ -0,0 +1,105 @@
+"""Background snapshot writer for the coach loop.
+
+``SnapshotWriter.submit`` copies the frame and returns immediately; a worker
+thread encodes and writes it. Pending snapshots that share a ``key`` are
+coalesced, so when the best score improves five times before the worker gets
+to it, only the latest frame is written. The queue is bounded: when it is
+full, the oldest pending snapshot is dropped rather than stalling the caller.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+
+ENCODERS = {
+    "jpg": (".jpg", [cv2.IMWRITE_JPEG_QUALITY, 90]),
+    "png": (".png", [cv2.IMWRITE_PNG_COMPRESSION, 3]),
+    "webp": (".webp", [cv2.IMWRITE_WEBP_QUALITY, 90]),
+}
+
+
+class SnapshotWriter:
+    def __init__(self, directory="snapshots", fmt="jpg", max_pending=8):
+        if fmt not in ENCODERS:
+            raise ValueError(f"Unknown snapshot format {fmt!r}; use one of {', '.join(ENCODERS)}")
+        self.directory = directory
+        self.extension, self.params = ENCODERS[fmt]
+        self.max_pending = max_pending
+        self._pending = OrderedDict()  # key -> (name, image)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.written = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed = 0
+        self.write_ms = 0.0
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="snapshots", daemon=True)
+        self._thread.start()
+
+    def submit(self, name, image, key=None):
+        """Queue ``image`` to be written as ``<directory>/<name>.<ext>``; never blocks on disk.
+
+        A pending snapshot with the same ``key`` (default: ``name``) is
+        replaced. Returns the path it will be written to.
+        """
+        key = key or name
+        image = image.copy()  # the caller keeps drawing on its frame
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("SnapshotWriter is closed")
+            if key in self._pending:
+                self.coalesced += 1
+                del self._pending[key]
+            elif len(self._pending) >= self.max_pending:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            self._pending[key] = (name, image)
+            self._cond.notify()
+        return os.path.join(self.directory, name + self.extension)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                _, (name, image) = self._pending.popitem(last=False)
+            self._write(name, image)
+
+    def _write(self, name, image):
+        start = time.perf_counter()
+        path = os.path.join(self.directory, name + self.extension)
+        ok, encoded = cv2.imencode(self.extension, image, self.params)
+        if not ok:
+            self.failed += 1
+            print(f"Error encoding snapshot {path}")
+            return
+        # write then rename, so a reader never sees a half-written file
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(encoded.tobytes())
+            os.replace(tmp, path)
+        except OSError as e:
+            self.failed += 1
+            print(f"Error writing snapshot {path}: {str(e)}")
+            return
+        self.written += 1
+        self.write_ms += (time.perf_counter() - start) * 1000
+
+    def close(self, timeout=5):
+        """Write what is still pending (up to ``timeout`` seconds) and stop the worker."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def stats(self) -> str:
+        mean = self.write_ms / self.written if self.written else 0.0
+        return (f"snapshots written {self.written} ({mean:.1f} ms each), "
+                f"coalesced {self.coalesced}, dropped {self.dropped}, failed {self.failed}")
@@ -0,0 +1,152 @@
+"""Frame sources for the coach loop: a webcam, a video file or a recorded session.
+
+Every source has the ``cv2.VideoCapture`` calls the loops use (``read``,
+``isOpened``, ``release``), so it plugs into ``FramePipeline`` and the
+station workers as is, and ``tracker()`` returns what turns its frames into
+landmarks. For cameras and videos that is a ``PoseTracker``. ``ReplaySource``
+plays back a session recorded with ``--record``: it produces blank frames and
+its tracker hands back the recorded landmarks of each one, so MediaPipe is
+skipped and scoring and rendering can be measured on their own.
+"""
+
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from .live import PoseTracker, landmark_result
+from .session import SessionReader
+
+
+class CameraSource:
+    def __init__(self, index=0):
+        self.name = f"camera {index}"
+        self._cap = cv2.VideoCapture(index)
+
+    def isOpened(self):
+        return self._cap.isOpened()
+
+    def read(self, image=None):
+        return self._cap.read(image)
+
+    def tracker(self, **kwargs):
+        return PoseTracker(**kwargs)
+
+    def release(self):
+        self._cap.release()
+
+
+class VideoFileSource(CameraSource):
+    def __init__(self, path, loop=False, realtime=False):
+        """
+        loop: start over at the end of the file
+        realtime: deliver frames at the file's frame rate instead of as fast as they decode
+        """
+        self.name = path
+        self.path = path
+        self.loop = loop
+        self._cap = cv2.VideoCapture(path)
+        fps = self._cap.get(cv2.CAP_PROP_FPS)
+        self._interval = 1.0 / fps if realtime and fps > 0 else 0.0
+        self._due = None
+
+    def read(self, image=None):
+        ok, frame = self._cap.read(image)
+        if not ok and self.loop:
+            self._cap.release()
+            self._cap = cv2.VideoCapture(self.path)
+            ok, frame = self._cap.read(image)
+        if ok and self._interval:
+            now = time.perf_counter()
+            if self._due is None or now - self._due > self._interval:
+                self._due = now  # first frame, or fell behind: do not rush to catch up
+            time.sleep(max(0.0, self._due - now))
+            self._due += self._interval
+        return ok, frame
+
+
+class ReplaySource:
+    def __init__(self, path, size=(640, 480), loop=False, realtime=False):
+        """
+        size: (width, height) of the blank frames; landmarks are normalized, so any size works
+        realtime: deliver frames at the recorded timestamps instead of as fast as possible
+        """
+        self.name = path
+        self.loop = loop
+        self.realtime = realtime
+        with SessionReader(path) as reader:
+            self.timestamps = reader.column("timestamps") if reader.frames else np.zeros(0)
+            landmarks = reader.column("landmarks") if reader.frames else np.zeros((0, 33, 3))
+            self.landmarks = landmarks.astype(np.float64)
+        self.detected = ~np.isnan(self.landmarks[:, 0, 0])
+        self._background = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+        self._index = 0
+        self._started = None
+        # frames handed out recently; the pipeline may drop some before inference
+        self._recent = deque(maxlen=8)
+
+    def isOpened(self):
+        return len(self.timestamps) > 0
+
+    def read(self, image=None):
+        if self._index >= len(self.timestamps):
+            if not self.loop or not len(self.timestamps):
+                return False, None
+            self._index, self._started = 0, None
+        i = self._index
+        self._index += 1
+        if self.realtime:
+            now = time.perf_counter()
+            if self._started is None:
+                self._started = now - self.timestamps[i]
+            time.sleep(max(0.0, self._started + self.timestamps[i] - now))
+        if image is not None and image.shape == self._background.shape:
+            np.copyto(image, self._background)
+            frame = image
+        else:
+            frame = self._background.copy()
+        self._recent.append((frame, i))
+        return True, frame
+
+    def landmarks_for(self, frame):
+        """The recorded ``(33, 3)`` landmarks of a frame this source produced (``None``: no one)."""
+        for recent, i in reversed(list(self._recent)):
+            if recent is frame:
+                return self.landmarks[i] if self.detected[i] else None
+        return None
+
+    def tracker(self, **kwargs):
+        return ReplayTracker(self)
+
+    def release(self):
+        self._recent.clear()
+
+
+class ReplayTracker:
+    """Stands in for ``PoseTracker`` on a ``ReplaySource``: no inference, recorded landmarks."""
+
+    def __init__(self, source):
+        self.source = source
+
+    def process(self, frame):
+        lm = self.source.landmarks_for(frame)
+        if lm is None:
+            return None, None
+        return landmark_result(lm), lm
+
+    def status(self) -> str:
+        return f"replay {self.source.name}"
+
+    def close(self):
+        pass
+
+
+def open_source(spec, loop=False, realtime=False):
+    """Camera index (``0``), session file (``.cfs``) or video file path."""
+    spec = str(spec)
+    if spec.isdigit():
+        return CameraSource(int(spec))
+    if spec.endswith(".cfs"):
+        return ReplaySource(spec, loop=loop, realtime=realtime)
+    return VideoFileSource(spec, loop=loop, realtime=realtime)
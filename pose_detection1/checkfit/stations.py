@@ -0,0 +1,210 @@
+"""Coach several camera stations from one machine, one worker process each.
+
+``StationSupervisor`` starts a process per source (a device index, a video
+file or a recorded session, see ``sources``). Each worker owns its capture
+and MediaPipe model, scores every pose with ``POSE_RULES`` and writes the
+result into a ``LandmarkRing`` in shared memory; nothing but landmarks and
+scores crosses the process boundary, and frames never do. Stations run in
+parallel on separate cores, and the supervisor reads the newest entry of
+every ring without blocking any worker.
+"""
+
+import multiprocessing
+import signal
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+LANDMARKS = 33
+
+# worker states, in the ring header
+STARTING, RUNNING, FINISHED, FAILED = range(4)
+STATE_NAMES = ("starting", "running", "finished", "failed")
+
+_HEADER = 4  # int64: entries written, state, frames read, pid
+
+
+def _slot_dtype(poses):
+    return np.dtype([("seq", "<i8"), ("timestamp", "<f8"), ("latency", "<f4"),
+                     ("detected", "u1"), ("landmarks", "<f4", (LANDMARKS, 3)),
+                     ("scores", "u1", (poses,)), ("feedback", "u1", (poses,))])
+
+
+class LandmarkRing:
+    """Fixed-size ring of scored frames in shared memory; one writer, any readers.
+
+    The writer marks a slot's ``seq`` -1, fills it, stamps its ``seq`` and
+    only then bumps the header's count. ``latest`` reads it like a seqlock:
+    the slot's ``seq`` must be the expected one both before and after the
+    copy, so a copy the writer overwrote midway (after lapping the ring) is
+    retried instead of returned.
+    """
+
+    def __init__(self, poses, slots=64, name=None):
+        self.dtype = _slot_dtype(poses)
+        size = _HEADER * 8 + slots * self.dtype.itemsize
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.slots = slots
+        self.header = np.ndarray((_HEADER,), dtype="<i8", buffer=self.shm.buf)
+        self.entries = np.ndarray((slots,), dtype=self.dtype, buffer=self.shm.buf, offset=_HEADER * 8)
+        if self.owner:
+            self.header[:] = 0
+            self.entries["seq"] = -1
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def written(self):
+        return int(self.header[0])
+
+    def write(self, timestamp, lm, scores, feedback, latency):
+        seq = self.written
+        i, e = seq % self.slots, self.entries
+        e["seq"][i] = -1
+        e["timestamp"][i] = timestamp
+        e["latency"][i] = latency
+        e["detected"][i] = lm is not None
+        e["landmarks"][i] = np.nan if lm is None else lm
+        e["scores"][i] = 0 if scores is None else scores
+        e["feedback"][i] = 0 if feedback is None else feedback
+        e["seq"][i] = seq
+        self.header[0] = seq + 1
+
+    def fps(self):
+        """Entries per second over what the ring still holds."""
+        seqs = self.entries["seq"]
+        times = self.entries["timestamp"][seqs >= 0]
+        if len(times) < 2 or times.max() <= times.min():
+            return 0.0
+        return (len(times) - 1) / float(times.max() - times.min())
+
+    def latest(self):
+        """A copy of the newest entry, or ``None`` if nothing was written yet."""
+        for _ in range(3):
+            seq = self.written - 1
+            if seq < 0:
+                return None
+            i = seq % self.slots
+            if self.entries["seq"][i] != seq:
+                continue
+            entry = self.entries[i].copy()
+            if self.entries["seq"][i] == seq:
+                return entry
+        return None
+
+    def close(self):
+        # drop the views first, the mapping cannot close while they exist
+        del self.header, self.entries
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def station_worker(ring_name, poses, slots, source, stop, loop=False):
+    """Capture, track and score ``source`` until ``stop`` is set or the video ends."""
+    from . import POSE_RULES
+    from .sources import open_source
+
+    # Ctrl+C reaches the whole process group; the supervisor stops us via ``stop``
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    ring = LandmarkRing(poses, slots, name=ring_name)
+    ring.header[3] = multiprocessing.current_process().pid
+    cap, tracker = open_source(source, loop=loop), None
+    try:
+        if not cap.isOpened():
+            raise OSError(f"cannot open {source}")
+        tracker = cap.tracker()
+        ring.header[1] = RUNNING
+        while not stop.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                break
+            ring.header[2] += 1
+            start = time.perf_counter()
+            _, lm = tracker.process(frame)
+            scores, feedback = POSE_RULES.score_frame(lm) if lm is not None else (None, None)
+            ring.write(time.time(), lm, scores, feedback, time.perf_counter() - start)
+        ring.header[1] = FINISHED
+    except Exception as e:
+        ring.header[1] = FAILED
+        print(f"Error in station {source}: {str(e)}")
+    finally:
+        if tracker:
+            tracker.close()
+        cap.release()
+        ring.close()
+
+
+class StationSupervisor:
+    def __init__(self, sources, pose_names, slots=64, loop=False):
+        """
+        sources: ``{station name: device index or video path}``
+        pose_names: the poses every station scores (``POSE_RULES.names``)
+        """
+        # spawn: MediaPipe and OpenCV do not survive a fork cleanly
+        self._ctx = multiprocessing.get_context("spawn")
+        self.pose_names = list(pose_names)
+        self.sources = dict(sources)
+        self.slots = slots
+        self.loop = loop
+        self._stop = self._ctx.Event()
+        self.rings, self.processes = {}, {}
+
+    def start(self):
+        for name, source in self.sources.items():
+            ring = LandmarkRing(len(self.pose_names), self.slots)
+            process = self._ctx.Process(
+                target=station_worker, name=f"station-{name}", daemon=True,
+                args=(ring.name, len(self.pose_names), self.slots, source, self._stop, self.loop))
+            process.start()
+            self.rings[name], self.processes[name] = ring, process
+        return self
+
+    def latest(self, name):
+        return self.rings[name].latest()
+
+    def status(self):
+        """``{station: {...}}`` with state, FPS, inference latency and the newest scores."""
+        stations = {}
+        for name, ring in self.rings.items():
+            state = int(ring.header[1])
+            if state in (STARTING, RUNNING) and not self.processes[name].is_alive():
+                state = FAILED
+            entry = ring.latest()
+            station = {
+                "source": str(self.sources[name]),
+                "state": STATE_NAMES[state],
+                "frames": int(ring.header[2]),
+                "fps": round(ring.fps(), 1),
+                "detected": bool(entry["detected"]) if entry is not None else False,
+            }
+            if entry is not None:
+                station["latency_ms"] = round(float(entry["latency"]) * 1000, 1)
+                station["age_s"] = round(time.time() - float(entry["timestamp"]), 2)
+                if entry["detected"]:
+                    best = int(entry["scores"].argmax())
+                    station["best_pose"] = self.pose_names[best]
+                    station["scores"] = dict(zip(self.pose_names, entry["scores"].tolist()))
+            stations[name] = station
+        return stations
+
+    def running(self):
+        return any(process.is_alive() for process in self.processes.values())
+
+    def stop(self, timeout=5):
+        """Ask every station to finish and wait for it; the rings stay readable until ``close``."""
+        self._stop.set()
+        for process in self.processes.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+    def close(self):
+        self.stop()
+        for ring in self.rings.values():
+            ring.close()
+        self.rings, self.processes = {}, {}
@@ -0,0 +1,188 @@
+"""Pre-rendered voice coaching clips.
+
+Every feedback message the pose rules can give is synthesized once, ahead of
+time, into a content-addressed cache: a clip's file name is the SHA-256 of its
+text, voice and model, so changing any of them renders a new clip and an
+unchanged phrase is never synthesized twice. The coach then plays clips from
+disk with no synthesis at runtime (see ``live.load_voice_clips``). The cache's
+``manifest.json`` records the voice and model each backend was last built
+with, so the coach finds clips rendered with ``--voice``/``--model`` too.
+
+Backends turn text into WAV bytes:
+
+    ElevenLabsBackend  the ElevenLabs API (``elevenlabs`` package, ELEVEN_API_KEY)
+    LocalBackend       offline stand-in for tests and development; renders a
+                       short tone per word, deterministic and dependency-free
+"""
+
+import hashlib
+import io
+import json
+import math
+import os
+import struct
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CACHE = "voice_cache"
+MANIFEST = "manifest.json"
+SAMPLE_RATE = 22050
+
+
+def feedback_phrases(rules):
+    """Every distinct feedback message a ``PoseRules`` can return, sorted."""
+    return sorted({message for messages in rules.feedback for message in messages if message})
+
+
+def clip_key(text, voice, model):
+    payload = json.dumps([text, voice, model], ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def pcm_to_wav(pcm, sample_rate=SAMPLE_RATE):
+    """Wrap 16-bit mono little-endian PCM in a WAV header."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        out.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class ElevenLabsBackend:
+    name = "elevenlabs"
+    default_voice = "TxGEqnHWrfWFTfGW9XjX"  # Josh, as in test_voice.py
+    default_model = "eleven_turbo_v2"
+
+    def __init__(self, api_key=None, voice=None, model=None):
+        from elevenlabs.client import ElevenLabs
+        api_key = api_key or os.getenv("ELEVEN_API_KEY")
+        if not api_key:
+            raise ValueError("No ElevenLabs API key (set ELEVEN_API_KEY in .env)")
+        self.client = ElevenLabs(api_key=api_key)
+        self.voice = voice or self.default_voice
+        self.model = model or self.default_model
+
+    def synthesize(self, text):
+        # raw PCM, so clips are plain WAV files pygame loads without decoding MP3
+        audio = self.client.text_to_speech.convert(
+            text=text, voice_id=self.voice, model_id=self.model,
+            output_format=f"pcm_{SAMPLE_RATE}")
+        return pcm_to_wav(b"".join(audio))
+
+
+class LocalBackend:
+    name = "local"
+    default_voice = "tones"
+    default_model = "local-v1"
+
+    def __init__(self, voice=None, model=None):
+        self.voice = voice or self.default_voice
+        self.model = model or self.default_model
+
+    def synthesize(self, text):
+        samples = []
+        for word in text.split():
+            pitch = 220 + (sum(map(ord, word)) % 24) * 20
+            length = int(SAMPLE_RATE * (0.06 + 0.02 * len(word)))
+            samples += [int(8000 * math.sin(2 * math.pi * pitch * i / SAMPLE_RATE))
+                        for i in range(length)]
+            samples += [0] * int(SAMPLE_RATE * 0.04)
+        return pcm_to_wav(struct.pack(f"<{len(samples)}h", *samples))
+
+
+BACKENDS = {"elevenlabs": ElevenLabsBackend, "local": LocalBackend}
+
+
+class VoiceCache:
+    """``<directory>/<key[:2]>/<key>.wav`` files keyed by ``clip_key``."""
+
+    def __init__(self, directory=DEFAULT_CACHE):
+        self.directory = directory
+
+    def path(self, text, voice, model):
+        key = clip_key(text, voice, model)
+        return os.path.join(self.directory, key[:2], key + ".wav")
+
+    def get(self, text, voice, model):
+        path = self.path(text, voice, model)
+        return path if os.path.exists(path) else None
+
+    def _manifest(self):
+        try:
+            with open(os.path.join(self.directory, MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def record(self, backend):
+        """Note ``backend``'s voice and model as the ones its clips were built with."""
+        manifest = self._manifest()
+        manifest[backend.name] = {"voice": backend.voice, "model": backend.model}
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, MANIFEST)
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def voice_for(self, backend):
+        """``(voice, model)`` last built for the ``backend`` class, else its defaults."""
+        entry = self._manifest().get(backend.name, {})
+        return entry.get("voice", backend.default_voice), entry.get("model", backend.default_model)
+
+    def put(self, text, voice, model, data):
+        path = self.path(text, voice, model)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return path
+
+
+def build_voice_pack(phrases, backend, cache, workers=4, batch_size=8, progress=None):
+    """Synthesize every phrase not yet in ``cache``, ``workers`` requests at a time.
+
+    Phrases go out in batches of ``batch_size`` so a failing API stops the
+    build early instead of erroring on every phrase. Returns
+    ``(paths, stats)``: ``{text: path}`` for every available clip and counts
+    of ``cached``, ``synthesized`` and ``failed`` phrases.
+    """
+    paths, stats = {}, {"cached": 0, "synthesized": 0, "failed": 0}
+    missing = []
+    for text in phrases:
+        path = cache.get(text, backend.voice, backend.model)
+        if path:
+            paths[text] = path
+            stats["cached"] += 1
+        else:
+            missing.append(text)
+
+    def render(text):
+        try:
+            return text, backend.synthesize(text), None
+        except Exception as e:
+            return text, None, e
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            failed = 0
+            for text, data, error in pool.map(render, batch):
+                if error is not None:
+                    failed += 1
+                    print(f"Error synthesizing {text!r}: {str(error)}")
+                    continue
+                paths[text] = cache.put(text, backend.voice, backend.model, data)
+                stats["synthesized"] += 1
+                if progress:
+                    progress(text)
+            stats["failed"] += failed
+            if failed == len(batch):
+                # the whole batch failed: give up on the rest
+                stats["failed"] += len(missing) - start - len(batch)
+                break
+    if paths:
+        cache.record(backend)
+    return paths, stats
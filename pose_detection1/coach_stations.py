@@ -0,0 +1,99 @@
+"""Coach several camera stations at once, one worker process per source.
+
+Usage: python coach_stations.py SOURCE [SOURCE ...] [--loop] [--port 8765] [--interval 2]
+
+A SOURCE is a camera index (0, 1, ...), a video file or a recorded session
+(.cfs), optionally named as NAME=SOURCE (stage=0 or judge=clip.mp4). Each
+station captures, tracks and scores in its own process, so stations scale
+with CPU cores. The supervisor prints a status table every --interval
+seconds, and with --port serves the same status as JSON at
+http://localhost:PORT/status. Ctrl+C stops every station.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from checkfit import POSE_RULES
+from checkfit.stations import StationSupervisor
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-station CheckFit coach")
+    parser.add_argument("sources", nargs="+", help="camera index or video file, optionally NAME=SOURCE")
+    parser.add_argument("--loop", action="store_true", help="restart video files when they end")
+    parser.add_argument("--port", type=int, help="serve the status as JSON on this port")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between status lines")
+    return parser.parse_args(argv)
+
+
+def named_sources(sources):
+    named = {}
+    for i, source in enumerate(sources):
+        name, _, path = source.rpartition("=")
+        named[name or f"station{i + 1}"] = path
+    return named
+
+
+def serve_status(supervisor, port):
+    class StatusHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") not in ("", "/status"):
+                self.send_error(404)
+                return
+            body = json.dumps({"stations": supervisor.status()}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), StatusHandler)
+    threading.Thread(target=server.serve_forever, name="status", daemon=True).start()
+    print(f"Status at http://127.0.0.1:{port}/status")
+    return server
+
+
+def print_status(status):
+    for name, station in status.items():
+        line = (f"  {name:<12} {station['state']:<9} {station['fps']:5.1f} FPS "
+                f"{station.get('latency_ms', 0.0):6.1f} ms | frames {station['frames']}")
+        if station.get("best_pose"):
+            line += f" | {station['best_pose']} {station['scores'][station['best_pose']]}"
+        elif station["state"] == "running":
+            line += " | no one in view"
+        print(line)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sources = named_sources(args.sources)
+    supervisor = StationSupervisor(sources, POSE_RULES.names, loop=args.loop).start()
+    print(f"Started {len(sources)} stations: " + ", ".join(f"{n}={s}" for n, s in sources.items()))
+    server = serve_status(supervisor, args.port) if args.port else None
+    try:
+        while supervisor.running():
+            time.sleep(args.interval)
+            print(time.strftime("%H:%M:%S"))
+            print_status(supervisor.status())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server:
+            server.shutdown()
+        supervisor.stop()
+        final = supervisor.status()
+        supervisor.close()
+    print("Final:")
+    print_status(final)
+    return 0 if all(s["state"] != "failed" for s in final.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
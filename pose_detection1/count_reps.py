@@ -0,0 +1,118 @@
+"""Count reps live from the webcam, or from a recorded session.
+
+Usage: python count_reps.py --exercise curl|squat|press|row [--side both|left|right]
+                            [--session SESSION.cfs] [--weight KG]
+                            [--post http://localhost:5000 --email you@example.com]
+
+Live, press q to finish the set. The set's reps, mean tempo (time to the
+turn and back) and range of motion are printed, and with --post the set is
+added to your workout history through /add_workout (the password is read from
+CHECKFIT_PASSWORD or asked for).
+"""
+
+import argparse
+import getpass
+import os
+import sys
+import time
+
+from checkfit.reps import EXERCISES, SIDES, RepCounter, post_set
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Count reps from pose landmarks")
+    parser.add_argument("--exercise", required=True, choices=list(EXERCISES))
+    parser.add_argument("--side", default="both", choices=list(SIDES),
+                        help="follow both arms/legs, or one side (alternating or one-arm sets)")
+    parser.add_argument("--session", help="count reps in a recorded session instead of the webcam")
+    parser.add_argument("--weight", type=float, default=0.0, help="weight used, for /add_workout")
+    parser.add_argument("--post", metavar="URL", help="web app to add the finished set to")
+    parser.add_argument("--email", help="account to log the set under (with --post)")
+    return parser.parse_args(argv)
+
+
+def print_rep(rep):
+    print(f"  rep {rep.number}: {rep.duration:.2f}s ({rep.to_turn:.2f}s + {rep.back:.2f}s), "
+          f"range {rep.range_of_motion:.0f}°")
+
+
+def count_session(path, counter):
+    from checkfit.session import SessionReader
+
+    with SessionReader(path) as reader:
+        for chunk in reader.chunks:
+            detected = chunk.detected
+            for i in range(chunk.frames):
+                rep = counter.update(float(chunk.timestamps[i]),
+                                     chunk.landmarks[i].astype(float) if detected[i] else None)
+                if rep:
+                    print_rep(rep)
+
+
+def count_live(counter):
+    import cv2
+    import mediapipe as mp
+    from checkfit.live import PoseTracker
+
+    mp_drawing = mp.solutions.drawing_utils
+    cap = cv2.VideoCapture(0)
+    tracker = PoseTracker()
+    try:
+        while cap.isOpened():
+            ret, image = cap.read()
+            if not ret:
+                break
+            result, lm = tracker.process(image)
+            rep = counter.update(time.perf_counter(), lm)
+            if rep:
+                print_rep(rep)
+            if lm is not None:
+                mp_drawing.draw_landmarks(image, result.pose_landmarks, mp.solutions.pose.POSE_CONNECTIONS)
+
+            cv2.putText(image, f"{counter.exercise.name} | Reps: {counter.count}",
+                        (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 3)
+            if counter.angle is not None:
+                cv2.putText(image, f"Angle: {counter.angle:.0f}  ({counter.state})",
+                            (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+            cv2.putText(image, "Q: finish set", (10, image.shape[0] - 15),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+
+            cv2.imshow("AI Rep Counter", image)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    finally:
+        tracker.close()
+        cap.release()
+        cv2.destroyAllWindows()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.post and not args.email:
+        print("--post needs --email")
+        return 2
+    counter = RepCounter(args.exercise, side=args.side)
+
+    if args.session:
+        count_session(args.session, counter)
+    else:
+        count_live(counter)
+
+    summary = counter.summary()
+    print(f"\n{summary['exercise']}: {summary['reps']} reps ({summary['partials']} partial) | "
+          f"tempo {summary['tempo']:.2f}s ({summary['to_turn']:.2f}s + {summary['back']:.2f}s) | "
+          f"range {summary['range_of_motion']:.0f}°")
+
+    if args.post and counter.count:
+        password = os.getenv("CHECKFIT_PASSWORD") or getpass.getpass(f"Password for {args.email}: ")
+        try:
+            reply = post_set(args.post, args.email, password, counter.workout_payload(args.weight))
+            print(reply.get("message", reply))
+        except Exception as e:
+            print(f"Error posting set: {str(e)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,39 @@
+// Run static/js/pose_scoring.js under node on a landmark fixture file.
+//
+// Usage: node js_scoring_runner.js FIXTURES.json [repeat]
+//
+// Prints JSON: {"results": [[{score, feedback} per pose] per frame],
+//               "us_per_frame": {pose: microseconds}}
+// Used by parity_check.py; repeat > 0 also times each pose's scorer.
+
+const fs = require('fs');
+const path = require('path');
+const vm = require('vm');
+
+const scoringPath = path.join(__dirname, '..', 'static', 'js', 'pose_scoring.js');
+vm.runInThisContext(fs.readFileSync(scoringPath, 'utf8'), { filename: scoringPath });
+
+const fixtures = JSON.parse(fs.readFileSync(process.argv[2], 'utf8'));
+const repeat = parseInt(process.argv[3] || '0', 10);
+const frames = fixtures.frames.map(frame => frame.landmarks);
+
+const results = frames.map(landmarks => fixtures.poses.map(poseName => {
+    const result = scorePose(poseName, landmarks);
+    return { score: result.score, feedback: result.feedback };
+}));
+
+const usPerFrame = {};
+if (repeat > 0) {
+    for (const poseName of fixtures.poses) {
+        const start = process.hrtime.bigint();
+        for (let r = 0; r < repeat; r++) {
+            for (const landmarks of frames) {
+                scorePose(poseName, landmarks);
+            }
+        }
+        const elapsed = Number(process.hrtime.bigint() - start) / 1000;
+        usPerFrame[poseName] = elapsed / (repeat * frames.length);
+    }
+}
+
+process.stdout.write(JSON.stringify({ results, us_per_frame: usPerFrame }));
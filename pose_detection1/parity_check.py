@@ -0,0 +1,238 @@
+"""Python/JavaScript pose scoring parity check and benchmark on golden fixtures.
+
+Usage: python parity_check.py [--bench] [--generate N]
+
+fixtures/golden_landmarks.json holds landmark frames with the scores and
+feedback every pose should give. The check runs the Python rule engine
+(batched and per frame) and the reference scorers against it,
+then static/js/pose_scoring.js under node (js_scoring_runner.js), and lists
+every disagreement. A pose the JS port does not implement is a failure.
+--bench times every implementation on the same frames; --generate rebuilds
+the fixtures (N frames per stance) with expectations from the hand-written
+reference scorers (checkfit.scoring.REFERENCE_POSES), never from the rule
+engine under test.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from checkfit import POSES, POSE_RULES, REFERENCE_POSES
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures", "golden_landmarks.json")
+JS_RUNNER = os.path.join(HERE, "js_scoring_runner.js")
+
+# (left, right) landmarks of every pair a stance places
+PAIRS = {"shoulders": (11, 12), "elbows": (13, 14), "wrists": (15, 16),
+         "hips": (23, 24), "knees": (25, 26), "ankles": (27, 28)}
+REST = {"shoulders": (0.35, 0.10), "hips": (0.70, 0.07), "knees": (0.85, 0.08),
+        "ankles": (0.98, 0.08), "jitter": 0.04}
+
+# Per stance: (y, x offset from centre) of the pairs it moves, or a
+# ((y, dx), (y, dx)) left/right couple for an asymmetric one, and optionally
+# the frame-to-frame jitter. Between them they reach every score band and
+# feedback message of every pose.
+STANCES = {
+    "arms_up": {"wrists": (0.22, 0.12), "elbows": (0.30, 0.20)},
+    "chest": {"wrists": (0.50, 0.04), "elbows": (0.45, 0.12)},
+    "lat": {"wrists": (0.55, 0.20), "elbows": (0.48, 0.22)},
+    "most_muscular": {"wrists": (0.60, 0.03), "elbows": (0.50, 0.15)},
+    "hands_behind_head": {"wrists": (0.18, 0.06), "elbows": (0.20, 0.22)},
+    "lat_narrow": {"wrists": (0.55, 0.11), "elbows": (0.48, 0.20), "jitter": 0.01},
+    "most_muscular_wide": {"wrists": (0.60, 0.07), "elbows": (0.50, 0.15), "jitter": 0.015},
+    "most_muscular_uneven": {"wrists": (0.60, 0.02), "elbows": ((0.45, 0.12), (0.58, 0.18)),
+                             "jitter": 0.015},
+    "abs_and_thigh": {"wrists": (0.26, 0.08), "elbows": (0.22, 0.20), "jitter": 0.01},
+    "abs_soft_knees": {"wrists": (0.18, 0.04), "elbows": (0.22, 0.20), "knees": (0.85, 0.10),
+                       "jitter": 0.01},
+    "abs_bent_knees": {"wrists": (0.26, 0.08), "elbows": (0.22, 0.20), "knees": (0.80, 0.16),
+                       "jitter": 0.01},
+    "abs_elbows_open": {"wrists": ((0.12, 0.05), (0.08, 0.10)), "elbows": (0.22, 0.20),
+                        "jitter": 0.01},
+}
+
+
+def stance_frames(stance, n, rng):
+    """Landmark frames jittered around a stance; left side at x > 0.5."""
+    stance = {**REST, **STANCES[stance]}
+    base = rng.uniform(0.3, 0.7, size=(33, 3))
+    base[:, 2] = rng.uniform(-0.02, 0.02, size=33)
+    for name, (left, right) in PAIRS.items():
+        place = stance[name]
+        (left_y, left_dx), (right_y, right_dx) = place if isinstance(place[0], tuple) else (place, place)
+        base[left, :2] = 0.5 + left_dx, left_y
+        base[right, :2] = 0.5 - right_dx, right_y
+    return base + rng.normal(0, stance["jitter"], size=(n, 33, 3))
+
+
+def generate(per_stance, seed=7):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for stance in STANCES:
+        for i, lm in enumerate(stance_frames(stance, per_stance, rng)):
+            frames.append((f"{stance}-{i}", lm))
+    # rounded the way they are stored, so expectations match what is loaded
+    landmarks = np.round(np.array([lm for _, lm in frames]), 5).tolist()
+    scorers = [REFERENCE_POSES[key] for key in sorted(REFERENCE_POSES)]
+    missing = sorted(set(POSE_RULES.names) - {name for name, _ in scorers})
+    if missing:
+        raise ValueError(f"no reference scorer for: {', '.join(missing)}")
+    results = [[scorer(lm) for _, scorer in scorers] for lm in landmarks]
+    return {
+        "poses": [name for name, _ in scorers],
+        "frames": [{
+            "id": frame_id,
+            "landmarks": landmarks[i],
+            "scores": [int(score) for score, _ in results[i]],
+            "feedback": [feedback for _, feedback in results[i]],
+        } for i, (frame_id, _) in enumerate(frames)],
+    }
+
+
+def load_fixtures(path=FIXTURES):
+    with open(path) as f:
+        fixtures = json.load(f)
+    landmarks = np.array([frame["landmarks"] for frame in fixtures["frames"]], dtype=np.float64)
+    return fixtures, landmarks
+
+
+def expected(fixtures, frame_index, pose):
+    frame = fixtures["frames"][frame_index]
+    p = fixtures["poses"].index(pose)
+    return frame["scores"][p], frame["feedback"][p]
+
+
+def unreached(fixtures):
+    """Feedback messages, per pose, that no golden frame expects."""
+    missing = {}
+    for p, pose in enumerate(POSE_RULES.names):
+        if pose not in fixtures["poses"]:
+            continue
+        column = fixtures["poses"].index(pose)
+        seen = {frame["feedback"][column] for frame in fixtures["frames"]}
+        left = [message for message in POSE_RULES.feedback[p] if message not in seen]
+        if left:
+            missing[pose] = left
+    return missing
+
+
+def python_results(landmarks):
+    """{implementation: [[(score, feedback) per pose in its order] per frame]}, with pose names."""
+    results = {}
+    scores, feedback = POSE_RULES.score(landmarks)
+    results["rules (batch)"] = (POSE_RULES.names, [
+        [(int(scores[i, p]), POSE_RULES.feedback[p][feedback[i, p]]) for p in range(len(POSE_RULES))]
+        for i in range(len(landmarks))])
+    per_frame = [POSE_RULES.score_frame(lm) for lm in landmarks]
+    results["rules (frame)"] = (POSE_RULES.names, [
+        [(s[p], POSE_RULES.feedback[p][f[p]]) for p in range(len(POSE_RULES))] for s, f in per_frame])
+    scorers = [REFERENCE_POSES[key] for key in sorted(REFERENCE_POSES)]
+    results["reference"] = ([name for name, _ in scorers], [
+        [tuple(scorer(lm)) for _, scorer in scorers] for lm in landmarks.tolist()])
+    return results
+
+
+def run_js(fixtures_path, repeat=0):
+    node = shutil.which("node")
+    if node is None:
+        return None
+    output = subprocess.run([node, JS_RUNNER, fixtures_path, str(repeat)],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def compare(fixtures, name, poses, results, limit=5):
+    """Print disagreements with the fixtures; return the number of mismatches."""
+    mismatches = 0
+    for p, pose in enumerate(poses):
+        if pose not in fixtures["poses"]:
+            continue
+        for i, frame in enumerate(results):
+            got = (int(frame[p][0]), frame[p][1])
+            want = expected(fixtures, i, pose)
+            if got != want:
+                mismatches += 1
+                if mismatches <= limit:
+                    print(f"  {name} | {pose} | {fixtures['frames'][i]['id']}: got {got}, expected {want}")
+    return mismatches
+
+
+def timed(label, fn, frames, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    per_frame = (time.perf_counter() - start) / (frames * repeat) * 1e6
+    print(f"{label:<42} {per_frame:8.2f} us/frame")
+
+
+def benchmark(landmarks, js):
+    n = len(landmarks)
+    as_lists = landmarks.tolist()
+    scorers = [POSES[key][1] for key in sorted(POSES)]
+    print(f"\nThroughput on {n} fixture frames")
+    timed("python reference, 4 poses", lambda: [s(lm) for lm in as_lists for s in scorers], n)
+    timed(f"python rules per frame, {len(POSE_RULES)} poses",
+          lambda: [POSE_RULES.score_frame(lm) for lm in landmarks], n)
+    timed(f"python rules batched, {len(POSE_RULES)} poses",
+          lambda: POSE_RULES.score(landmarks), n, repeat=20)
+    if js is not None:
+        supported = [pose for pose, us in js["us_per_frame"].items() if pose in js["supported"]]
+        total = sum(js["us_per_frame"][pose] for pose in supported)
+        print(f"{f'javascript (node), {len(supported)} poses':<42} {total:8.2f} us/frame")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bench", action="store_true", help="also time every implementation")
+    parser.add_argument("--generate", type=int, metavar="N",
+                        help="rebuild the fixtures with N frames per stance")
+    args = parser.parse_args()
+
+    if args.generate:
+        os.makedirs(os.path.dirname(FIXTURES), exist_ok=True)
+        with open(FIXTURES, "w") as f:
+            json.dump(generate(args.generate), f, separators=(",", ":"))
+        print(f"Wrote {FIXTURES}")
+
+    fixtures, landmarks = load_fixtures()
+    print(f"{len(landmarks)} golden frames, poses: {', '.join(fixtures['poses'])}")
+    # some branches may be unreachable by construction, so this only reports
+    for pose, messages in unreached(fixtures).items():
+        print(f"{'coverage':<16} {pose} never expects: {'; '.join(messages)}")
+
+    failures = 0
+    for name, (poses, results) in python_results(landmarks).items():
+        mismatches = compare(fixtures, name, poses, results)
+        print(f"{name:<16} {'OK' if not mismatches else f'{mismatches} mismatches'}")
+        failures += mismatches
+
+    js = run_js(FIXTURES, repeat=20 if args.bench else 0)
+    if js is None:
+        print("javascript       skipped (node not found)")
+    else:
+        # the JS port answers "Unknown pose" for poses it does not implement
+        js["supported"] = [pose for p, pose in enumerate(fixtures["poses"])
+                           if js["results"][0][p]["feedback"] != "Unknown pose"]
+        js_results = [[(r["score"], r["feedback"]) for r in frame] for frame in js["results"]]
+        supported = [pose if pose in js["supported"] else None for pose in fixtures["poses"]]
+        mismatches = compare(fixtures, "javascript", supported, js_results)
+        print(f"{'javascript':<16} {'OK' if not mismatches else f'{mismatches} mismatches'}")
+        missing = sorted(set(fixtures["poses"]) - set(js["supported"]))
+        if missing:
+            print(f"{'':<16} FAIL not ported to JS: {', '.join(missing)}")
+        failures += mismatches + len(missing)
+
+    if args.bench:
+        benchmark(landmarks, js)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Replay recorded CheckFit sessions through the scorers, without a camera.
+
+Usage: python replay_session.py SESSION.cfs [SESSION.cfs ...] [--rules poses.json]
+
+Sessions are recorded with ``python app1.py --record`` (or make_sounds.py).
+Every frame is re-scored with the current pose rules (or the definitions in
+--rules) as fast as NumPy allows. The report shows, per pose, how long it was
+held ready, its best score, and how many frames now score differently from
+what the coach showed live. Landmarks are stored as float16, so a few frames
+sitting right on a band edge can differ even with unchanged rules.
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from checkfit import POSE_RULES, load_poses
+from checkfit.session import SessionReader, replay
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay and re-score CheckFit sessions")
+    parser.add_argument("sessions", nargs="+", help="session files (.cfs)")
+    parser.add_argument("--rules", help="pose definitions JSON to score with instead of POSE_RULES")
+    return parser.parse_args(argv)
+
+
+def report(path, rules):
+    with SessionReader(path) as reader:
+        recorded_names = reader.pose_names
+        shared = [(i, recorded_names.index(name)) for i, name in enumerate(rules.names)
+                  if name in recorded_names]
+
+        start = time.perf_counter()
+        scores, changed = [], np.zeros(len(rules), dtype=np.int64)
+        for chunk, new_scores, _ in replay(reader, rules):
+            scores.append(new_scores)
+            for i, j in shared:
+                changed[i] += int((new_scores[:, i] != chunk.scores[:, j]).sum())
+        elapsed = time.perf_counter() - start
+
+        timestamps = reader.column("timestamps")
+        detected = np.concatenate([chunk.detected for chunk in reader.chunks]) \
+            if reader.chunks else np.zeros(0, dtype=bool)
+        duration = float(timestamps[-1]) if reader.frames else 0.0
+        print(f"\n{path}: {reader.frames} frames, {duration:.1f}s, "
+              f"{int(detected.sum())} with a pose detected")
+        if not reader.frames:
+            return
+        scores = np.concatenate(scores)
+        frame_time = np.diff(timestamps, append=timestamps[-1])
+
+        for i, name in enumerate(rules.names):
+            column = scores[:, i]
+            frames_ready = column > 0
+            best = int(column.argmax())
+            note = f"{changed[i]} frames changed" if name in recorded_names else "not in recording"
+            print(f"  {name:<22} ready {frame_time[frames_ready].sum():6.1f}s | "
+                  f"best {column[best]:3d} at {timestamps[best]:6.1f}s | {note}")
+        print(f"  re-scored at {reader.frames / max(elapsed, 1e-9):,.0f} frames/s")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rules = load_poses(args.rules) if args.rules else POSE_RULES
+    for path in args.sessions:
+        report(path, rules)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
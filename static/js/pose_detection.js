@@ -8,6 +8,11 @@ let currentPose = "Front Double Biceps";
 let holdStartTime = null;
 let screenshotTaken = false;
 
+// Frames of the current set, uploaded for server-side scoring in chunks of
+// SET_CHUNK_FRAMES while recording and once more when the set ends
+const setRecorder = new LandmarkSetRecorder();
+let setId = newSetId();
+
 // Audio elements
 let correctSound = null;
 let coachSound = null;
@@ -79,6 +84,11 @@ function onPoseResults(results) {
         drawConnectors(canvasCtx, results.poseLandmarks, POSE_CONNECTIONS, { color: '#00FF00', lineWidth: 4 });
         drawLandmarks(canvasCtx, results.poseLandmarks, { color: '#FF0000', lineWidth: 2, radius: 6 });
 
+        setRecorder.add(results.poseLandmarks);
+        if (setRecorder.full) {
+            uploadSetChunk(currentPose);
+        }
+
         // Convert landmarks to array format for scoring
         const landmarks = results.poseLandmarks.map(lm => [lm.x, lm.y, lm.z]);
 
@@ -180,8 +190,26 @@ function captureManualScreenshot() {
     showNotification('Screenshot saved! 📸', 'success');
 }
 
+function newSetId() {
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 8)}`;
+}
+
+// Send the frames recorded so far to the server in one request, instead of every frame
+function uploadSetChunk(poseName) {
+    if (setRecorder.frames === 0) return;
+    scoreSetOnServer(setRecorder, poseName, setId)
+        .then(result => {
+            const best = result.best[0];
+            console.log(`Server scored ${result.frames} frames of ${poseName}: best ${best.score} at frame ${best.frame} of the chunk`);
+        })
+        .catch(error => console.error('Server scoring failed:', error));
+    setRecorder.reset();
+}
+
 // Switch pose
 function switchPose(poseName) {
+    uploadSetChunk(currentPose);
+    setId = newSetId();
     currentPose = poseName;
     holdStartTime = null;
     screenshotTaken = false;
@@ -222,6 +250,9 @@ document.addEventListener('DOMContentLoaded', () => {
 
 // Stop camera when leaving page
 window.addEventListener('beforeunload', () => {
+    if (setRecorder.frames > 0) {
+        sendSetOnUnload(setRecorder, currentPose, setId);
+    }
     if (camera) {
         camera.stop();
     }
@@ -1,5 +1,6 @@
 // Pose Scoring Algorithms - JavaScript Port from Python
-// Ported from pose_detection1/app1.py
+// Ported from pose_detection1/checkfit (scores truncate like Python int());
+// pose_detection1/parity_check.py checks both agree on golden fixtures
 
 // Utility function to calculate angle between three points
 function calculateAngle(a, b, c) {
@@ -67,7 +68,7 @@ function scoreFrontDoubleBiceps(landmarks) {
         feedback = "Flex biceps more";
     }
 
-    return { score: Math.round(score), feedback, leftAngle, rightAngle };
+    return { score: Math.trunc(score), feedback, leftAngle, rightAngle };
 }
 
 // BACK DOUBLE BICEPS
@@ -114,7 +115,7 @@ function scoreBackDoubleBiceps(landmarks) {
         feedback = "Tighten back and raise elbows";
     }
 
-    return { score: Math.round(score), feedback, leftAngle, rightAngle };
+    return { score: Math.trunc(score), feedback, leftAngle, rightAngle };
 }
 
 // SIDE CHEST
@@ -174,7 +175,7 @@ function scoreSideChest(landmarks) {
         feedback = "Adjust arm position";
     }
 
-    return { score: Math.round(score), feedback, frontAngle, backAngle };
+    return { score: Math.trunc(score), feedback, frontAngle, backAngle };
 }
 
 // LAT FLEX / LAT SPREAD
@@ -224,13 +225,13 @@ function scoreLatFlex(landmarks) {
         score = 100;
         feedback = "Huge lat spread!";
     } else if (ratio >= 1.15) {
-        score = Math.round(90 + (ratio - 1.15) * 100);
+        score = Math.trunc(90 + (ratio - 1.15) * 100);
         feedback = "Great lat spread";
     } else if (ratio >= 1.05) {
-        score = Math.round(75 + (ratio - 1.05) * 150);
+        score = Math.trunc(75 + (ratio - 1.05) * 150);
         feedback = "Good, flare lats a bit more";
     } else {
-        score = Math.max(50, Math.round(ratio * 60));
+        score = Math.max(50, Math.trunc(ratio * 60));
         feedback = "Spread elbows out and widen back";
     }
 
@@ -239,6 +240,131 @@ function scoreLatFlex(landmarks) {
     return { score, feedback, ratio };
 }
 
+// Distance between two landmarks
+function landmarkDistance(p, q) {
+    return Math.sqrt((p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2 + (p[2] - q[2]) ** 2);
+}
+
+// MOST MUSCULAR
+function scoreMostMuscular(landmarks) {
+    const leftWristY = landmarks[15][1];
+    const rightWristY = landmarks[16][1];
+    const spread = landmarkDistance(landmarks[15], landmarks[16]) /
+        (landmarkDistance(landmarks[11], landmarks[12]) + 1e-6);
+
+    // Hands clasped in front of the waist
+    const chestTop = Math.min(landmarks[11][1], landmarks[12][1]) + 0.05;
+    const waistLow = Math.max(landmarks[23][1], landmarks[24][1]) + 0.05;
+
+    const handsInZone = (chestTop < leftWristY && leftWristY < waistLow) &&
+        (chestTop < rightWristY && rightWristY < waistLow) && spread < 0.8;
+
+    if (!handsInZone) {
+        return { score: 0, feedback: "Bring hands together in front of waist" };
+    }
+
+    const leftAngle = calculateAngle(landmarks[11], landmarks[13], landmarks[15]);
+    const rightAngle = calculateAngle(landmarks[12], landmarks[14], landmarks[16]);
+
+    // Rounded arms score best
+    function roundedArmScore(angle) {
+        if (angle >= 80 && angle <= 130) {
+            return 100;
+        } else if ((angle >= 65 && angle < 80) || (angle > 130 && angle <= 145)) {
+            return 85;
+        } else if ((angle >= 50 && angle < 65) || (angle > 145 && angle <= 160)) {
+            return 65;
+        } else {
+            return 40;
+        }
+    }
+
+    let handsScore;
+    if (spread <= 0.35) {
+        handsScore = 100;
+    } else if (spread <= 0.55) {
+        handsScore = 80;
+    } else {
+        handsScore = 60;
+    }
+
+    const symmetryDiff = Math.abs(leftAngle - rightAngle);
+    const symmetryPenalty = Math.max(0, symmetryDiff - 25) * 0.5;
+
+    let score = 0.35 * roundedArmScore(leftAngle) + 0.35 * roundedArmScore(rightAngle) +
+        0.3 * handsScore - symmetryPenalty;
+    score = Math.max(0, Math.min(100, score));
+
+    let feedback;
+    if (score >= 85) {
+        feedback = "Crushing most muscular!";
+    } else if (spread > 0.55) {
+        feedback = "Bring your hands closer";
+    } else if (symmetryDiff > 30) {
+        feedback = "Round both arms evenly";
+    } else {
+        feedback = "Flex traps and chest harder";
+    }
+
+    return { score: Math.trunc(score), feedback, leftAngle, rightAngle };
+}
+
+// ABS & THIGH
+function scoreAbsAndThigh(landmarks) {
+    const spread = landmarkDistance(landmarks[15], landmarks[16]) /
+        (landmarkDistance(landmarks[11], landmarks[12]) + 1e-6);
+
+    // Hands behind the head
+    if (!isPoseReady(landmarks) || spread >= 1.2) {
+        return { score: 0, feedback: "Put hands behind your head" };
+    }
+
+    const leftAngle = calculateAngle(landmarks[11], landmarks[13], landmarks[15]);
+    const rightAngle = calculateAngle(landmarks[12], landmarks[14], landmarks[16]);
+    const kneeAngle = Math.min(calculateAngle(landmarks[23], landmarks[25], landmarks[27]),
+        calculateAngle(landmarks[24], landmarks[26], landmarks[28]));
+
+    function behindHeadScore(angle) {
+        if (angle >= 15 && angle <= 60) {
+            return 100;
+        } else if ((angle >= 10 && angle < 15) || (angle > 60 && angle <= 75)) {
+            return 85;
+        } else if ((angle >= 5 && angle < 10) || (angle > 75 && angle <= 95)) {
+            return 65;
+        } else {
+            return 40;
+        }
+    }
+
+    let legScore;
+    if (kneeAngle >= 160 && kneeAngle <= 180) {
+        legScore = 100;
+    } else if (kneeAngle >= 145 && kneeAngle < 160) {
+        legScore = 80;
+    } else {
+        legScore = 55;
+    }
+
+    const symmetryPenalty = Math.max(0, Math.abs(leftAngle - rightAngle) - 20) * 0.5;
+
+    let score = 0.3 * behindHeadScore(leftAngle) + 0.3 * behindHeadScore(rightAngle) +
+        0.4 * legScore - symmetryPenalty;
+    score = Math.max(0, Math.min(100, score));
+
+    let feedback;
+    if (score >= 85) {
+        feedback = "Great abs and thigh!";
+    } else if (kneeAngle < 150) {
+        feedback = "Straighten your front leg";
+    } else if (Math.max(leftAngle, rightAngle) > 75) {
+        feedback = "Keep elbows high and hands behind head";
+    } else {
+        feedback = "Crunch your abs harder";
+    }
+
+    return { score: Math.trunc(score), feedback, kneeAngle };
+}
+
 // Main scoring function - routes to appropriate pose scorer
 function scorePose(poseName, landmarks) {
     switch (poseName) {
@@ -250,7 +376,98 @@ function scorePose(poseName, landmarks) {
             return scoreSideChest(landmarks);
         case "Lat Flex":
             return scoreLatFlex(landmarks);
+        case "Most Muscular":
+            return scoreMostMuscular(landmarks);
+        case "Abs & Thigh":
+            return scoreAbsAndThigh(landmarks);
         default:
             return { score: 0, feedback: "Unknown pose" };
     }
 }
+
+// ---------- Server-side scoring of a whole set ----------
+// One frame on the wire: 33 landmarks x (x, y, z) as float32
+const LANDMARK_FLOATS = 33 * 3;
+// Frames per upload: 150 x 396 B = 59,400 B, under the ~64 KB a sendBeacon
+// or keepalive request may carry, so any chunk can still go out on unload
+const SET_CHUNK_FRAMES = 150;
+
+// Collects landmark frames into one preallocated Float32Array for upload
+class LandmarkSetRecorder {
+    constructor(maxFrames = SET_CHUNK_FRAMES) {
+        this.buffer = new Float32Array(maxFrames * LANDMARK_FLOATS);
+        this.maxFrames = maxFrames;
+        this.frames = 0;
+        this.dropped = 0;
+    }
+
+    // Upload and reset() once this is true; add() refuses frames until then
+    get full() {
+        return this.frames >= this.maxFrames;
+    }
+
+    // Returns false, and counts the frame in `dropped`, when the buffer is full
+    add(poseLandmarks) {
+        if (this.full) {
+            this.dropped++;
+            return false;
+        }
+        let offset = this.frames * LANDMARK_FLOATS;
+        for (let i = 0; i < 33; i++) {
+            const lm = poseLandmarks[i];
+            this.buffer[offset++] = lm.x;
+            this.buffer[offset++] = lm.y;
+            this.buffer[offset++] = lm.z;
+        }
+        this.frames++;
+        return true;
+    }
+
+    reset() {
+        this.frames = 0;
+    }
+
+    // Packed bytes of the recorded frames (a view, no copy)
+    packed() {
+        return this.buffer.subarray(0, this.frames * LANDMARK_FLOATS);
+    }
+}
+
+// Chunks of one set share a set id, so the server can group them
+function scoreBatchUrl(poseName, setId) {
+    let url = `/checkfit/score_batch?pose=${encodeURIComponent(poseName)}`;
+    if (setId) url += `&set=${encodeURIComponent(setId)}`;
+    return url;
+}
+
+// Score recorded frames with the server's pose rules; resolves to the JSON result.
+// The body is copied when the request is made, so the recorder can be reset right after
+async function scoreSetOnServer(recorder, poseName, setId) {
+    const response = await fetch(scoreBatchUrl(poseName, setId), {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/octet-stream' },
+        body: recorder.packed()
+    });
+    if (!response.ok) {
+        throw new Error((await response.json()).error || response.statusText);
+    }
+    return response.json();
+}
+
+// Send the recorded frames while the page unloads and reset the recorder.
+// sendBeacon returns false when the browser will not queue the body; the
+// frames then go out as a keepalive fetch instead. Returns whether the
+// beacon took them.
+function sendSetOnUnload(recorder, poseName, setId) {
+    const url = scoreBatchUrl(poseName, setId);
+    const body = new Blob([recorder.packed()], { type: 'application/octet-stream' });
+    recorder.reset();
+    if (navigator.sendBeacon && navigator.sendBeacon(url, body)) return true;
+    fetch(url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/octet-stream' },
+        body,
+        keepalive: true
+    }).catch(error => console.error('Set upload on unload failed:', error));
+    return false;
+}